@@ -0,0 +1,35 @@
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from core.config import ADMIN_TOKEN, METRICS_TOKEN
+
+ADMIN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check against ADMIN_TOKEN; always False when no token is configured."""
+    return bool(ADMIN_TOKEN) and bool(token) and secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency for admin-only routes."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(404, "Not Found")  # debug surface is off unless ADMIN_TOKEN is set
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(403, "⚠️ Admin token required")
+
+
+async def require_metrics_token(authorization: Optional[str] = Header(None), x_admin_token: Optional[str] = Header(None)):
+    """Dependency for /metrics: the scraper's bearer token (METRICS_TOKEN) or the admin token."""
+    if not METRICS_TOKEN and not ADMIN_TOKEN:
+        raise HTTPException(404, "Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if (
+        METRICS_TOKEN
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(token.strip().encode(), METRICS_TOKEN.encode())
+    ):
+        return
+    if is_admin_token(x_admin_token):
+        return
+    raise HTTPException(403, "⚠️ Metrics token required", headers={"WWW-Authenticate": "Bearer"})
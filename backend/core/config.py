@@ -2,4 +2,183 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-DATABASE_URL = os.getenv("CONNECTION_STRING")
\ No newline at end of file
+DATABASE_URL = os.getenv("CONNECTION_STRING")
+
+# IANA zone WHOOP timestamps are converted into (record_date is the calendar day here)
+LOCAL_TIMEZONE = os.getenv("LOCAL_TIMEZONE", "America/New_York")
+
+# =====================================================
+# 🗄️ Database connection pool
+# =====================================================
+# Keep DB_POOL_SIZE + DB_MAX_OVERFLOW under the Supabase pooler's client limit per app instance
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before the pooler/server drops idle connections (-1 = never)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# "always" pings on every checkout, "idle" only after DB_POOL_PING_IDLE_SECONDS unused, "never" skips it
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+DB_POOL_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "30"))
+
+# =====================================================
+# 🧾 Prepared statements
+# =====================================================
+# "session" (direct Postgres or the pooler on :5432) keeps named prepared statements cached per connection;
+# "transaction" (the pgbouncer pooler on :6543) can't, so statements go out unnamed. "auto" picks by port.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "auto").lower()
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+# Optional direct (non-pooler) connection for hot registry reads while writes stay on the transaction pooler
+DIRECT_CONNECTION_STRING = os.getenv("DIRECT_CONNECTION_STRING")
+DB_DIRECT_POOL_SIZE = int(os.getenv("DB_DIRECT_POOL_SIZE", "2"))
+
+# =====================================================
+# 📖 Read replica
+# =====================================================
+# Optional replica for read-only routes; unset means every read uses the primary
+READ_CONNECTION_STRING = os.getenv("READ_CONNECTION_STRING")
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+# After a client writes, its reads stay on the primary this long (should exceed replica lag)
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+# =====================================================
+# 🧱 Schema migrations
+# =====================================================
+# Startup schema check: "cached" skips the database round trip once this instance has confirmed the
+# current migrations against this database (marker in DB_SCHEMA_CACHE_FILE), "always" checks on every
+# boot, "never" leaves migrating to `python -m scripts.migrate`
+DB_SCHEMA_CHECK = os.getenv("DB_SCHEMA_CHECK", "cached").lower()
+DB_SCHEMA_CACHE_FILE = os.getenv("DB_SCHEMA_CACHE_FILE", ".schema_checked")
+
+# =====================================================
+# 🗓️ Table partitions
+# =====================================================
+# daily_entries and whoop_* are partitioned by year (core/partitions.py); partitions are kept this many
+# years ahead of the current one, checked in the background at startup and then on this interval (0 = off)
+PARTITION_YEARS_AHEAD = int(os.getenv("PARTITION_YEARS_AHEAD", "1"))
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", "86400"))
+
+# =====================================================
+# 🐢 Slow-query log
+# =====================================================
+# Statements slower than this land in the /debug/slow-queries ring buffer (0 disables the log)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "250"))
+# Share of slow statements re-run under EXPLAIN (ANALYZE, BUFFERS) in the background (0 disables)
+DB_SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("DB_SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+DB_SLOW_QUERY_BUFFER = int(os.getenv("DB_SLOW_QUERY_BUFFER", "100"))
+
+# =====================================================
+# 👥 Users
+# =====================================================
+# Callers identify with "Authorization: Bearer <api key>" (scripts/create_user.py issues keys). Requests
+# without a key: "auto" lets them act as the owner only while the owner is the only user (a single-user
+# deployment keeps working) and rejects them once anyone else exists; "true" always rejects them;
+# "false" always lets them through as the owner (a warning is logged at startup if other users exist).
+USER_AUTH_REQUIRED = os.getenv("USER_AUTH_REQUIRED", "auto").lower()
+if USER_AUTH_REQUIRED in ("1", "yes"):
+    USER_AUTH_REQUIRED = "true"
+elif USER_AUTH_REQUIRED in ("0", "no"):
+    USER_AUTH_REQUIRED = "false"
+# Resolved keys are cached in-process this long, so a revoked key stops working within it
+USER_KEY_CACHE_SECONDS = float(os.getenv("USER_KEY_CACHE_SECONDS", "60"))
+
+# =====================================================
+# 📡 Live events
+# =====================================================
+# GET /events (server-sent events, core/event_hub.py): events buffered per slow client before it is told
+# to resync, events kept per user for Last-Event-ID reconnects, and connected clients per instance
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_REPLAY_BUFFER = int(os.getenv("EVENTS_REPLAY_BUFFER", "200"))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "200"))
+# A comment line is sent this often on an idle stream so proxies don't close it
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# EventSource can't send an Authorization header, so browsers connect with a stream token from
+# POST /events/token instead: good only for opening /events, for this long, signed with this secret
+# (shared by every instance; falls back to the WHOOP client secret, then to a per-process random one)
+EVENTS_TOKEN_SECONDS = int(os.getenv("EVENTS_TOKEN_SECONDS", "60"))
+EVENTS_TOKEN_SECRET = os.getenv("EVENTS_TOKEN_SECRET") or os.getenv("WHOOP_CLIENT_SECRET")
+
+# =====================================================
+# 🔐 Admin
+# =====================================================
+# Shared secret for /debug endpoints, sent as the X-Admin-Token header; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# /metrics and /metrics/db take "Authorization: Bearer <METRICS_TOKEN>" (what Prometheus' bearer_token
+# sends) or the admin token; with neither set they are off
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# ?profile=1 / X-Profile: 1 (with the admin token) samples the request's stacks this often; while the event loop
+# holds the GIL, no more often than Python's thread switch interval (5 ms), which the profiler leaves alone
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER = int(os.getenv("PROFILE_BUFFER", "20"))
+
+# =====================================================
+# 🟩 WHOOP OAuth
+# =====================================================
+WHOOP_CLIENT_ID = os.getenv("WHOOP_CLIENT_ID")
+WHOOP_CLIENT_SECRET = os.getenv("WHOOP_CLIENT_SECRET")
+WHOOP_REDIRECT_URI = os.getenv("WHOOP_REDIRECT_URI")
+
+# Overridable so local runs can point at scripts/fake_whoop_server.py
+WHOOP_AUTH_URL = os.getenv("WHOOP_AUTH_URL", "https://api.prod.whoop.com/oauth/oauth2/auth")
+WHOOP_TOKEN_URL = os.getenv("WHOOP_TOKEN_URL", "https://api.prod.whoop.com/oauth/oauth2/token")
+WHOOP_API_BASE = os.getenv("WHOOP_API_BASE", "https://api.prod.whoop.com/developer/v2")
+
+# "file" keeps tokens in WHOOP_TOKEN_FILE (the owner; other users get whoop_tokens.<user id>.json beside it),
+# "postgres" in the whoop_tokens table, one row per user
+WHOOP_TOKEN_STORE = os.getenv("WHOOP_TOKEN_STORE", "file")
+WHOOP_TOKEN_FILE = os.getenv("WHOOP_TOKEN_FILE", "whoop_tokens.json")
+# Refresh this many seconds before expires_at so requests never race the expiry
+WHOOP_TOKEN_REFRESH_MARGIN = int(os.getenv("WHOOP_TOKEN_REFRESH_MARGIN", "300"))
+
+# =====================================================
+# ⏰ Background WHOOP sync
+# =====================================================
+WHOOP_SYNC_ENABLED = os.getenv("WHOOP_SYNC_ENABLED", "false").lower() in ("1", "true", "yes")
+WHOOP_SYNC_INTERVAL_SECONDS = int(os.getenv("WHOOP_SYNC_INTERVAL_SECONDS", "3600"))
+# Fraction of the interval added/removed at random so workers don't sync in lockstep
+WHOOP_SYNC_JITTER = float(os.getenv("WHOOP_SYNC_JITTER", "0.1"))
+WHOOP_SYNC_BACKOFF_BASE = int(os.getenv("WHOOP_SYNC_BACKOFF_BASE", "30"))
+WHOOP_SYNC_BACKOFF_MAX = int(os.getenv("WHOOP_SYNC_BACKOFF_MAX", "3600"))
+# Only one instance syncs at a time: it holds a lease row, renewed every third of this while the sync runs.
+# If that instance dies, another can take over once the lease has expired.
+WHOOP_SYNC_LEASE_SECONDS = int(os.getenv("WHOOP_SYNC_LEASE_SECONDS", "120"))
+
+# =====================================================
+# 🚦 WHOOP API rate limiting
+# =====================================================
+# WHOOP allows 100 requests/minute and 10,000/day per app; collection endpoints cap limit at 25
+WHOOP_RATE_LIMIT_PER_MINUTE = int(os.getenv("WHOOP_RATE_LIMIT_PER_MINUTE", "100"))
+WHOOP_RATE_LIMIT_BURST = int(os.getenv("WHOOP_RATE_LIMIT_BURST", "10"))
+WHOOP_MAX_PAGE_SIZE = 25
+WHOOP_MAX_RETRIES = int(os.getenv("WHOOP_MAX_RETRIES", "5"))
+WHOOP_RETRY_BACKOFF_BASE = float(os.getenv("WHOOP_RETRY_BACKOFF_BASE", "1.0"))
+WHOOP_RETRY_BACKOFF_MAX = float(os.getenv("WHOOP_RETRY_BACKOFF_MAX", "60"))
+
+# =====================================================
+# 📦 WHOOP history download
+# =====================================================
+# Gzip NDJSON per resource + checkpoint.json live here (other users than the owner in a <user id>/ subdirectory)
+WHOOP_HISTORY_DIR = os.getenv("WHOOP_HISTORY_DIR", "whoop_history")
+
+# =====================================================
+# 🧵 WHOOP background jobs
+# =====================================================
+# Backfills (POST /whoop/jobs/backfill) run on this many workers per instance; more jobs wait queued.
+# Workers wake at once for jobs queued on their own instance and poll for the rest this often.
+WHOOP_JOB_WORKERS = int(os.getenv("WHOOP_JOB_WORKERS", "2"))
+WHOOP_JOB_POLL_SECONDS = float(os.getenv("WHOOP_JOB_POLL_SECONDS", "30"))
+# A running job whose worker hasn't finished a page in this long (instance died) is claimed again.
+# Keep it well above the longest rate-limit/retry wait of a single page.
+WHOOP_JOB_STALE_SECONDS = int(os.getenv("WHOOP_JOB_STALE_SECONDS", "600"))
+
+# =====================================================
+# 🪝 WHOOP webhooks
+# =====================================================
+# WHOOP signs webhooks with the app's client secret
+WHOOP_WEBHOOK_SECRET = os.getenv("WHOOP_WEBHOOK_SECRET") or WHOOP_CLIENT_SECRET
+# Reject deliveries whose signature timestamp is older than this (replay protection)
+WHOOP_WEBHOOK_TOLERANCE_SECONDS = int(os.getenv("WHOOP_WEBHOOK_TOLERANCE_SECONDS", "300"))
+# WHOOP already got its 2xx, so an event whose fetch/upsert fails is retried here: up to this many attempts,
+# waiting WHOOP_WEBHOOK_RETRY_BASE seconds doubled per attempt (capped at WHOOP_WEBHOOK_RETRY_MAX) in between
+WHOOP_WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WHOOP_WEBHOOK_MAX_ATTEMPTS", "5"))
+WHOOP_WEBHOOK_RETRY_BASE = float(os.getenv("WHOOP_WEBHOOK_RETRY_BASE", "10"))
+WHOOP_WEBHOOK_RETRY_MAX = float(os.getenv("WHOOP_WEBHOOK_RETRY_MAX", "600"))
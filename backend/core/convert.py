@@ -1,20 +1,120 @@
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, time, timezone, timedelta
+from functools import lru_cache
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+from core.config import LOCAL_TIMEZONE
 
-# Convert UTC string like "2025-11-09T13:26:02.403Z" to EST-aware datetime
+ONE_DAY = timedelta(days=1)
+_UNSEEN = object()
+
+
+# =====================================================
+# 🌍 Zones
+# =====================================================
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str] = None) -> ZoneInfo:
+    """ZoneInfo for an IANA name (LOCAL_TIMEZONE by default); raises ZoneInfoNotFoundError for typos."""
+    return ZoneInfo(name or LOCAL_TIMEZONE)
+
+
+@lru_cache(maxsize=4096)
+def _day_offset(zone_name: str, utc_day: date) -> Optional[timedelta]:
+    """
+    The zone's UTC offset for a whole UTC day, or None if it
+    changes during that day (a DST transition) and each instant has to be
+    converted exactly.
+    """
+    zone = get_zone(zone_name)
+    start = datetime.combine(utc_day, time(), tzinfo=timezone.utc)
+    first = start.astimezone(zone).utcoffset()
+    last = (start + ONE_DAY - timedelta(microseconds=1)).astimezone(zone).utcoffset()
+    return first if first == last else None
+
+
+# =====================================================
+# ⏱️ Parsing
+# =====================================================
+def parse_utc(ts: str) -> datetime:
+    """Parse an ISO timestamp like "2025-11-09T13:26:02.403Z" as an aware UTC datetime (naive = UTC)."""
+    try:
+        dt = datetime.fromisoformat(ts)
+    except ValueError:
+        if not ts.endswith("Z"):
+            raise
+        dt = datetime.fromisoformat(ts[:-1] + "+00:00")  # Python < 3.11 doesn't accept "Z"
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    if dt.tzinfo is timezone.utc:
+        return dt
+    return dt.astimezone(timezone.utc)
+
+
+def _parse(value: str, errors: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(value)
+        # Fast path: WHOOP's "...Z" strings already parse as UTC on Python 3.11+
+        return dt if dt.tzinfo is timezone.utc else parse_utc(value)
+    except (ValueError, TypeError, AttributeError):
+        try:
+            return parse_utc(value)
+        except (ValueError, TypeError, AttributeError):
+            if errors != "coerce":
+                raise ValueError(f"Invalid ISO timestamp: {value!r}") from None
+            return None
+
+
+# =====================================================
+# 📦 Batch conversion
+# =====================================================
+def to_local_datetimes(values: Iterable[Optional[str]], tz: Optional[str] = None, errors: str = "raise") -> list:
+    """
+    Convert a batch of UTC ISO strings to aware datetimes in `tz` (LOCAL_TIMEZONE
+    by default). Empty values give None; malformed ones raise ValueError, or
+    give None with errors="coerce".
+    """
+    zone = get_zone(tz or LOCAL_TIMEZONE)
+    out = []
+    for value in values:
+        dt = _parse(value, errors) if value else None
+        out.append(dt.astimezone(zone) if dt else None)
+    return out
+
+
+def to_local_dates(values: Iterable[Optional[str]], tz: Optional[str] = None, errors: str = "raise") -> list:
+    """
+    Local calendar dates (YYYY-MM-DD) for a batch of UTC ISO strings. The UTC
+    offset is looked up once per UTC day in the batch, so outside DST
+    transition days a date is one addition away instead of a zone conversion.
+    """
+    zone_name = tz or LOCAL_TIMEZONE
+    zone = get_zone(zone_name)
+    offsets = {}
+    out = []
+    for value in values:
+        dt = _parse(value, errors) if value else None
+        if dt is None:
+            out.append(None)
+            continue
+        day = dt.date()
+        offset = offsets.get(day, _UNSEEN)
+        if offset is _UNSEEN:
+            offset = offsets[day] = _day_offset(zone_name, day)
+        local = dt + offset if offset is not None else dt.astimezone(zone)
+        out.append(local.date().isoformat())
+    return out
+
+
+# =====================================================
+# 🔁 Single-value helpers (kept for existing callers)
+# =====================================================
+# Convert UTC string like "2025-11-09T13:26:02.403Z" to a local (LOCAL_TIMEZONE, DST-aware) datetime
 def to_est_datetime(utc_str):
     if not utc_str:
         return None
-    try:
-        # Parse UTC ISO string
-        dt_utc = datetime.fromisoformat(utc_str.replace("Z", "+00:00"))
-        # Convert to Eastern Time (handles DST automatically if you want)
-        est_offset = timedelta(hours=-5)
-        dt_est = dt_utc + est_offset
-        return dt_est
-    except Exception:
-        return None
+    return to_local_datetimes([utc_str], errors="coerce")[0]
 
 def extract_est_date(ts):
-    """Returns just the EST date (YYYY-MM-DD) for record_date fields."""
-    dt_est = to_est_datetime(ts)
-    return dt_est.date().isoformat() if dt_est else None
+    """Returns just the local date (YYYY-MM-DD) for record_date fields."""
+    if not ts:
+        return None
+    return to_local_dates([ts], errors="coerce")[0]
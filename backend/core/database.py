@@ -1,38 +1,155 @@
 # core/database.py
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import threading
+from typing import Optional
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy import MetaData
+from sqlalchemy.engine import make_url
+from core.config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_POOL_PING_IDLE_SECONDS,
+    DB_POOL_MODE,
+    DB_STATEMENT_CACHE_SIZE,
+    DIRECT_CONNECTION_STRING,
+    DB_DIRECT_POOL_SIZE,
+    READ_CONNECTION_STRING,
+    DB_READ_POOL_SIZE,
+)
+from core.pool_metrics import PoolMetrics
+from core.timing import attach_query_timing
+from core.slow_queries import slow_query_log
 
-# Get env var
-raw_url = os.getenv("CONNECTION_STRING")
-if not raw_url:
-    raise RuntimeError("Missing CONNECTION_STRING environment variable")
 
 # Ensure async driver
-if raw_url.startswith("postgresql://"):
-    raw_url = raw_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+def _async_url(url):
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def database_url() -> str:
+    """Primary asyncpg URL; only required once something actually talks to the database."""
+    url = os.getenv("CONNECTION_STRING")
+    if not url:
+        raise RuntimeError("Missing CONNECTION_STRING environment variable")
+    return _async_url(url)
 
 # ❗️Do NOT add sslmode=require manually — Supabase pooler handles SSL internally
 # Adding it causes the asyncpg TypeError you’re seeing
 
-# Create engine (no connect_args)
-engine = create_async_engine(
-    raw_url,
-    echo=False,
-    pool_pre_ping=True,
-    future=True,
-)
 
-async_session = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+# =====================================================
+# 🧾 Prepared-statement strategy
+# =====================================================
+def resolve_pool_mode(url: str, mode: str = DB_POOL_MODE) -> str:
+    """ "session" or "transaction"; "auto" treats the Supabase transaction pooler port (6543) as transaction mode."""
+    if mode in ("session", "transaction"):
+        return mode
+    if mode != "auto":
+        raise ValueError(f"Unknown DB_POOL_MODE '{mode}' (use auto, session or transaction)")
+    return "transaction" if make_url(url).port == 6543 else "session"
 
-metadata = MetaData(schema=os.getenv("SCHEMA", "public"))
+
+def statement_connect_args(mode: str) -> dict:
+    """asyncpg settings for how statements are prepared under `mode`."""
+    if mode == "transaction":
+        # pgbouncer may hand the next transaction a different server connection, where a named statement
+        # prepared earlier doesn't exist — so prepare unnamed ("") statements inside each transaction instead
+        return {"statement_cache_size": 0, "prepared_statement_cache_size": 0, "prepared_statement_name_func": lambda: ""}
+    # Session mode owns its server connection: named statements are prepared once and reused from the cache
+    return {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+
+
+# =====================================================
+# 🔌 Engines (built lazily)
+# =====================================================
+# Nothing below runs at import: the asyncpg dialect and each pool are created by the first caller,
+# so importing the app (cold start, --reload, scripts) never needs the database or its env vars
+_engines = {}
+_engines_lock = threading.RLock()
+all_pool_metrics = []
+
+
+def _lazy(name, build):
+    if name not in _engines:
+        with _engines_lock:
+            if name not in _engines:
+                _engines[name] = build()
+    return _engines[name]
+
+
+def get_pool_mode() -> str:
+    return _lazy("pool_mode", lambda: resolve_pool_mode(database_url()))
 
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(metadata.create_all)
\ No newline at end of file
+def _create_engine(name, url, pool_size, max_overflow, connect_args):
+    # 📊 Pool events feed /metrics/db; "idle" pre-ping only pays the extra round trip for long-idle connections
+    metrics = PoolMetrics(name, pre_ping=DB_POOL_PRE_PING, ping_idle_seconds=DB_POOL_PING_IDLE_SECONDS)
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=metrics.pool_class(),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING == "always",
+        connect_args=connect_args,
+        future=True,
+    )
+    metrics.attach(engine)
+    attach_query_timing(engine)  # ⏱️ per-request DB time for Server-Timing and /metrics
+    slow_query_log.attach(engine, name)  # 🐢 /debug/slow-queries
+    all_pool_metrics.append(metrics)
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """The primary engine (all writes)."""
+    return _lazy("primary", lambda: _create_engine(
+        "primary", database_url(), DB_POOL_SIZE, DB_MAX_OVERFLOW, statement_connect_args(get_pool_mode())
+    ))
+
+
+def get_direct_engine() -> Optional[AsyncEngine]:
+    """
+    🔀 Direct path: behind the transaction pooler, hot registry reads (core/queries.py) can use a
+    small direct connection pool instead, where named prepared statements stay cached.
+    """
+    if not DIRECT_CONNECTION_STRING or get_pool_mode() != "transaction":
+        return None
+    return _lazy("direct", lambda: _create_engine(
+        "direct", _async_url(DIRECT_CONNECTION_STRING), DB_DIRECT_POOL_SIZE, 0, statement_connect_args("session")
+    ))
+
+
+def get_read_engine() -> Optional[AsyncEngine]:
+    """📖 Optional read replica; core/db_routing.py decides per request whether a read may use it."""
+    if not READ_CONNECTION_STRING:
+        return None
+    read_url = _async_url(READ_CONNECTION_STRING)
+    return _lazy("replica", lambda: _create_engine(
+        "replica", read_url, DB_READ_POOL_SIZE, DB_MAX_OVERFLOW, statement_connect_args(resolve_pool_mode(read_url))
+    ))
+
+
+def statement_strategy() -> str:
+    """named (session mode), unnamed (transaction mode) or direct (transaction mode + direct reads)."""
+    if get_pool_mode() == "session":
+        return "named"
+    return "direct" if get_direct_engine() is not None else "unnamed"
+
+
+async def dispose_engines():
+    for name in ("primary", "direct", "replica"):
+        engine = _engines.get(name)
+        if engine is not None:
+            await engine.dispose()
+
+
+# Table definitions in models/ mirror the schema; migrations/ (core/migrations.py) is what creates it
+metadata = MetaData(schema=os.getenv("SCHEMA", "public"))
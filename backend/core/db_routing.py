@@ -0,0 +1,91 @@
+"""
+FastAPI dependencies that pick the engine for a request.
+
+    read_db   read-only routes: the replica (READ_CONNECTION_STRING) when one is
+              configured, otherwise the primary read path (the direct engine
+              in "direct" statement mode, else the primary)
+    write_db  routes that write: always the primary, and marks the client as a
+              recent writer
+
+Read-your-writes: a write pins that client's reads to the primary for
+DB_READ_YOUR_WRITES_SECONDS, so a list right after a save never misses the
+row to replica lag. The pin rides on a cookie (works across app instances)
+with an in-process fallback keyed by the caller's API key for clients that
+drop cookies. Not by client address: behind a proxy every client shares one,
+and a single write would pin everybody to the primary.
+"""
+import time
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core.config import DB_READ_YOUR_WRITES_SECONDS
+from core.database import get_engine, get_direct_engine, get_read_engine
+
+STICKY_COOKIE = "lifeof_primary_until"
+
+_recent_writers = {}  # hash of the Authorization header → time.time() deadline
+routing_stats = {"replica": 0, "primary": 0, "sticky": 0, "writes": 0}
+
+
+def _client_key(request: Request):
+    """The caller's credential (hashed, so keys aren't kept in memory), or None without one."""
+    authorization = request.headers.get("authorization")
+    return hashlib.sha256(authorization.encode()).hexdigest() if authorization else None
+
+
+def _primary_read_engine() -> AsyncEngine:
+    return get_direct_engine() or get_engine()
+
+
+def is_sticky(request: Request) -> bool:
+    """True while this client is inside its read-your-writes window."""
+    now = time.time()
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > now:
+            return True
+    except ValueError:
+        pass
+    key = _client_key(request)
+    return key is not None and _recent_writers.get(key, 0) > now
+
+
+def mark_write(request: Request, response: Response):
+    deadline = time.time() + DB_READ_YOUR_WRITES_SECONDS
+    # Cross-site (Vercel → API) requests only keep SameSite=None; Secure cookies
+    response.set_cookie(
+        STICKY_COOKIE,
+        f"{deadline:.3f}",
+        max_age=max(1, int(DB_READ_YOUR_WRITES_SECONDS + 0.999)),
+        httponly=True,
+        secure=True,
+        samesite="none",
+    )
+    now = time.time()
+    if len(_recent_writers) > 1000:
+        for key in [k for k, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[key]
+    key = _client_key(request)
+    if key is not None:
+        _recent_writers[key] = deadline
+
+
+# =====================================================
+# 💉 Dependencies
+# =====================================================
+async def read_db(request: Request) -> AsyncEngine:
+    read_engine = get_read_engine()
+    if read_engine is None:
+        routing_stats["primary"] += 1
+        return _primary_read_engine()
+    if is_sticky(request):
+        routing_stats["sticky"] += 1
+        return _primary_read_engine()
+    routing_stats["replica"] += 1
+    return read_engine
+
+
+async def write_db(request: Request, response: Response) -> AsyncEngine:
+    routing_stats["writes"] += 1
+    if get_read_engine() is not None:
+        mark_write(request, response)
+    return get_engine()
@@ -0,0 +1,162 @@
+"""
+In-process pub/sub for live updates (routers/events.py streams it as SSE).
+
+The write paths publish small deltas after their transaction commits:
+
+    entry.saved / entry.visibility / entry.note_added / entry.deleted   routers/entries.py
+    whoop.records / whoop.deleted                                       routers/whoop.py (sync, webhooks)
+    sync.started / sync.progress / sync.finished / sync.failed          routers/whoop.py, core/whoop_jobs.py
+
+Events are per user; ids are "<instance epoch>-<n>". Each user keeps the last
+EVENTS_REPLAY_BUFFER events, so a client that reconnects with Last-Event-ID
+gets what it missed. When that can't be done — the buffer no longer reaches
+back far enough, the id is from another instance or before a restart, or the
+client fell EVENTS_QUEUE_SIZE events behind — it gets a single "resync" event
+instead and should refetch rather than trust its state.
+
+The hub only sees this instance's writes: with several instances behind a
+load balancer, a client hears about the writes that went through the one it
+is connected to.
+"""
+import asyncio
+import secrets
+import itertools
+from collections import deque
+from typing import Optional
+from uuid import UUID
+from core.config import EVENTS_QUEUE_SIZE, EVENTS_REPLAY_BUFFER, EVENTS_MAX_SUBSCRIBERS
+
+
+class Event:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, event_id: int, event_type: str, data: dict):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+
+class Subscription:
+    """One connected client: a bounded queue the hub pushes into."""
+
+    def __init__(self, user_id: UUID, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, event: Event):
+        if self.queue.full():
+            # Slow client: what's queued is stale once anything is lost, so swap it all for one resync
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event(event.id, "resync", {"dropped": self.dropped}))
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """The next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    def __init__(
+        self,
+        queue_size: int = EVENTS_QUEUE_SIZE,
+        replay_size: int = EVENTS_REPLAY_BUFFER,
+        max_subscribers: int = EVENTS_MAX_SUBSCRIBERS,
+    ):
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.max_subscribers = max_subscribers
+        self.epoch = secrets.token_hex(4)
+        self._ids = itertools.count(1)
+        self._subscribers = {}  # user id → set of Subscription
+        self._recent = {}  # user id → deque of the latest events
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    # ---------- publishing ----------
+    def publish(self, user_id: UUID, event_type: str, data: dict):
+        """
+        Send `data` to the user's subscribers. Never blocks and never raises for
+        slow clients; safe to call from worker threads (sync routes).
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._loop is None:
+            self._loop = loop
+        if loop is self._loop or self._loop is None:
+            self._publish(user_id, event_type, data)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._publish, user_id, event_type, data)
+
+    def _publish(self, user_id, event_type, data):
+        event = Event(next(self._ids), event_type, data)
+        recent = self._recent.get(user_id)
+        if recent is None:
+            recent = self._recent[user_id] = deque(maxlen=self.replay_size)
+        recent.append(event)
+        self.published += 1
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.push(event)
+
+    # ---------- subscribing ----------
+    def event_id(self, event: Event) -> str:
+        return f"{self.epoch}-{event.id}"
+
+    def _missed(self, user_id, last_event_id: str) -> Optional[list]:
+        """The user's events after `last_event_id`, or None if they can't all be replayed."""
+        epoch, _, n = last_event_id.partition("-")
+        if epoch != self.epoch or not n.isdigit():
+            return None
+        n = int(n)
+        recent = self._recent.get(user_id, ())
+        if len(recent) == self.replay_size and recent[0].id > n:
+            return None  # the buffer has rolled past events that may have come after n
+        return [e for e in recent if e.id > n]
+
+    def subscribe(self, user_id: UUID, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a client. With `last_event_id` (the SSE Last-Event-ID header) the
+        user's buffered events after it are queued first, or a "resync" if they can't be.
+        """
+        if self.subscriber_count >= self.max_subscribers:
+            raise OverflowError("Too many live event subscribers")
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.queue_size)
+        if last_event_id:
+            missed = self._missed(user_id, last_event_id)
+            if missed is None:
+                subscription.push(Event(next(self._ids), "resync", {"dropped": None}))
+            else:
+                for event in missed:
+                    subscription.push(event)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+    def stats(self):
+        return {
+            "subscribers": self.subscriber_count,
+            "users": len(self._subscribers),
+            "published": self.published,
+        }
+
+
+event_hub = EventHub()
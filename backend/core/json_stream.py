@@ -0,0 +1,97 @@
+import json
+from typing import Iterator, TextIO
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]}:"
+
+
+def _is_number(item) -> bool:
+    return isinstance(item, (int, float)) and not isinstance(item, bool)
+
+
+def iter_object_arrays(fp: TextIO, chunk_size: int = 1 << 16) -> Iterator[tuple]:
+    """
+    Stream a top-level {"key": [item, ...], ...} JSON document (like
+    whoop_full_data.json), yielding (key, item) one array item at a time.
+    Only the current item is held in memory; non-array values are skipped.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek():
+        """Next non-whitespace character (reading more as needed), or '' at EOF."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    def expect(ch):
+        nonlocal pos
+        found = peek()
+        if found != ch:
+            raise ValueError(f"Expected {ch!r} in JSON stream, found {found!r}")
+        pos += 1
+
+    def value():
+        """
+        Decode one complete value at pos. A value ending at the buffer edge may be
+        truncated, and so may a number followed by anything but a delimiter
+        ("2." of "2.5", "1e" of "1e3"), so read more and decode again.
+        """
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+                if eof or (end < len(buf) and (not _is_number(item) or buf[end] in _DELIMITERS)):
+                    pos = end
+                    return item
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    expect("{")
+    if peek() == "}":
+        return
+    while True:
+        key = value()
+        expect(":")
+        if peek() == "[":
+            pos += 1
+            if peek() == "]":
+                pos += 1
+            else:
+                while True:
+                    yield key, value()
+                    sep = peek()
+                    pos += 1
+                    if sep == "]":
+                        break
+                    if sep != ",":
+                        raise ValueError(f"Expected ',' or ']' in JSON array, found {sep!r}")
+        else:
+            value()
+
+        sep = peek()
+        pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or '}}' in JSON object, found {sep!r}")
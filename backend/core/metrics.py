@@ -0,0 +1,93 @@
+import threading
+
+# Seconds; fine enough at the low end for pool checkouts, wide enough for slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram in seconds, Prometheus style: snapshot()
+    reports cumulative counts per upper bound ("le"), plus count/sum/max.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation (None if empty or in +Inf)."""
+        with self._lock:
+            counts, total = list(self._counts), self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, n in zip(self.buckets, counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count, total, peak = self.count, self.sum, self.max
+        cumulative = {}
+        running = 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "max": round(peak, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+# =====================================================
+# 📤 Prometheus text format
+# =====================================================
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_histogram(name: str, histogram: Histogram, labels: dict = None) -> list:
+    """Sample lines (_bucket/_sum/_count) for one labelled histogram; the caller writes # HELP/# TYPE once."""
+    labels = labels or {}
+    snap = histogram.snapshot()
+    lines = [f"{name}_bucket{_labels({**labels, 'le': le})} {n}" for le, n in snap["buckets"].items()]
+    lines.append(f"{name}_sum{_labels(labels)} {snap['sum']}")
+    lines.append(f"{name}_count{_labels(labels)} {snap['count']}")
+    return lines
+
+
+def prometheus_sample(name: str, value, labels: dict = None) -> str:
+    return f"{name}{_labels(labels or {})} {value}"
@@ -0,0 +1,160 @@
+"""
+Versioned schema migrations: plain SQL files in backend/migrations, named
+NNNN_description.sql and applied in order. Each runs once, in its own
+transaction, and is recorded in schema_migrations with a checksum of its file.
+
+Startup (and `python -m scripts.migrate`) reads the applied versions in one
+query and only runs what's missing, so an up-to-date database costs a single
+SELECT per boot instead of create_all's per-table introspection.
+
+DB_SCHEMA_CHECK=cached (the default) goes one step further: once an instance
+has confirmed the current migrations against a database it leaves a marker
+file, and later boots (restarts, --reload) with the same migrations and the
+same database skip the round trip entirely.
+
+Concurrent runners (several app instances booting at once) serialize on a
+transaction-scoped advisory lock, which also works behind the transaction
+pooler, and re-check the version once they hold it.
+"""
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core.config import DB_SCHEMA_CHECK, DB_SCHEMA_CACHE_FILE
+from core.database import database_url, get_engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+LOCK_ID = 7_402_871_113  # arbitrary, shared by every runner
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version text PRIMARY KEY,
+    name text NOT NULL,
+    checksum text NOT NULL,
+    applied_at timestamptz NOT NULL DEFAULT now()
+)
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR):
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        version, _, name = path.stem.partition("_")
+        if not version.isdigit():
+            raise ValueError(f"Migration file '{path.name}' must start with a numeric version")
+        migrations.append(Migration(version, name, path.read_text()))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError("Duplicate migration versions in " + str(directory))
+    return migrations
+
+
+async def _driver_connection(conn):
+    # Migration files hold several statements; only asyncpg's simple-query execute() runs them in one call
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
+
+
+async def applied_versions(engine: AsyncEngine) -> dict:
+    """version → checksum of everything already applied."""
+    async with engine.connect() as conn:
+        driver = await _driver_connection(conn)
+        if not await driver.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL"):
+            async with driver.transaction():
+                # IF NOT EXISTS alone still races when two instances create it at once
+                await driver.execute(f"SELECT pg_advisory_xact_lock({LOCK_ID})")
+                await driver.execute(_CREATE_TABLE)
+        rows = await driver.fetch("SELECT version, checksum FROM schema_migrations")
+    return {r["version"]: r["checksum"] for r in rows}
+
+
+async def status(engine: AsyncEngine):
+    """[(migration, "applied" | "pending" | "changed")] for every file on disk."""
+    applied = await applied_versions(engine)
+    out = []
+    for m in load_migrations():
+        if m.version not in applied:
+            state = "pending"
+        elif applied[m.version] != m.checksum:
+            state = "changed"
+        else:
+            state = "applied"
+        out.append((m, state))
+    return out
+
+
+async def migrate(engine: AsyncEngine, log=print):
+    """Apply pending migrations in order; returns the versions this call applied."""
+    applied = await applied_versions(engine)
+    done = []
+    for m in load_migrations():
+        if m.version in applied:
+            if applied[m.version] != m.checksum:
+                log(f"⚠️ Migration {m.version}_{m.name} changed after it was applied — add a new one instead")
+            continue
+        async with engine.connect() as conn:
+            driver = await _driver_connection(conn)
+            async with driver.transaction():
+                await driver.execute(f"SELECT pg_advisory_xact_lock({LOCK_ID})")
+                if await driver.fetchval("SELECT 1 FROM schema_migrations WHERE version = $1", m.version):
+                    continue  # another instance got here first
+                await driver.execute(m.sql)
+                await driver.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                    m.version, m.name, m.checksum,
+                )
+        log(f"🧱 Applied migration {m.version}_{m.name}")
+        done.append(m.version)
+    return done
+
+
+# =====================================================
+# 🚀 Startup
+# =====================================================
+def schema_fingerprint(url: str, migrations=None) -> str:
+    """Which database (not credentials) plus every migration's checksum."""
+    url = make_url(url)
+    parts = [f"{url.host}:{url.port}/{url.database}?{url.query.get('host', '')}"]
+    parts += [f"{m.version}:{m.checksum}" for m in (migrations or load_migrations())]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+async def ensure_schema(check: str = DB_SCHEMA_CHECK, cache_file: str = DB_SCHEMA_CACHE_FILE, log=print):
+    """
+    The app's startup check: "always" runs migrate(), "cached" skips it when the
+    marker matches, "never" does nothing. Returns what it did. A cache hit never
+    builds the engine, so the first pool connection waits for the first request.
+    """
+    if check not in ("always", "cached", "never"):
+        raise ValueError(f"Unknown DB_SCHEMA_CHECK '{check}' (use always, cached or never)")
+    if check == "never":
+        return "skipped"
+
+    fingerprint = schema_fingerprint(database_url())
+    if check == "cached":
+        try:
+            with open(cache_file) as f:
+                if f.read().strip() == fingerprint:
+                    return "cached"
+        except OSError:
+            pass
+
+    await migrate(get_engine(), log=log)
+    try:
+        with open(cache_file, "w") as f:
+            f.write(fingerprint + "\n")
+    except OSError as e:
+        log(f"⚠️ Could not write schema cache {cache_file}: {e}")
+    return "checked"
@@ -0,0 +1,139 @@
+"""
+Yearly partitions of the date-ordered history tables (migrations/0004_partitions.sql).
+
+Rows for a year without a partition still land in <table>_default, so a missing
+partition never fails a write — it only costs pruning. ensure_partitions()
+keeps that rare: it creates the current year plus PARTITION_YEARS_AHEAD, and
+any year that has rows sitting in a default partition (an import of old
+history), moving them out. PartitionMaintainer runs it in the background at
+startup and every PARTITION_MAINTENANCE_INTERVAL_SECONDS, so a long-running
+instance rolls over into the new year without a deploy.
+
+Archiving an old year is detach_year(): the partition becomes a plain table
+(<table>_<year>) that can be dumped and dropped without touching the live one.
+"""
+import asyncio
+from datetime import date
+from typing import Iterable, Optional
+from sqlalchemy import text
+from core.config import PARTITION_YEARS_AHEAD, PARTITION_MAINTENANCE_INTERVAL_SECONDS
+from core.database import get_engine
+
+# partitioned table → the date column its yearly ranges are on
+PARTITIONED_TABLES = {
+    "daily_entries": "date",
+    "whoop_recovery": "record_date",
+    "whoop_sleep": "record_date",
+    "whoop_workouts": "record_date",
+}
+
+
+def _check(table):
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"'{table}' is not a partitioned table")
+    return PARTITIONED_TABLES[table]
+
+
+# =====================================================
+# 🧱 Creating
+# =====================================================
+async def ensure_partitions(engine=None, years: Iterable[int] = (), years_ahead: int = PARTITION_YEARS_AHEAD) -> list:
+    """
+    Create the missing yearly partitions of every table: this year through
+    `years_ahead`, any extra `years`, and years found in a default partition.
+    Returns the names of the partitions it created.
+    """
+    this_year = date.today().year
+    wanted = set(range(this_year, this_year + years_ahead + 1)) | set(years)
+    created = []
+    async with (engine or get_engine()).begin() as conn:
+        for table, column in PARTITIONED_TABLES.items():
+            stray = await conn.execute(text(
+                f'SELECT DISTINCT extract(year FROM "{column}")::int FROM {table}_default WHERE "{column}" IS NOT NULL'
+            ))
+            result = await conn.execute(
+                text("SELECT ensure_year_partitions(:t, :c, :y)"),
+                {"t": table, "c": column, "y": sorted(wanted | {r[0] for r in stray})},
+            )
+            created += [r[0] for r in result]
+    return created
+
+
+# =====================================================
+# 📋 Inspecting / archiving
+# =====================================================
+async def list_partitions(engine=None) -> list:
+    """One dict per partition: table, partition, bounds, estimated rows and on-disk size."""
+    async with (engine or get_engine()).connect() as conn:
+        result = await conn.execute(text(
+            """
+            SELECT p.relname AS "table", c.relname AS partition,
+                   pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                   greatest(c.reltuples, 0)::bigint AS rows_estimate,
+                   pg_total_relation_size(c.oid) AS bytes
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = ANY(:tables)
+            ORDER BY p.relname, c.relname
+            """
+        ), {"tables": list(PARTITIONED_TABLES)})
+        return [dict(r) for r in result.mappings()]
+
+
+async def detach_year(table: str, year: int, engine=None) -> Optional[str]:
+    """
+    Detach one year's partition; it stays in the database as a standalone table
+    to dump and drop. Returns its name, or None if that year has no partition.
+    """
+    _check(table)
+    name = f"{table}_{year}"
+    async with (engine or get_engine()).begin() as conn:
+        if (await conn.execute(text("SELECT to_regclass(:n)"), {"n": name})).scalar() is None:
+            return None
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    return name
+
+
+# =====================================================
+# ⏰ Background maintenance
+# =====================================================
+class PartitionMaintainer:
+    """Runs ensure_partitions() now and then every `interval` seconds. Never raises."""
+
+    def __init__(self, interval: int = PARTITION_MAINTENANCE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.last_created = []
+        self.last_error = None
+
+    async def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self):
+        try:
+            self.last_created = await ensure_partitions()
+            self.last_error = None
+            if self.last_created:
+                print(f"🧱 Created partitions {', '.join(self.last_created)}")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Partition maintenance failed: {e}")
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+
+partition_maintainer = PartitionMaintainer()
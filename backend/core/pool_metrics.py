@@ -0,0 +1,134 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.metrics import Histogram
+from core.timing import add_span
+
+
+class PoolMetrics:
+    """
+    Live counters for one engine's connection pool, fed by SQLAlchemy pool
+    events plus a pool subclass that times checkouts (there is no
+    "checkout started" event to measure the wait from).
+
+        metrics = PoolMetrics("primary", pre_ping="idle", ping_idle_seconds=30)
+        engine = create_async_engine(url, poolclass=metrics.pool_class(), ...)
+        metrics.attach(engine)
+    """
+
+    def __init__(self, name: str, pre_ping: str = "always", ping_idle_seconds: float = 30.0):
+        if pre_ping not in ("always", "idle", "never"):
+            raise ValueError(f"Unknown pre-ping strategy '{pre_ping}' (use always, idle or never)")
+        self.name = name
+        self.pre_ping = pre_ping
+        self.ping_idle_seconds = ping_idle_seconds
+        self.engine = None
+        self.checkout_wait = Histogram()
+        self.hold_time = Histogram()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_errors = 0
+        self.pings = 0
+        self.disconnects = 0
+        self.invalidations = 0
+        self.closes = 0
+
+    # =====================================================
+    # 🔌 Wiring
+    # =====================================================
+    def pool_class(self):
+        """AsyncAdaptedQueuePool subclass that records checkout waits here (survives pool.recreate())."""
+        metrics = self
+
+        class TimedQueuePool(AsyncAdaptedQueuePool):
+            def connect(self):
+                started = time.perf_counter()
+                try:
+                    return super().connect()
+                except Exception:
+                    metrics.checkout_errors += 1
+                    raise
+                finally:
+                    waited = time.perf_counter() - started
+                    metrics.checkout_wait.observe(waited)
+                    add_span("pool", waited)  # ⏱️ checkout (and first connect) shows up in Server-Timing
+
+        return TimedQueuePool
+
+    def attach(self, engine):
+        """Listen on the engine's pool events; pass the AsyncEngine or its sync_engine."""
+        target = getattr(engine, "sync_engine", engine)
+        self.engine = target
+        dialect = target.dialect
+
+        @event.listens_for(target, "connect")
+        def on_connect(dbapi_connection, record):
+            self.connects += 1
+
+        @event.listens_for(target, "checkout")
+        def on_checkout(dbapi_connection, record, proxy):
+            now = time.perf_counter()
+            idle_since = record.info.get("checked_in_at")
+            if self.pre_ping == "idle" and idle_since is not None and now - idle_since > self.ping_idle_seconds:
+                self.pings += 1
+                try:
+                    dialect.do_ping(dbapi_connection)
+                except Exception as e:
+                    # The pool discards this connection and retries the checkout with a fresh one
+                    self.disconnects += 1
+                    raise DisconnectionError(f"Stale pooled connection: {e}") from e
+            self.checkouts += 1
+            record.info["checked_out_at"] = now
+
+        @event.listens_for(target, "checkin")
+        def on_checkin(dbapi_connection, record):
+            now = time.perf_counter()
+            self.checkins += 1
+            started = record.info.pop("checked_out_at", None)
+            if started is not None:
+                self.hold_time.observe(now - started)
+            record.info["checked_in_at"] = now
+
+        @event.listens_for(target, "invalidate")
+        def on_invalidate(dbapi_connection, record, exception):
+            self.invalidations += 1
+
+        @event.listens_for(target, "close")
+        def on_close(dbapi_connection, record):
+            self.closes += 1
+
+        return self
+
+    # =====================================================
+    # 📊 Report
+    # =====================================================
+    def snapshot(self):
+        pool = self.engine.pool if self.engine is not None else None
+        live = {}
+        if pool is not None and hasattr(pool, "checkedout"):
+            live = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "recycle": pool._recycle,
+            }
+        return {
+            "name": self.name,
+            "pre_ping": self.pre_ping,
+            "pool": live,
+            "connections_created": self.connects,
+            "connections_closed": self.closes,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "checkout_errors": self.checkout_errors,
+            "pings": self.pings,
+            "stale_disconnects": self.disconnects,
+            "invalidations": self.invalidations,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "hold_seconds": self.hold_time.snapshot(),
+        }
@@ -0,0 +1,185 @@
+"""
+On-demand request profiler.
+
+An admin request with ?profile=1 (or an X-Profile: 1 header) runs under a
+stdlib sampling profiler: a background thread reads the stacks of the event
+loop thread (and of worker threads while they are in app code, for sync
+handlers) every PROFILE_INTERVAL_MS. The stacks are stored as folded lines,
+ready for flamegraph.pl or speedscope:
+
+    ...;fastapi/routing.py:app;routers/charts.py:get_whoop_charts;routers/charts.py:safe_float 37
+
+The response says where to fetch it (X-Profile-Id → /debug/profiles/{id}).
+Without the flag the middleware only checks a header and the query string;
+nothing is sampled. Only one request is profiled at a time — the event loop
+thread also runs other requests meanwhile, and their stacks land in the same
+profile, so profile on a quiet instance when you can.
+
+The sampler needs the GIL to read stacks, so while the loop runs Python code
+without releasing it, samples come at most every sys.getswitchinterval()
+(5 ms by default) whatever PROFILE_INTERVAL_MS says — "samples" in the
+profile is the real count. The switch interval is process-wide, and lowering
+it would change thread scheduling for every other request, so it is left alone.
+"""
+import os
+import sys
+import time
+import uuid
+import threading
+from collections import Counter, OrderedDict
+from urllib.parse import parse_qs
+from datetime import datetime, timezone
+from starlette.datastructures import MutableHeaders
+from core.admin import is_admin_token
+from core.config import PROFILE_INTERVAL_MS, PROFILE_BUFFER
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+LOOP_FRAME = "events.py:_run"  # asyncio Handle._run: everything above it is uvicorn/asyncio plumbing
+IDLE_FRAME = "selectors.py:select"
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(APP_ROOT):
+        path = path[len(APP_ROOT):]
+    elif "site-packages" + os.sep in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples thread stacks into folded-stack counts until stop()."""
+
+    def __init__(self, target_thread_id: int, interval: float):
+        self.target = target_thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_ROOT)
+                    stack.append(_frame_label(code))
+                    frame = frame.f_back
+                # Worker threads only count while running app code (a sync handler), not idling in the pool
+                if thread_id == self.target or in_app:
+                    self.counts[self._fold(stack[::-1])] += 1
+
+    @staticmethod
+    def _fold(stack) -> str:
+        if stack and stack[-1] == IDLE_FRAME:
+            return "(event loop idle — awaiting I/O)"
+        if LOOP_FRAME in stack:
+            stack = stack[stack.index(LOOP_FRAME) + 1:]
+        return ";".join(stack)
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.counts.most_common()) + "\n"
+
+
+class ProfileStore:
+    """The last PROFILE_BUFFER profiles, by id."""
+
+    def __init__(self, size: int = PROFILE_BUFFER):
+        self.size = max(1, size)
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict):
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "folded"} for p in reversed(self._profiles.values())]
+
+
+profile_store = ProfileStore()
+_busy = threading.Lock()
+
+
+def _wants_profile(scope) -> bool:
+    query = scope.get("query_string", b"")
+    if b"profile" in query and "1" in parse_qs(query.decode("latin-1")).get("profile", ()):
+        return True
+    return any(name == b"x-profile" and value == b"1" for name, value in scope.get("headers", ()))
+
+
+def _admin_token(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"x-admin-token":
+            return value.decode("latin-1")
+    return None
+
+
+# =====================================================
+# 🔬 Middleware
+# =====================================================
+class ProfilerMiddleware:
+    def __init__(self, app, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.app = app
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope) or not is_admin_token(_admin_token(scope)):
+            await self.app(scope, receive, send)
+            return
+        if not _busy.acquire(blocking=False):
+            await self.app(scope, receive, self._with_header(send, "X-Profile", "busy"))
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        started = time.perf_counter()
+        profiler = SamplingProfiler(threading.get_ident(), self.interval).start()
+        try:
+            await self.app(scope, receive, self._with_header(send, "X-Profile-Id", profile_id))
+        finally:
+            profiler.stop()
+            _busy.release()
+            profile_store.add({
+                "id": profile_id,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "interval_ms": self.interval * 1000,
+                "samples": profiler.samples,
+                "folded": profiler.folded(),
+            })
+
+    @staticmethod
+    def _with_header(send, name, value):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(name, value)
+            await send(message)
+
+        return wrapped
@@ -0,0 +1,292 @@
+"""
+Registry of the hot SQL statements used by routers/entries.py, charts.py,
+attribute_definitions.py and core/users.py. Every statement on user data is
+scoped by :u (the request's user, core.users.current_user). Each statement is declared once, under a name, as a
+module-level text() construct, so every execution sends byte-identical SQL:
+
+  - session mode: asyncpg's named prepared statements hit the per-connection
+    cache and Postgres skips parse/plan after the first run
+  - transaction mode (pgbouncer): statements go out unnamed inside the
+    transaction, which is the only thing the pooler allows
+  - transaction mode + DIRECT_CONNECTION_STRING: reads (core.db_routing.read_db)
+    go to a small direct pool where named statements are cached again
+
+core.database decides which applies; scripts/bench_prepared_statements.py
+measures the planning time it saves.
+"""
+from functools import lru_cache
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+
+class QueryRegistry:
+    def __init__(self):
+        self._statements = {}
+
+    def register(self, name: str, sql: str) -> TextClause:
+        if name in self._statements:
+            raise ValueError(f"Query '{name}' is already registered")
+        statement = text(sql)
+        self._statements[name] = statement
+        return statement
+
+    def get(self, name: str) -> TextClause:
+        return self._statements[name]
+
+    def items(self):
+        return list(self._statements.items())
+
+
+registry = QueryRegistry()
+query = registry.register
+
+
+# =====================================================
+# 🧩 Entries
+# =====================================================
+_ENTRY_COLUMNS = """
+    e.id,
+    e.date,
+    e.day_period,
+    e.visibility,
+    e.notes,
+    e.created_at,
+    COALESCE(
+        (
+            SELECT json_agg(
+                json_build_object(
+                    'name', a.name,
+                    'value', a.value,
+                    'unit', a.unit,
+                    'note', a.note
+                )
+                ORDER BY a.name
+            )
+            FROM entry_attributes a
+            WHERE a.user_id = e.user_id AND a.entry_id = e.id
+        ),
+        '[]'
+    ) AS attributes,
+    COALESCE(
+        (
+            SELECT json_agg(
+                json_build_object(
+                    'id', n.id,
+                    'content', n.content,
+                    'created_at', n.created_at
+                )
+                ORDER BY n.created_at ASC
+            )
+            FROM entry_notes n
+            WHERE n.user_id = e.user_id AND n.entry_id = e.id
+        ),
+        '[]'
+    ) AS notes
+"""
+
+# Keyed by the unique (user_id, date, day_period) index, so concurrent saves of the same entry can't race
+ENTRY_UPSERT = query(
+    "entries.upsert",
+    """
+    INSERT INTO daily_entries (user_id, date, day_period, visibility, notes)
+    VALUES (:u, :d, :p, :v, :n)
+    ON CONFLICT (user_id, date, day_period) DO UPDATE
+    SET visibility = EXCLUDED.visibility, notes = EXCLUDED.notes
+    RETURNING id
+    """,
+)
+ENTRY_INSERT_NEW = query(
+    "entries.insert_new",
+    """
+    INSERT INTO daily_entries (user_id, date, day_period, visibility, notes)
+    VALUES (:u, :d, :p, :v, :n)
+    ON CONFLICT (user_id, date, day_period) DO NOTHING
+    RETURNING id
+    """,
+)
+ENTRY_ATTRIBUTES_DELETE = query(
+    "entries.attributes_delete",
+    "DELETE FROM entry_attributes WHERE user_id = :u AND entry_id = :eid",
+)
+ENTRY_ATTRIBUTE_INSERT = query(
+    "entries.attribute_insert",
+    """
+    INSERT INTO entry_attributes (user_id, entry_id, entry_date, name, value, unit, note)
+    VALUES (:u, :eid, :ed, :name, :value, :unit, :note)
+    """,
+)
+ENTRY_GET = query(
+    "entries.get",
+    f"SELECT {_ENTRY_COLUMNS} FROM daily_entries e WHERE e.user_id = :u AND e.id = :id",
+)
+ENTRY_SET_VISIBILITY = query(
+    "entries.set_visibility",
+    """
+    UPDATE daily_entries
+    SET visibility = :v
+    WHERE user_id = :u AND id = :id
+    RETURNING id, visibility
+    """,
+)
+# The entry's date: children store it for their (user_id, entry_date, entry_id) foreign key
+ENTRY_DATE = query(
+    "entries.date",
+    "SELECT date FROM daily_entries WHERE user_id = :u AND id = :id",
+)
+ENTRY_NOTE_INSERT = query(
+    "entries.note_insert",
+    """
+    INSERT INTO entry_notes (user_id, entry_id, entry_date, content)
+    VALUES (:u, :eid, :ed, :content)
+    RETURNING id, content, created_at
+    """,
+)
+ENTRY_NOTES_DELETE = query(
+    "entries.notes_delete",
+    "DELETE FROM entry_notes WHERE user_id = :u AND entry_id = :id",
+)
+ENTRY_DELETE = query(
+    "entries.delete",
+    "DELETE FROM daily_entries WHERE user_id = :u AND id = :id",
+)
+
+
+@lru_cache(maxsize=None)
+def list_entries(visibility: bool, date_from: bool, date_to: bool) -> TextClause:
+    """
+    One registered statement per combination of filters (8 at most), rather
+    than "(:x IS NULL OR ...)" catch-alls that a cached generic plan handles badly.
+    A date bound also prunes daily_entries to the yearly partitions it covers.
+    """
+    clauses = ["e.user_id = :u"]
+    if visibility:
+        clauses.append("e.visibility = :vis")
+    if date_from:
+        clauses.append("e.date >= :df")
+    if date_to:
+        clauses.append("e.date <= :dt")
+    where_clause = "WHERE " + " AND ".join(clauses)
+    name = "entries.list[" + ",".join(k for k, on in (("vis", visibility), ("df", date_from), ("dt", date_to)) if on) + "]"
+    return query(
+        name,
+        f"""
+        SELECT {_ENTRY_COLUMNS}
+        FROM daily_entries e
+        {where_clause}
+        ORDER BY e.date DESC,
+                 CASE WHEN e.day_period = 'am' THEN 0 ELSE 1 END,
+                 e.created_at ASC
+        LIMIT :limit OFFSET :offset
+        """,
+    )
+
+
+# =====================================================
+# 📊 Charts
+# =====================================================
+_CHART_SELECTS = {
+    "recovery": """
+        SELECT record_date, recovery_score, resting_heart_rate, hrv_rmssd_milli,
+               spo2_percentage, skin_temp_celsius
+        FROM whoop_recovery
+    """,
+    "sleep": """
+        SELECT record_date, sleep_performance_percentage, sleep_efficiency_percentage,
+               rem_sleep_hours, deep_sleep_hours, respiratory_rate,
+               EXTRACT(EPOCH FROM ("end" - "start")) / 3600 AS total_sleep_hours
+        FROM whoop_sleep
+    """,
+    "workouts": """
+        SELECT record_date, sport_name, strain, average_heart_rate, max_heart_rate,
+               kilojoule, distance_meter, altitude_gain_meter
+        FROM whoop_workouts
+    """,
+}
+
+
+@lru_cache(maxsize=None)
+def chart_queries(date_from: bool, date_to: bool) -> dict:
+    """
+    resource → statement, one registered set per combination of date bounds.
+    A bound on record_date (the partition key) limits the scan to the years it
+    covers: at plan time, or at executor start once a generic plan is cached.
+    """
+    clauses = ["user_id = :u", "record_date IS NOT NULL"]
+    if date_from:
+        clauses.append("record_date >= :df")
+    if date_to:
+        clauses.append("record_date <= :dt")
+    where_clause = "WHERE " + " AND ".join(clauses)
+    suffix = "[" + ",".join(k for k, on in (("df", date_from), ("dt", date_to)) if on) + "]"
+    return {
+        resource: query(f"charts.{resource}{suffix}", f"{select}{where_clause}\n    ORDER BY record_date ASC")
+        for resource, select in _CHART_SELECTS.items()
+    }
+
+
+# =====================================================
+# 🏷️ Attribute definitions
+# =====================================================
+ATTRIBUTES_LIST = query(
+    "attribute_definitions.list",
+    """
+    SELECT
+        id,
+        name,
+        label,
+        unit,
+        category,
+        active,
+        default_visible,
+        weight,
+        day_period,
+        created_at
+    FROM attribute_definitions
+    WHERE user_id = :u
+    ORDER BY category, day_period, label
+    """,
+)
+ATTRIBUTE_INSERT = query(
+    "attribute_definitions.insert",
+    """
+    INSERT INTO attribute_definitions
+        (user_id, name, label, unit, category, active, default_visible, weight, day_period)
+    VALUES
+        (:u, :name, :label, :unit, :category, :active, :default_visible, :weight, :day_period)
+    RETURNING id
+    """,
+)
+ATTRIBUTE_UPDATE = query(
+    "attribute_definitions.update",
+    """
+    UPDATE attribute_definitions
+    SET
+        name = :name,
+        label = :label,
+        unit = :unit,
+        category = :category,
+        active = :active,
+        default_visible = :default_visible,
+        weight = :weight,
+        day_period = :day_period
+    WHERE user_id = :u AND id = :id
+    RETURNING id
+    """,
+)
+ATTRIBUTE_DELETE = query(
+    "attribute_definitions.delete",
+    "DELETE FROM attribute_definitions WHERE user_id = :u AND id = :id",
+)
+
+
+# =====================================================
+# 👥 Users
+# =====================================================
+USER_BY_API_KEY = query(
+    "users.by_api_key",
+    "SELECT id FROM users WHERE api_key_hash = :h",
+)
+OTHER_USERS_EXIST = query(
+    "users.others_exist",
+    "SELECT EXISTS (SELECT 1 FROM users WHERE id <> :owner)",
+)
@@ -0,0 +1,172 @@
+"""
+Sampling slow-query log.
+
+Every engine from core.database gets cursor hooks that compare each
+statement's duration with DB_SLOW_QUERY_MS; below it the cost is two
+perf_counter() calls. A slow statement is recorded in a ring buffer with its
+SQL, the shape of its parameters (types and sizes — never values), duration
+and the request path it ran under.
+
+A DB_SLOW_QUERY_EXPLAIN_RATE share of them is re-run in the background under
+EXPLAIN on a separate pooled connection of the same engine, so the request
+that was slow doesn't wait on it:
+
+    SELECT / WITH   EXPLAIN (ANALYZE, BUFFERS), inside a READ ONLY
+                    transaction that is rolled back
+    anything else   plain EXPLAIN (ANALYZE would repeat the write)
+
+Only one EXPLAIN runs at a time; samples that arrive meanwhile are skipped.
+Read the buffer at /debug/slow-queries (routers/debug.py).
+"""
+import json
+import time
+import random
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import event
+from core.config import DB_SLOW_QUERY_MS, DB_SLOW_QUERY_EXPLAIN_RATE, DB_SLOW_QUERY_BUFFER
+from core.timing import current_timing
+
+READ_ONLY_PREFIXES = ("SELECT", "WITH")
+
+
+def parameter_shape(parameters, executemany: bool):
+    """Types (and lengths of strings / collections) of the bound parameters, never their values."""
+
+    def shape(value):
+        if value is None:
+            return "null"
+        name = type(value).__name__
+        if isinstance(value, (str, bytes, list, tuple, dict)):
+            return f"{name}({len(value)})"
+        return name
+
+    def row(params):
+        if isinstance(params, dict):
+            return {k: shape(v) for k, v in params.items()}
+        return [shape(v) for v in (params or ())]
+
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": row(rows[0]) if rows else None}
+    return row(parameters)
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = DB_SLOW_QUERY_MS,
+        explain_rate: float = DB_SLOW_QUERY_EXPLAIN_RATE,
+        size: int = DB_SLOW_QUERY_BUFFER,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self.entries = deque(maxlen=max(1, size))
+        self.recorded = 0
+        self.explained = 0
+        self.explain_skipped = 0
+        self.explain_errors = 0
+        self._explaining = False
+        self._tasks = set()
+
+    # =====================================================
+    # 🔌 Wiring
+    # =====================================================
+    def attach(self, engine, name: str = "primary"):
+        """Listen on an AsyncEngine's cursor executes (no-op when the threshold is 0)."""
+        if self.threshold <= 0:
+            return engine
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+            if elapsed >= self.threshold:
+                self.record(engine, name, statement, parameters, executemany, elapsed)
+
+        return engine
+
+    # =====================================================
+    # 🐢 Recording
+    # =====================================================
+    def record(self, engine, name, statement, parameters, executemany, elapsed):
+        timing = current_timing()
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "engine": name,
+            "path": timing.path if timing else None,
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": " ".join(statement.split()),
+            "parameters": parameter_shape(parameters, executemany),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        self.recorded += 1
+
+        if executemany or self.explain_rate <= 0 or random.random() >= self.explain_rate:
+            return
+        if self._explaining:
+            self.explain_skipped += 1
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync caller outside the event loop; nothing to schedule on
+        self._explaining = True
+        entry["plan"] = "pending"
+        task = loop.create_task(self._explain(engine, entry, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine, entry, statement, parameters):
+        read_only = statement.lstrip().upper().startswith(READ_ONLY_PREFIXES)
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if read_only else "FORMAT JSON"
+        args = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or ())
+        try:
+            async with engine.connect() as conn:
+                # The driver connection bypasses the cursor hooks, so the EXPLAIN never logs itself
+                driver = (await conn.get_raw_connection()).driver_connection
+                async with driver.transaction(readonly=read_only):
+                    plan = await driver.fetchval(f"EXPLAIN ({options}) {statement}", *args)
+                    raise _Rollback
+        except _Rollback:
+            pass
+        except Exception as e:
+            self.explain_errors += 1
+            entry["plan"] = None
+            entry["plan_error"] = str(e)
+            return
+        finally:
+            self._explaining = False
+        self.explained += 1
+        entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+        entry["plan_options"] = options
+
+    # =====================================================
+    # 📊 Report
+    # =====================================================
+    def snapshot(self, limit: int = None):
+        entries = list(self.entries)[::-1]  # newest first
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "explain_rate": self.explain_rate,
+            "recorded": self.recorded,
+            "explained": self.explained,
+            "explain_skipped": self.explain_skipped,
+            "explain_errors": self.explain_errors,
+            "entries": entries[:limit] if limit else entries,
+        }
+
+    def clear(self):
+        self.entries.clear()
+
+
+class _Rollback(Exception):
+    """Leaves the EXPLAIN transaction by rolling it back."""
+
+
+slow_query_log = SlowQueryLog()
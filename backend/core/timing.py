@@ -0,0 +1,167 @@
+"""
+Per-request latency accounting.
+
+    TimingMiddleware     times every HTTP request and records it per route
+                         (method + path template) in route_metrics; event
+                         streams get the header but aren't recorded
+    attach_query_timing  SQLAlchemy before/after_cursor_execute hooks that add
+                         each statement's time and count to the request it ran in
+    add_span(name, s)    optional named sections inside a handler
+
+Each response carries a Server-Timing header, e.g.
+
+    Server-Timing: db;dur=4.1;desc="3 queries", pool;dur=0.1, aggregate;dur=2.7, app;dur=1.9, total;dur=8.7
+
+pool (connection checkout, including opening a new connection) comes from
+core/pool_metrics.py, and app is whatever the other entries don't cover
+(routing, validation, serialization). routers/metrics.py exports the same
+numbers to Prometheus.
+"""
+import time
+import threading
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from core.metrics import Histogram
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"  # 404s etc. share one series instead of one per probed path
+# Server-sent event streams (/events) stay open for the life of the client; not request latency
+STREAMING_CONTENT_TYPE = "text/event-stream"
+
+
+class RequestTiming:
+    __slots__ = ("path", "started", "db_seconds", "queries", "spans")
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.spans = {}
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"']
+        parts += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()]
+        app = max(0.0, total - self.db_seconds - sum(self.spans.values()))
+        parts.append(f"app;dur={app * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+# Every statement, inside a request or not (scheduler, webhook worker)
+query_duration = Histogram()
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """The request being handled in this context, if any."""
+    return _current.get()
+
+
+def add_span(name: str, seconds: float):
+    """Add time to a named Server-Timing entry of the current request (no-op outside a request)."""
+    timing = _current.get()
+    if timing is not None:
+        timing.spans[name] = timing.spans.get(name, 0.0) + seconds
+
+
+# =====================================================
+# 🗄️ Query hooks
+# =====================================================
+def attach_query_timing(engine):
+    """Listen on an engine's cursor executes; pass the AsyncEngine or its sync_engine."""
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        query_duration.observe(elapsed)
+        timing = _current.get()
+        if timing is not None:
+            timing.db_seconds += elapsed
+            timing.queries += 1
+
+    return engine
+
+
+# =====================================================
+# 📊 Per-route stats
+# =====================================================
+class RouteStats:
+    def __init__(self):
+        self.duration = Histogram()
+        self.db = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.responses = {}  # status code → count
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, timing: RequestTiming):
+        key = (method, route)
+        stats = self._routes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._routes.setdefault(key, RouteStats())
+        stats.duration.observe(seconds)
+        stats.db.observe(timing.db_seconds)
+        stats.queries.observe(timing.queries)
+        with self._lock:
+            stats.responses[status] = stats.responses.get(status, 0) + 1
+
+    def items(self):
+        with self._lock:
+            return sorted(self._routes.items())
+
+
+route_metrics = RouteMetrics()
+
+
+# =====================================================
+# ⏱️ Middleware
+# =====================================================
+class TimingMiddleware:
+    """Pure ASGI middleware, so the timing context is visible to the handler and its queries."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(scope.get("path"))
+        token = _current.set(timing)
+        status = 500
+        streaming = False
+
+        async def send_with_timing(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                streaming = headers.get("content-type", "").startswith(STREAMING_CONTENT_TYPE)
+                headers.append(
+                    "Server-Timing", timing.server_timing(time.perf_counter() - timing.started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if not streaming:
+                route = scope.get("route")
+                path = getattr(route, "path", None) or UNMATCHED_ROUTE
+                route_metrics.observe(scope["method"], path, status, time.perf_counter() - timing.started, timing)
@@ -0,0 +1,99 @@
+"""
+Who a request belongs to.
+
+Every table carries a user_id (migrations/0003_users.sql) and every router
+query is scoped by the id current_user resolves:
+
+    Authorization: Bearer <api key>   the user whose sha256(key) is users.api_key_hash
+    no header                         the owner (OWNER_USER_ID) while nobody else exists, then 401
+                                      (USER_AUTH_REQUIRED=auto; "true" / "false" fix it either way)
+
+A key is looked up on the primary once and then cached for
+USER_KEY_CACHE_SECONDS, so a warm instance resolves it without a query.
+scripts/create_user.py adds users and issues their keys.
+"""
+import time
+import uuid
+import hashlib
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from core import queries as q
+from core.config import USER_AUTH_REQUIRED, USER_KEY_CACHE_SECONDS
+from core.database import get_engine
+
+# Fixed in migrations/0003_users.sql: the single user every pre-multi-user row belongs to
+OWNER_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+API_KEY_PREFIX = "lifeof_"
+KEY_CACHE_MAX = 10_000
+
+_key_cache = {}  # key hash → (user id or None, monotonic deadline)
+_others_exist = (False, 0.0)  # (any user besides the owner?, monotonic deadline)
+
+
+def hash_api_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def new_api_key() -> str:
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+async def user_for_key(key: str) -> Optional[uuid.UUID]:
+    """The user an API key belongs to (None if it belongs to nobody), cached per key."""
+    key_hash = hash_api_key(key)
+    now = time.monotonic()
+    cached = _key_cache.get(key_hash)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    async with get_engine().connect() as conn:
+        user_id = (await conn.execute(q.USER_BY_API_KEY, {"h": key_hash})).scalar()
+
+    if len(_key_cache) >= KEY_CACHE_MAX:
+        _key_cache.clear()  # unknown keys are cached too; don't let a flood of them grow this forever
+    _key_cache[key_hash] = (user_id, now + USER_KEY_CACHE_SECONDS)
+    return user_id
+
+
+async def other_users_exist() -> bool:
+    """Whether anyone besides the owner has been added, cached like API keys."""
+    global _others_exist
+    exists, deadline = _others_exist
+    now = time.monotonic()
+    if deadline > now:
+        return exists
+    async with get_engine().connect() as conn:
+        exists = bool((await conn.execute(q.OTHER_USERS_EXIST, {"owner": OWNER_USER_ID})).scalar())
+    # Once true it stays true: users aren't removed often enough to be worth re-checking
+    _others_exist = (exists, float("inf") if exists else now + USER_KEY_CACHE_SECONDS)
+    return exists
+
+
+async def auth_required() -> bool:
+    if USER_AUTH_REQUIRED == "auto":
+        return await other_users_exist()
+    return USER_AUTH_REQUIRED == "true"
+
+
+async def check_auth_mode():
+    """Startup: warn when requests without a key would act as the owner in a multi-user deployment."""
+    if USER_AUTH_REQUIRED == "false" and await other_users_exist():
+        print("⚠️ USER_AUTH_REQUIRED=false with several users: requests without an API key read and write the owner's data")
+
+
+# =====================================================
+# 💉 Dependency
+# =====================================================
+async def current_user(authorization: Optional[str] = Header(None)) -> uuid.UUID:
+    """The id every query of the request is scoped by."""
+    if not authorization:
+        if await auth_required():
+            raise HTTPException(401, "⚠️ API key required", headers={"WWW-Authenticate": "Bearer"})
+        return OWNER_USER_ID
+
+    scheme, _, key = authorization.partition(" ")
+    user_id = await user_for_key(key.strip()) if scheme.lower() == "bearer" and key.strip() else None
+    if user_id is None:
+        raise HTTPException(401, "⚠️ Invalid API key", headers={"WWW-Authenticate": "Bearer"})
+    return user_id
@@ -0,0 +1,242 @@
+import re
+import time
+import random
+import threading
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional
+from core.config import (
+    WHOOP_RATE_LIMIT_PER_MINUTE,
+    WHOOP_RATE_LIMIT_BURST,
+    WHOOP_MAX_PAGE_SIZE,
+    WHOOP_MAX_RETRIES,
+    WHOOP_RETRY_BACKOFF_BASE,
+    WHOOP_RETRY_BACKOFF_MAX,
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+# =====================================================
+# ❌ Errors
+# =====================================================
+class WhoopAPIError(Exception):
+    """A WHOOP request that still failed after retries."""
+
+    def __init__(self, status_code: int, detail: str, url: str = None):
+        super().__init__(f"WHOOP {status_code} for {url}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+        self.url = url
+
+
+class WhoopIncompleteError(WhoopAPIError):
+    """Pagination stopped early; carries how far it got so callers can report or resume."""
+
+    def __init__(self, cause: WhoopAPIError, records_fetched: int, pages_fetched: int, next_token: Optional[str]):
+        super().__init__(cause.status_code, cause.detail, cause.url)
+        self.records_fetched = records_fetched
+        self.pages_fetched = pages_fetched
+        self.next_token = next_token
+
+
+# =====================================================
+# 🪣 Token Bucket
+# =====================================================
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate_per_minute: int = WHOOP_RATE_LIMIT_PER_MINUTE, burst: int = WHOOP_RATE_LIMIT_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (server said the window is spent)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+def _first_int(value: Optional[str]):
+    match = re.match(r"\s*(\d+)", value or "")
+    return int(match.group(1)) if match else None
+
+
+def _retry_after_seconds(value: Optional[str]):
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    seconds = _first_int(value)
+    if seconds is not None and value.strip().isdigit():
+        return seconds
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+# =====================================================
+# 📡 WHOOP Client
+# =====================================================
+class WhoopClient:
+    """
+    Rate-limit aware WHOOP API client.
+    - paces requests with a token bucket and pauses when X-RateLimit-Remaining hits 0
+    - honors Retry-After / X-RateLimit-Reset on 429
+    - retries 5xx and connection errors with capped exponential backoff + jitter
+    - refreshes the access token once on 401
+    """
+
+    def __init__(
+        self,
+        get_tokens: Callable[[], dict],
+        refresh_tokens: Callable[[dict], dict],
+        bucket: Optional[TokenBucket] = None,
+        max_retries: int = WHOOP_MAX_RETRIES,
+        backoff_base: float = WHOOP_RETRY_BACKOFF_BASE,
+        backoff_max: float = WHOOP_RETRY_BACKOFF_MAX,
+    ):
+        self.get_tokens = get_tokens
+        self.refresh_tokens = refresh_tokens
+        self.bucket = bucket or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._session = None
+        self.requests_sent = 0
+        self.retries = 0
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session (connection pool), opened on the first request rather than at import."""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _observe_rate_limit(self, r):
+        remaining = _first_int(r.headers.get("X-RateLimit-Remaining"))
+        reset = _first_int(r.headers.get("X-RateLimit-Reset"))
+        if remaining == 0 and reset:
+            print(f"🚦 WHOOP rate limit window spent — pausing {reset}s")
+            self.bucket.pause(reset)
+
+    def get(self, url: str, params: Optional[dict] = None) -> requests.Response:
+        """GET with pacing and retries. Returns the 2xx/4xx response or raises WhoopAPIError."""
+        tokens = self.get_tokens()
+        refreshed = False
+        attempt = 0
+
+        while True:
+            self.bucket.acquire()
+            self.requests_sent += 1
+            try:
+                r = self.session.get(
+                    url,
+                    params=params,
+                    headers={"Authorization": f"Bearer {tokens['access_token']}"},
+                    timeout=30,
+                )
+            except requests.RequestException as e:
+                if attempt >= self.max_retries:
+                    raise WhoopAPIError(0, str(e), url)
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            self._observe_rate_limit(r)
+
+            if r.status_code == 401 and not refreshed:
+                print("⚠️ WHOOP token rejected, refreshing...")
+                tokens = self.refresh_tokens(tokens)
+                refreshed = True
+                continue
+
+            if r.status_code in RETRYABLE_STATUS:
+                if attempt >= self.max_retries:
+                    raise WhoopAPIError(r.status_code, r.text[:300], url)
+                wait = None
+                if r.status_code == 429:
+                    wait = _retry_after_seconds(r.headers.get("Retry-After"))
+                    if wait is None:
+                        wait = _first_int(r.headers.get("X-RateLimit-Reset"))
+                    if wait is not None:
+                        self.bucket.pause(wait)
+                if wait is None:
+                    wait = self._backoff(attempt)
+                print(f"🔁 WHOOP {r.status_code} on {url} — retry {attempt + 1}/{self.max_retries} in {wait:.1f}s")
+                self.retries += 1
+                time.sleep(wait)
+                attempt += 1
+                continue
+
+            return r
+
+    def get_json(self, url: str, params: Optional[dict] = None) -> dict:
+        r = self.get(url, params)
+        if r.status_code != 200:
+            raise WhoopAPIError(r.status_code, r.text[:300], url)
+        return r.json()
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        limit: int = WHOOP_MAX_PAGE_SIZE,
+        next_token: Optional[str] = None,
+        params: Optional[dict] = None,
+    ) -> Iterator[tuple]:
+        """
+        Yields (records, next_token) per page, following nextToken pagination.
+        Raises WhoopIncompleteError (with the token to resume from) if a page fails.
+        """
+        records_fetched = 0
+        pages_fetched = 0
+        while True:
+            page_params = {**(params or {}), "limit": min(limit, WHOOP_MAX_PAGE_SIZE)}
+            if next_token:
+                page_params["nextToken"] = next_token
+            try:
+                data = self.get_json(endpoint, page_params)
+            except WhoopAPIError as e:
+                raise WhoopIncompleteError(e, records_fetched, pages_fetched, next_token) from e
+
+            records = data.get("records", [])
+            next_token = data.get("next_token")
+            records_fetched += len(records)
+            pages_fetched += 1
+            yield records, next_token
+
+            if not next_token:
+                return
+
+    def fetch_all(self, endpoint: str, limit: int = WHOOP_MAX_PAGE_SIZE, params: Optional[dict] = None) -> list:
+        all_records = []
+        for records, _ in self.iter_pages(endpoint, limit, params=params):
+            all_records.extend(records)
+        return all_records
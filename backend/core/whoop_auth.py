@@ -0,0 +1,355 @@
+import os
+import glob
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+import tempfile
+import requests
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import text
+from core.config import (
+    WHOOP_CLIENT_ID,
+    WHOOP_CLIENT_SECRET,
+    WHOOP_TOKEN_URL,
+    WHOOP_API_BASE,
+    WHOOP_TOKEN_STORE,
+    WHOOP_TOKEN_FILE,
+    WHOOP_TOKEN_REFRESH_MARGIN,
+)
+from core.users import OWNER_USER_ID
+
+
+# =====================================================
+# 💾 Token Stores
+# =====================================================
+class TokenStore(ABC):
+    """Persists each user's WHOOP token payload. Subclasses must write atomically."""
+
+    @abstractmethod
+    async def load(self, user_id: UUID) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, user_id: UUID, tokens: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def user_ids(self) -> list:
+        """Users that have connected WHOOP."""
+
+    @abstractmethod
+    async def user_for_whoop_id(self, whoop_user_id: int) -> Optional[UUID]:
+        """The user whose tokens belong to this WHOOP account (webhooks only carry WHOOP's id)."""
+
+
+class FileTokenStore(TokenStore):
+    """
+    JSON files: the owner's in `path` (as before multi-user), anyone else's in
+    <path stem>.<user id><suffix> beside it. Writes go to a temp file and are
+    renamed into place.
+    """
+
+    def __init__(self, path: str = WHOOP_TOKEN_FILE):
+        self.path = path
+        self._stem, self._suffix = os.path.splitext(path)
+
+    def path_for(self, user_id: UUID) -> str:
+        if user_id == OWNER_USER_ID:
+            return self.path
+        return f"{self._stem}.{user_id}{self._suffix}"
+
+    def _read(self, user_id):
+        path = self.path_for(user_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write(self, user_id, tokens: dict):
+        path = self.path_for(user_id)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".whoop_tokens.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(tokens, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _user_ids(self):
+        found = [OWNER_USER_ID] if os.path.exists(self.path) else []
+        for path in glob.glob(f"{glob.escape(self._stem)}.*{glob.escape(self._suffix)}"):
+            try:
+                found.append(UUID(path[len(self._stem) + 1:len(path) - len(self._suffix)]))
+            except ValueError:
+                continue
+        return found
+
+    async def load(self, user_id):
+        return await asyncio.to_thread(self._read, user_id)
+
+    async def save(self, user_id, tokens):
+        await asyncio.to_thread(self._write, user_id, tokens)
+
+    async def user_ids(self):
+        return await asyncio.to_thread(self._user_ids)
+
+    async def user_for_whoop_id(self, whoop_user_id):
+        for user_id in await self.user_ids():
+            tokens = await self.load(user_id)
+            if tokens and tokens.get("whoop_user_id") == whoop_user_id:
+                return user_id
+        return None
+
+
+class PostgresTokenStore(TokenStore):
+    """One whoop_tokens row per user, upserted on the shared async engine."""
+
+    async def load(self, user_id):
+        from core.database import get_engine
+
+        async with get_engine().connect() as conn:
+            result = await conn.execute(
+                text("SELECT tokens FROM whoop_tokens WHERE user_id = :u"),
+                {"u": user_id},
+            )
+            value = result.scalar()
+        if isinstance(value, str):
+            value = json.loads(value)
+        return value
+
+    async def save(self, user_id, tokens):
+        from core.database import get_engine
+
+        async with get_engine().begin() as conn:
+            await conn.execute(
+                text("""
+                    INSERT INTO whoop_tokens (user_id, whoop_user_id, tokens, updated_at)
+                    VALUES (:u, :w, CAST(:tokens AS jsonb), now())
+                    ON CONFLICT (user_id) DO UPDATE
+                    SET whoop_user_id = EXCLUDED.whoop_user_id, tokens = EXCLUDED.tokens, updated_at = EXCLUDED.updated_at
+                """),
+                {"u": user_id, "w": tokens.get("whoop_user_id"), "tokens": json.dumps(tokens)},
+            )
+
+    async def user_ids(self):
+        from core.database import get_engine
+
+        async with get_engine().connect() as conn:
+            result = await conn.execute(text("SELECT user_id FROM whoop_tokens ORDER BY user_id"))
+            return [r[0] for r in result.fetchall()]
+
+    async def user_for_whoop_id(self, whoop_user_id):
+        from core.database import get_engine
+
+        async with get_engine().connect() as conn:
+            # The most recent link wins if one WHOOP account was connected by several users
+            result = await conn.execute(
+                text("""
+                    SELECT user_id FROM whoop_tokens
+                    WHERE whoop_user_id = :w
+                    ORDER BY updated_at DESC
+                    LIMIT 1
+                """),
+                {"w": whoop_user_id},
+            )
+            return result.scalar()
+
+
+def build_token_store(kind: str = WHOOP_TOKEN_STORE) -> TokenStore:
+    if kind == "file":
+        return FileTokenStore()
+    if kind == "postgres":
+        return PostgresTokenStore()
+    raise RuntimeError(f"❌ Unknown WHOOP_TOKEN_STORE '{kind}' (expected 'file' or 'postgres')")
+
+
+# =====================================================
+# 🔗 OAuth state
+# =====================================================
+def _state_signature(payload: str) -> str:
+    key = (WHOOP_CLIENT_SECRET or "").encode()
+    return hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def oauth_state(user_id: UUID) -> str:
+    """
+    The OAuth `state` for a user: WHOOP's redirect to the callback carries no
+    API key, so the state says (and the client secret signs) whose tokens they are.
+    """
+    payload = f"{user_id}.{secrets.token_urlsafe(12)}"
+    return f"{payload}.{_state_signature(payload)}"
+
+
+def user_from_state(state: Optional[str]) -> Optional[UUID]:
+    payload, _, signature = (state or "").rpartition(".")
+    if not payload or not hmac.compare_digest(_state_signature(payload), signature):
+        return None
+    try:
+        return UUID(payload.split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def fetch_whoop_user_id(access_token: Optional[str]) -> Optional[int]:
+    """The WHOOP account id behind an access token (webhooks carry only that), or None if the lookup fails."""
+    if not access_token:
+        return None
+    try:
+        res = requests.get(
+            f"{WHOOP_API_BASE}/user/profile/basic",
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=10,
+        )
+    except requests.RequestException as e:
+        print(f"⚠️ WHOOP profile lookup failed ({e}) — webhooks can't be routed to this user")
+        return None
+    if res.status_code != 200:
+        print(f"⚠️ WHOOP profile lookup failed ({res.status_code}) — webhooks can't be routed to this user")
+        return None
+    return res.json().get("user_id")
+
+
+# =====================================================
+# 🔐 Token Manager
+# =====================================================
+class WhoopTokenManager:
+    """
+    Caches one user's WHOOP tokens in memory and refreshes them before they expire.
+    Only one refresh runs at a time: the first caller starts it under the lock,
+    everyone else awaits the same future.
+    """
+
+    def __init__(self, store: TokenStore, user_id: UUID, refresh_margin: int = WHOOP_TOKEN_REFRESH_MARGIN):
+        self.store = store
+        self.user_id = user_id
+        self.refresh_margin = refresh_margin
+        self._tokens: Optional[dict] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._refresh_future: Optional[asyncio.Future] = None
+
+    async def _current(self):
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    self._tokens = await self.store.load(self.user_id)
+                    self._loaded = True
+        return self._tokens
+
+    def _needs_refresh(self, tokens):
+        return time.time() >= tokens.get("expires_at", 0) - self.refresh_margin
+
+    async def peek(self) -> Optional[dict]:
+        """Cached tokens without triggering a refresh (used by /whoop/status)."""
+        return await self._current()
+
+    async def get_tokens(self) -> dict:
+        tokens = await self._current()
+        if not tokens:
+            raise HTTPException(400, "⚠️ No WHOOP tokens found — please authorize first via /whoop/auth")
+
+        if self._needs_refresh(tokens):
+            tokens = await self.refresh(stale_access_token=tokens.get("access_token"))
+        return tokens
+
+    async def refresh(self, stale_access_token: Optional[str] = None) -> dict:
+        """
+        Refresh the tokens once for all concurrent callers.
+        If stale_access_token is given and the cache already holds a different
+        access token, another caller refreshed first and that result is reused.
+        """
+        async with self._lock:
+            current = self._tokens
+            if (
+                self._refresh_future is None
+                and stale_access_token
+                and current
+                and current.get("access_token") != stale_access_token
+                and not self._needs_refresh(current)
+            ):
+                return current
+
+            if self._refresh_future is None:
+                self._refresh_future = asyncio.ensure_future(self._do_refresh(current))
+                self._refresh_future.add_done_callback(self._clear_refresh)
+            future = self._refresh_future
+
+        return await asyncio.shield(future)
+
+    def _clear_refresh(self, _future):
+        self._refresh_future = None
+
+    async def _do_refresh(self, tokens):
+        if not tokens or "refresh_token" not in tokens:
+            raise HTTPException(400, "⚠️ Missing refresh_token. Please reauthorize WHOOP with offline scope.")
+
+        print("🔄 WHOOP token expiring, refreshing...")
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": tokens["refresh_token"],
+            "client_id": WHOOP_CLIENT_ID,
+            "client_secret": WHOOP_CLIENT_SECRET,
+            "scope": "offline",
+        }
+        res = await asyncio.to_thread(requests.post, WHOOP_TOKEN_URL, data=data)
+        if res.status_code != 200:
+            raise HTTPException(res.status_code, f"Failed to refresh token: {res.text}")
+        refreshed = res.json()
+        if tokens.get("whoop_user_id") is not None:
+            refreshed.setdefault("whoop_user_id", tokens["whoop_user_id"])
+        else:
+            # Tokens saved before WHOOP ids were recorded: look it up now so webhooks can find this user
+            whoop_user_id = await asyncio.to_thread(fetch_whoop_user_id, refreshed.get("access_token"))
+            if whoop_user_id is not None:
+                refreshed["whoop_user_id"] = whoop_user_id
+        return await self.set_tokens(refreshed)
+
+    async def set_tokens(self, tokens: dict) -> dict:
+        """Stamp expires_at, persist, then publish to the in-memory cache."""
+        tokens["expires_at"] = time.time() + tokens.get("expires_in", 3600)
+        await self.store.save(self.user_id, tokens)
+        self._tokens = tokens
+        self._loaded = True
+        return tokens
+
+
+class WhoopTokenManagers:
+    """One WhoopTokenManager per user over a shared store, created on first use."""
+
+    def __init__(self, store: TokenStore):
+        self.store = store
+        self._managers = {}
+
+    def get(self, user_id: UUID) -> WhoopTokenManager:
+        manager = self._managers.get(user_id)
+        if manager is None:
+            manager = self._managers.setdefault(user_id, WhoopTokenManager(self.store, user_id))
+        return manager
+
+    async def connected_users(self) -> list:
+        return await self.store.user_ids()
+
+    async def user_for_whoop_id(self, whoop_user_id) -> Optional[UUID]:
+        """
+        Route a webhook to its user, or None for a WHOOP account nobody has linked.
+        Never guesses: tokens saved without a WHOOP id get one on their next refresh.
+        """
+        try:
+            whoop_user_id = int(whoop_user_id)
+        except (TypeError, ValueError):
+            return None
+        return await self.store.user_for_whoop_id(whoop_user_id)
+
+
+token_managers = WhoopTokenManagers(build_token_store())
@@ -0,0 +1,131 @@
+import os
+import gzip
+import json
+import tempfile
+from typing import Callable, Iterator, Optional
+from uuid import UUID
+from core.config import WHOOP_HISTORY_DIR
+from core.users import OWNER_USER_ID
+from core.whoop_api import WhoopClient
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+# =====================================================
+# 📍 Checkpoint
+# =====================================================
+def history_dir(user_id: UUID) -> str:
+    """The owner's download stays in WHOOP_HISTORY_DIR itself; other users get a subdirectory."""
+    if user_id == OWNER_USER_ID:
+        return WHOOP_HISTORY_DIR
+    return os.path.join(WHOOP_HISTORY_DIR, str(user_id))
+
+
+def resource_path(resource: str, directory: str = WHOOP_HISTORY_DIR) -> str:
+    return os.path.join(directory, f"{resource}.ndjson.gz")
+
+
+def load_checkpoint(directory: str = WHOOP_HISTORY_DIR) -> dict:
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint: dict, directory: str = WHOOP_HISTORY_DIR):
+    """Write-then-rename so a crash never leaves a half-written checkpoint."""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint.", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(directory, CHECKPOINT_FILE))
+
+
+# =====================================================
+# ⬇️ Streaming download
+# =====================================================
+def download_resource(
+    client: WhoopClient,
+    resource: str,
+    endpoint: str,
+    checkpoint: dict,
+    directory: str = WHOOP_HISTORY_DIR,
+    on_page: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Stream one resource page by page into <resource>.ndjson.gz.
+    Every page is its own gzip member; after it is fsynced the checkpoint records
+    the byte offset and next_token, so a resume truncates any torn tail and
+    continues from the exact page that failed. on_page(resource, state) runs
+    after each saved page.
+    """
+    state = checkpoint.setdefault(resource, {"next_token": None, "bytes": 0, "pages": 0, "records": 0, "done": False})
+    if state["done"]:
+        return state
+
+    path = resource_path(resource, directory)
+    with open(path, "ab") as raw:
+        raw.truncate(state["bytes"])
+        raw.seek(state["bytes"])
+
+        for records, next_token in client.iter_pages(endpoint, next_token=state["next_token"]):
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                for record in records:
+                    gz.write(json.dumps(record, separators=(",", ":")).encode())
+                    gz.write(b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+            state["bytes"] = raw.tell()
+            state["next_token"] = next_token
+            state["pages"] += 1
+            state["records"] += len(records)
+            state["done"] = not next_token
+            save_checkpoint(checkpoint, directory)
+            if on_page:
+                on_page(resource, state)
+
+    print(f"✅ Streamed {state['records']} {resource} records → {path}")
+    return state
+
+
+def download_full_history(
+    client: WhoopClient,
+    endpoints: dict,
+    resume: bool = True,
+    directory: str = WHOOP_HISTORY_DIR,
+    on_page: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Download every resource in `endpoints` ({name: url}) to gzip NDJSON.
+    Resumes an interrupted run unless resume=False; a finished run starts over.
+    Raises WhoopIncompleteError on failure with the checkpoint already saved.
+    """
+    os.makedirs(directory, exist_ok=True)
+    checkpoint = load_checkpoint(directory) if resume else {}
+    if checkpoint and all(checkpoint.get(k, {}).get("done") for k in endpoints):
+        checkpoint = {}
+    resumed = bool(checkpoint)
+    if not resumed:
+        save_checkpoint(checkpoint, directory)
+
+    for resource, endpoint in endpoints.items():
+        download_resource(client, resource, endpoint, checkpoint, directory, on_page)
+
+    return {"resumed": resumed, "resources": checkpoint}
+
+
+# =====================================================
+# 📖 Reading it back
+# =====================================================
+def iter_history_records(resource: str, directory: str = WHOOP_HISTORY_DIR) -> Iterator[dict]:
+    """Yield records one at a time from <resource>.ndjson.gz (multi-member gzip reads transparently)."""
+    path = resource_path(resource, directory)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,372 @@
+"""
+Background WHOOP backfills (migrations/0005_whoop_jobs.sql).
+
+POST /whoop/jobs/backfill only inserts a whoop_jobs row; WhoopJobRunner's
+workers (WHOOP_JOB_WORKERS per instance) claim queued rows and page through
+the user's WHOOP history. Every page is upserted into the whoop_* tables in
+the same transaction that advances the job's counters and next_token, so the
+row always says exactly where to continue:
+
+  * a cancel (request_cancel) is seen after the page in flight;
+  * a failed job is continued by queueing a new one (create_backfill resumes
+    from the last failed or cancelled job of the user);
+  * a job left running by a stopped instance is queued again on shutdown, or
+    re-claimed once it has missed WHOOP_JOB_STALE_SECONDS of heartbeats.
+
+Progress also goes to the user's /events stream as sync.* events with
+source "backfill".
+"""
+import json
+import asyncio
+from typing import Callable, Optional
+from uuid import UUID
+from sqlalchemy import text
+from fastapi.concurrency import run_in_threadpool
+from core.config import WHOOP_JOB_WORKERS, WHOOP_JOB_POLL_SECONDS, WHOOP_JOB_STALE_SECONDS, WHOOP_MAX_PAGE_SIZE
+from core.database import get_engine
+from core.event_hub import event_hub
+from core.partitions import ensure_partitions
+from core.whoop_api import WhoopClient
+from core.whoop_normalize import normalize_rows
+from core import whoop_repository as repo
+
+JOB_COLUMNS = """
+    id, kind, status, resource, next_token, pages_fetched, records_fetched, records_written,
+    progress, cancel_requested, error, attempts, created_at, started_at, heartbeat_at, finished_at
+"""
+COUNTERS = ("inserted", "updated", "unchanged")
+
+
+class JobConflict(Exception):
+    """The user already has a queued or running job of this kind (`job`)."""
+
+    def __init__(self, job: dict):
+        super().__init__(f"Job {job['id']} is already {job['status']}")
+        self.job = job
+
+
+class JobLost(Exception):
+    """Another worker claimed the job (this one was presumed dead); stop without writing."""
+
+
+def _job(row) -> Optional[dict]:
+    if row is None:
+        return None
+    job = dict(row)
+    if isinstance(job.get("progress"), str):
+        job["progress"] = json.loads(job["progress"])
+    return job
+
+
+# =====================================================
+# 📋 Jobs API (routers/whoop.py)
+# =====================================================
+async def create_backfill(user_id: UUID, resume: bool = True) -> dict:
+    """
+    Queue a backfill for the user. With `resume`, it starts where the user's last
+    backfill stopped if that one failed or was cancelled. Raises JobConflict if a
+    backfill is already queued or running.
+    """
+    async with get_engine().begin() as conn:
+        result = await conn.execute(text(
+            f"""
+            INSERT INTO whoop_jobs (user_id, kind, resource, next_token, pages_fetched, records_fetched, records_written, progress)
+            SELECT :u, 'backfill', last.resource, last.next_token,
+                   coalesce(last.pages_fetched, 0), coalesce(last.records_fetched, 0),
+                   coalesce(last.records_written, 0), coalesce(last.progress, '{{}}')
+            FROM (SELECT 1) one
+            LEFT JOIN LATERAL (
+                SELECT * FROM whoop_jobs
+                WHERE user_id = :u AND kind = 'backfill' AND :resume
+                ORDER BY created_at DESC LIMIT 1
+            ) last ON last.status IN ('failed', 'cancelled')
+            ON CONFLICT (user_id, kind) WHERE status IN ('queued', 'running') DO NOTHING
+            RETURNING {JOB_COLUMNS}
+            """
+        ), {"u": user_id, "resume": resume})
+        job = _job(result.mappings().first())
+        if job is None:
+            active = await conn.execute(text(
+                f"""
+                SELECT {JOB_COLUMNS} FROM whoop_jobs
+                WHERE user_id = :u AND kind = 'backfill' AND status IN ('queued', 'running')
+                """
+            ), {"u": user_id})
+            raise JobConflict(_job(active.mappings().first()) or {"id": None, "status": "running"})
+    return job
+
+
+async def get_job(user_id: UUID, job_id: UUID) -> Optional[dict]:
+    async with get_engine().connect() as conn:
+        result = await conn.execute(
+            text(f"SELECT {JOB_COLUMNS} FROM whoop_jobs WHERE user_id = :u AND id = :id"),
+            {"u": user_id, "id": job_id},
+        )
+        return _job(result.mappings().first())
+
+
+async def list_jobs(user_id: UUID, limit: int = 20) -> list:
+    async with get_engine().connect() as conn:
+        result = await conn.execute(
+            text(f"SELECT {JOB_COLUMNS} FROM whoop_jobs WHERE user_id = :u ORDER BY created_at DESC LIMIT :n"),
+            {"u": user_id, "n": limit},
+        )
+        return [_job(r) for r in result.mappings()]
+
+
+async def request_cancel(user_id: UUID, job_id: UUID) -> Optional[dict]:
+    """
+    Cancel a queued job outright, or flag a running one for its worker to stop
+    after the current page. Returns the job, or None if it has already finished.
+    """
+    async with get_engine().begin() as conn:
+        result = await conn.execute(text(
+            f"""
+            UPDATE whoop_jobs SET
+                cancel_requested = true,
+                status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                finished_at = CASE WHEN status = 'queued' THEN now() ELSE finished_at END
+            WHERE user_id = :u AND id = :id AND status IN ('queued', 'running')
+            RETURNING {JOB_COLUMNS}
+            """
+        ), {"u": user_id, "id": job_id})
+        return _job(result.mappings().first())
+
+
+# =====================================================
+# 🧵 Worker pool
+# =====================================================
+class WhoopJobRunner:
+    """
+    `workers` asyncio tasks, each running one job at a time. WHOOP requests go
+    through the user's client (client_for) in the threadpool, so a job never
+    holds a request worker or the event loop, and all jobs share its rate limit.
+    """
+
+    def __init__(
+        self,
+        client_for: Callable[[UUID], WhoopClient],
+        endpoints: dict,
+        workers: int = WHOOP_JOB_WORKERS,
+        poll_interval: float = WHOOP_JOB_POLL_SECONDS,
+        stale_after: int = WHOOP_JOB_STALE_SECONDS,
+    ):
+        self.client_for = client_for
+        self.endpoints = endpoints  # resource → collection URL, fetched in this order
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._tasks = []
+        self._wake = asyncio.Event()
+        self.running = {}  # job id → user id, on this instance
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.last_error = None
+
+    async def start(self):
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def wake(self):
+        """A job was just queued: idle workers claim it now instead of at the next poll."""
+        self._wake.set()
+
+    async def _worker(self):
+        while True:
+            # Cleared before claiming, so a wake() during the claim isn't lost
+            self._wake.clear()
+            try:
+                job = await self.claim()
+            except Exception as e:
+                self.last_error = f"claim: {e}"
+                print(f"❌ WHOOP job {self.last_error}")
+                job = None
+            if job is not None:
+                try:
+                    await self.run(job)
+                except Exception as e:
+                    self.last_error = f"{job['id']}: {e}"
+                    print(f"❌ WHOOP job {self.last_error}")
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # ---------- job state ----------
+    async def claim(self) -> Optional[dict]:
+        """The oldest queued (or abandoned) job, now running under a new attempt number."""
+        async with get_engine().begin() as conn:
+            result = await conn.execute(text(
+                f"""
+                UPDATE whoop_jobs SET
+                    status = 'running', attempts = attempts + 1, error = NULL,
+                    started_at = coalesce(started_at, now()), heartbeat_at = now()
+                WHERE id = (
+                    SELECT id FROM whoop_jobs
+                    WHERE status = 'queued'
+                       OR (status = 'running' AND heartbeat_at < now() - make_interval(secs => :stale))
+                    ORDER BY created_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING user_id, {JOB_COLUMNS}
+                """
+            ), {"stale": self.stale_after})
+            return _job(result.mappings().first())
+
+    async def _checkpoint(self, conn, job: dict, resource: str, next_token: Optional[str], progress: dict) -> bool:
+        """Record progress in the page's transaction; returns whether a cancel was requested."""
+        result = await conn.execute(text(
+            """
+            UPDATE whoop_jobs SET
+                resource = :r, next_token = :t, progress = CAST(:progress AS jsonb),
+                pages_fetched = :pages, records_fetched = :records, records_written = :written,
+                heartbeat_at = now()
+            WHERE id = :id AND attempts = :a AND status = 'running'
+            RETURNING cancel_requested
+            """
+        ), {
+            "id": job["id"],
+            "a": job["attempts"],
+            "r": resource,
+            "t": next_token,
+            "progress": json.dumps(progress),
+            "pages": job["pages_fetched"],
+            "records": job["records_fetched"],
+            "written": job["records_written"],
+        })
+        cancel = result.scalar()
+        if cancel is None:
+            raise JobLost()
+        return cancel
+
+    async def _finish(self, job: dict, status: str, error: Optional[str] = None):
+        async with get_engine().begin() as conn:
+            await conn.execute(text(
+                """
+                UPDATE whoop_jobs SET status = :s, error = :e, finished_at = now(), heartbeat_at = now()
+                WHERE id = :id AND attempts = :a AND status = 'running'
+                """
+            ), {"id": job["id"], "a": job["attempts"], "s": status, "e": error})
+
+    async def _requeue(self, job: dict):
+        async with get_engine().begin() as conn:
+            await conn.execute(text(
+                "UPDATE whoop_jobs SET status = 'queued' WHERE id = :id AND attempts = :a AND status = 'running'"
+            ), {"id": job["id"], "a": job["attempts"]})
+
+    # ---------- running ----------
+    def _publish(self, job: dict, event_type: str, **data):
+        event_hub.publish(job["user_id"], event_type, {"source": "backfill", "job_id": str(job["id"]), **data})
+
+    async def run(self, job: dict):
+        """Page through every resource from the job's checkpoint and record how it ended."""
+        user_id = job["user_id"]
+        self.running[job["id"]] = user_id
+        self._publish(job, "sync.started", resumed=job["pages_fetched"] > 0)
+        try:
+            status = await self._backfill(job)
+        except JobLost:
+            print(f"⚠️ WHOOP job {job['id']} was claimed by another worker")
+            return
+        except asyncio.CancelledError:
+            # Instance shutting down: put it back so the next worker continues from the checkpoint
+            try:
+                await self._requeue(job)
+            except Exception as e:
+                print(f"⚠️ WHOOP job {job['id']} not requeued ({e}) — it is re-claimed once stale")
+            raise
+        except Exception as e:
+            error = str(getattr(e, "detail", e))
+            self.failed += 1
+            self.last_error = f"{job['id']}: {error}"
+            print(f"❌ WHOOP job {self.last_error}")
+            self._publish(job, "sync.failed", error=error, next_token=job["next_token"])
+            try:
+                await self._finish(job, "failed", error)
+            except Exception as finish_error:
+                print(f"❌ WHOOP job {job['id']} not marked failed: {finish_error}")
+            return
+        finally:
+            self.running.pop(job["id"], None)
+
+        if status == "succeeded":
+            self.succeeded += 1
+            # Old history lands in the default partitions; give its years their own now
+            try:
+                await ensure_partitions()
+            except Exception as e:
+                print(f"⚠️ Partitions not updated after WHOOP job {job['id']}: {e}")
+        else:
+            self.cancelled += 1
+        await self._finish(job, status)
+        self._publish(
+            job, "sync.finished", status=status,
+            records={k: v["records"] for k, v in job["progress"].items()},
+        )
+
+    async def _backfill(self, job: dict) -> str:
+        """Returns "succeeded" or "cancelled"; WHOOP and database errors propagate."""
+        user_id = job["user_id"]
+        client = self.client_for(user_id)
+        resources = list(self.endpoints)
+        start = resources.index(job["resource"]) if job["resource"] in self.endpoints else 0
+        progress = job["progress"]
+        next_token = job["next_token"]
+        cancel = job["cancel_requested"]
+
+        for resource in resources[start:]:
+            state = progress.setdefault(resource, {"pages": 0, "records": 0, **dict.fromkeys(COUNTERS, 0), "done": False})
+            while not state["done"] and not cancel:
+                params = {"limit": WHOOP_MAX_PAGE_SIZE}
+                if next_token:
+                    params["nextToken"] = next_token
+                data = await run_in_threadpool(client.get_json, self.endpoints[resource], params)
+                records = data.get("records", [])
+                next_token = data.get("next_token")
+
+                async with get_engine().begin() as conn:
+                    counts = await repo.upsert_changed(conn, user_id, resource, normalize_rows(resource, records))
+                    state["pages"] += 1
+                    state["records"] += len(records)
+                    for c in COUNTERS:
+                        state[c] += counts[c]
+                    state["done"] = not next_token
+                    job["pages_fetched"] += 1
+                    job["records_fetched"] += len(records)
+                    job["records_written"] += counts["inserted"] + counts["updated"]
+                    cancel = await self._checkpoint(conn, job, resource, next_token, progress)
+                job["resource"], job["next_token"] = resource, next_token
+
+                self._publish(
+                    job, "sync.progress",
+                    resource=resource, pages=state["pages"], records=state["records"],
+                    written=job["records_written"], done=state["done"],
+                )
+            if cancel:
+                return "cancelled"
+            next_token = None
+        return "succeeded"
+
+    def stats(self):
+        return {
+            "workers": len([t for t in self._tasks if not t.done()]),
+            "running": [str(job_id) for job_id in self.running],
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "last_error": self.last_error,
+        }
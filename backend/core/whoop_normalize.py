@@ -0,0 +1,136 @@
+"""
+The one place WHOOP API records become table rows. /whoop/latest, webhooks and
+scripts/import_whoop_full.py all go through normalize(), so every path writes
+the same columns with the same formatting (and therefore the same content_hash).
+
+Work is done a column at a time over a whole batch: each source field is
+plucked once into a list, then converted with a single comprehension, and a
+timestamp that feeds several columns (sleep `end` → end + record_date) is
+converted once per batch instead of once per column. Date-only columns use
+the cheaper core.convert.to_local_dates.
+"""
+from typing import Iterable
+from core.convert import to_local_datetimes, to_local_dates
+from core.whoop_repository import WHOOP_TABLES
+
+# resource → [(column, source path, kind)]
+#   str   → str(value), None stays NULL
+#   hours → milliseconds as hours, rounded to 2 places, as text (missing → "0.0")
+#   ts    → ISO timestamp in LOCAL_TIMEZONE
+#   date  → calendar date (YYYY-MM-DD) in LOCAL_TIMEZONE
+COLUMNS = {
+    "recovery": [
+        ("sleep_id", ("sleep_id",), "str"),
+        ("cycle_id", ("cycle_id",), "str"),
+        ("recovery_score", ("score", "recovery_score"), "str"),
+        ("resting_heart_rate", ("score", "resting_heart_rate"), "str"),
+        ("hrv_rmssd_milli", ("score", "hrv_rmssd_milli"), "str"),
+        ("spo2_percentage", ("score", "spo2_percentage"), "str"),
+        ("skin_temp_celsius", ("score", "skin_temp_celsius"), "str"),
+        ("record_date", ("created_at",), "date"),
+    ],
+    "sleep": [
+        ("id", ("id",), "str"),
+        ("cycle_id", ("cycle_id",), "str"),
+        ("start", ("start",), "ts"),
+        ("end", ("end",), "ts"),
+        ("sleep_performance_percentage", ("score", "sleep_performance_percentage"), "str"),
+        ("sleep_efficiency_percentage", ("score", "sleep_efficiency_percentage"), "str"),
+        ("sleep_consistency_percentage", ("score", "sleep_consistency_percentage"), "str"),
+        ("respiratory_rate", ("score", "respiratory_rate"), "str"),
+        ("light_sleep_hours", ("score", "stage_summary", "total_light_sleep_time_milli"), "hours"),
+        ("deep_sleep_hours", ("score", "stage_summary", "total_slow_wave_sleep_time_milli"), "hours"),
+        ("rem_sleep_hours", ("score", "stage_summary", "total_rem_sleep_time_milli"), "hours"),
+        ("total_in_bed_hours", ("score", "stage_summary", "total_in_bed_time_milli"), "hours"),
+        ("total_awake_hours", ("score", "stage_summary", "total_awake_time_milli"), "hours"),
+        ("disturbance_count", ("score", "stage_summary", "disturbance_count"), "str"),
+        ("sleep_cycle_count", ("score", "stage_summary", "sleep_cycle_count"), "str"),
+        ("baseline_need_hours", ("score", "sleep_needed", "baseline_milli"), "hours"),
+        ("need_from_sleep_debt_hours", ("score", "sleep_needed", "need_from_sleep_debt_milli"), "hours"),
+        ("need_from_strain_hours", ("score", "sleep_needed", "need_from_recent_strain_milli"), "hours"),
+        ("record_date", ("end",), "date"),  # ✅ local date from sleep end
+    ],
+    "workouts": [
+        ("id", ("id",), "str"),
+        ("sport_name", ("sport_name",), "str"),
+        ("strain", ("score", "strain"), "str"),
+        ("average_heart_rate", ("score", "average_heart_rate"), "str"),
+        ("max_heart_rate", ("score", "max_heart_rate"), "str"),
+        ("kilojoule", ("score", "kilojoule"), "str"),
+        ("distance_meter", ("score", "distance_meter"), "str"),
+        ("altitude_gain_meter", ("score", "altitude_gain_meter"), "str"),
+        ("record_date", ("end",), "date"),
+    ],
+}
+
+RESOURCES = tuple(COLUMNS)
+
+
+# =====================================================
+# 🔧 Column helpers
+# =====================================================
+def _pluck(records, path):
+    """One field (possibly nested) from every record; missing or non-dict parents give None."""
+    values = [r.get(path[0]) for r in records]
+    for field in path[1:]:
+        values = [v.get(field) if isinstance(v, dict) else None for v in values]
+    return values
+
+
+def _as_str(values):
+    return [None if v is None else str(v) for v in values]
+
+
+def _as_hours(values):
+    # Same arithmetic as the old per-record to_hours(), so stored text (and hashes) don't change
+    return [str(round((v or 0) / 1000 / 60 / 60, 2)) for v in values]
+
+
+# =====================================================
+# 🧮 Normalize
+# =====================================================
+def normalize(resource: str, records: Iterable[dict]) -> dict:
+    """
+    Turn a batch of raw WHOOP records into {column: [values]} for `resource`.
+    Records without a primary key are dropped.
+    """
+    if resource not in COLUMNS:
+        raise ValueError(f"Unknown WHOOP resource '{resource}'")
+    spec = COLUMNS[resource]
+    key_path = next(path for column, path, _ in spec if column == WHOOP_TABLES[resource][1])
+    records = [r for r in records if isinstance(r, dict)]
+    records = [r for r, k in zip(records, _pluck(records, key_path)) if k is not None]
+
+    plucked = {}
+    timestamps = {}
+    columns = {}
+    for column, path, kind in spec:
+        if path not in plucked:
+            plucked[path] = _pluck(records, path)
+        values = plucked[path]
+
+        if kind == "str":
+            columns[column] = _as_str(values)
+        elif kind == "hours":
+            columns[column] = _as_hours(values)
+        elif kind == "ts" or path in timestamps:
+            if path not in timestamps:
+                timestamps[path] = to_local_datetimes(values, errors="coerce")
+            local = timestamps[path]
+            if kind == "ts":
+                columns[column] = [dt.isoformat() if dt else None for dt in local]
+            else:
+                columns[column] = [dt.date().isoformat() if dt else None for dt in local]
+        else:
+            columns[column] = to_local_dates(values, errors="coerce")
+    return columns
+
+
+def to_rows(columns: dict) -> list:
+    """Columns back to row dicts, for the executemany / COPY writers."""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def normalize_rows(resource: str, records: Iterable[dict]) -> list:
+    return to_rows(normalize(resource, records))
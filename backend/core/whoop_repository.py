@@ -0,0 +1,174 @@
+import json
+import hashlib
+from datetime import date, datetime
+from typing import Iterable
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# resource → (table, WHOOP id column). The tables are partitioned by record_date, so rows are unique on
+# (user_id, that column, record_date); delete_moved keeps it at one row per WHOOP id when the date changes.
+WHOOP_TABLES = {
+    "recovery": ("whoop_recovery", "sleep_id"),
+    "sleep": ("whoop_sleep", "id"),
+    "workouts": ("whoop_workouts", "id"),
+}
+
+
+# =====================================================
+# 🔧 Helpers
+# =====================================================
+def _table(resource):
+    if resource not in WHOOP_TABLES:
+        raise ValueError(f"Unknown WHOOP resource '{resource}'")
+    return WHOOP_TABLES[resource]
+
+
+def coerce_row(row: dict) -> dict:
+    """asyncpg binds typed parameters, so dates/timestamps must be real objects, not ISO strings."""
+    out = dict(row)
+    if isinstance(out.get("record_date"), str):
+        out["record_date"] = date.fromisoformat(out["record_date"])
+    for field in ("start", "end"):
+        if isinstance(out.get(field), str):
+            out[field] = datetime.fromisoformat(out[field])
+    return out
+
+
+def content_hash(row: dict) -> str:
+    """
+    Stable fingerprint of a transformed row (column order independent).
+    Hash the row before coerce_row so the importer and the API path agree.
+    """
+    payload = json.dumps(
+        {c: row[c] for c in row if c != "content_hash"},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _columns(rows):
+    return list(rows[0].keys())
+
+
+# =====================================================
+# 🔍 Reads
+# =====================================================
+async def existing_hashes(conn: AsyncConnection, user_id: UUID, resource: str, keys: Iterable[str]) -> dict:
+    """key → stored content_hash for the `keys` that already exist (hash may be None for legacy rows)."""
+    table, key = _table(resource)
+    keys = list(keys)
+    if not keys:
+        return {}
+    result = await conn.execute(
+        text(f'SELECT "{key}", content_hash FROM {table} WHERE user_id = :u AND "{key}" = ANY(:keys)'),
+        {"u": user_id, "keys": keys},
+    )
+    return {r[0]: r[1] for r in result.fetchall()}
+
+
+async def exists_on_date(conn: AsyncConnection, user_id: UUID, resource: str, record_date) -> bool:
+    table, _ = _table(resource)
+    if isinstance(record_date, str):
+        record_date = date.fromisoformat(record_date)
+    result = await conn.execute(
+        text(f"SELECT 1 FROM {table} WHERE user_id = :u AND record_date = :d LIMIT 1"),
+        {"u": user_id, "d": record_date},
+    )
+    return result.first() is not None
+
+
+# =====================================================
+# ✏️ Writes
+# =====================================================
+async def delete_moved(conn: AsyncConnection, user_id: UUID, resource: str, rows: list) -> int:
+    """
+    Drop stored copies of `rows` filed under a different record_date (an edited
+    sleep whose end moved to another day) — the upsert's conflict target includes
+    the date, so it would otherwise add a second row instead of updating the first.
+    """
+    if not rows:
+        return 0
+    table, key = _table(resource)
+    rows = [coerce_row(r) for r in rows]
+    result = await conn.execute(
+        text(
+            f"""
+            DELETE FROM {table} t
+            USING unnest(CAST(:keys AS text[]), CAST(:dates AS date[])) AS n(k, d)
+            WHERE t.user_id = :u AND t."{key}" = n.k AND t.record_date IS DISTINCT FROM n.d
+            """
+        ),
+        {"u": user_id, "keys": [r[key] for r in rows], "dates": [r.get("record_date") for r in rows]},
+    )
+    return result.rowcount
+
+
+async def upsert_rows(conn: AsyncConnection, user_id: UUID, resource: str, rows: list, update: bool = True) -> int:
+    """
+    Batch INSERT ... ON CONFLICT on (user_id, WHOOP id, record_date) as one
+    executemany; the rows are written as the user's. update=False keeps existing
+    rows untouched (DO NOTHING). Rows whose date changed need delete_moved first.
+    """
+    if not rows:
+        return 0
+    table, key = _table(resource)
+    columns = ["user_id"] + [c for c in _columns(rows) if c != "user_id"]
+    column_sql = ", ".join(f'"{c}"' for c in columns)
+    values_sql = ", ".join(f":{c}" for c in columns)
+    if update:
+        set_sql = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in columns if c not in (key, "user_id", "record_date"))
+        conflict_sql = f'ON CONFLICT (user_id, "{key}", record_date) DO UPDATE SET {set_sql}'
+    else:
+        conflict_sql = f'ON CONFLICT (user_id, "{key}", record_date) DO NOTHING'
+
+    await conn.execute(
+        text(f"INSERT INTO {table} ({column_sql}) VALUES ({values_sql}) {conflict_sql}"),
+        [{**coerce_row(r), "user_id": user_id} for r in rows],
+    )
+    return len(rows)
+
+
+async def upsert_changed(
+    conn: AsyncConnection, user_id: UUID, resource: str, rows: list, existing: dict = None, written: list = None
+) -> dict:
+    """
+    Hash each row, compare against the stored hashes in one query and write only
+    rows that are new or whose content changed. Returns inserted/updated/unchanged counts.
+    Pass `existing` (from existing_hashes) if the caller already looked the keys up,
+    and a list as `written` to collect the rows that were actually stored.
+    """
+    _, key = _table(resource)
+    if existing is None:
+        existing = await existing_hashes(conn, user_id, resource, [r[key] for r in rows])
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    changed, updated = [], []
+    for row in rows:
+        row = {**row, "content_hash": content_hash(row)}
+        if row[key] not in existing:
+            counts["inserted"] += 1
+        elif existing[row[key]] != row["content_hash"]:
+            counts["updated"] += 1
+            updated.append(row)
+        else:
+            counts["unchanged"] += 1
+            continue
+        changed.append(row)
+
+    await delete_moved(conn, user_id, resource, updated)
+    await upsert_rows(conn, user_id, resource, changed)
+    if written is not None:
+        written.extend(changed)
+    return counts
+
+
+async def delete_by_key(conn: AsyncConnection, user_id: UUID, resource: str, value: str) -> int:
+    table, key = _table(resource)
+    result = await conn.execute(
+        text(f'DELETE FROM {table} WHERE user_id = :u AND "{key}" = :v'),
+        {"u": user_id, "v": value},
+    )
+    return result.rowcount
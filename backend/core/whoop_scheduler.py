@@ -0,0 +1,193 @@
+import os
+import socket
+import asyncio
+import random
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import text
+from core.database import get_engine
+from core.config import (
+    WHOOP_SYNC_INTERVAL_SECONDS,
+    WHOOP_SYNC_JITTER,
+    WHOOP_SYNC_BACKOFF_BASE,
+    WHOOP_SYNC_BACKOFF_MAX,
+    WHOOP_SYNC_LEASE_SECONDS,
+)
+
+# Row in the leases table (migrations/0006_leases.sql) held by the instance that is syncing
+WHOOP_SYNC_LEASE = "whoop_sync"
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+
+# =====================================================
+# ⏰ Background WHOOP Sync Scheduler
+# =====================================================
+class WhoopSyncScheduler:
+    """
+    Runs an async sync function on an interval with jitter, backing off
+    exponentially after failures. Each run holds a lease row so only one worker
+    across the deployment syncs at a time. Taking, renewing and releasing it are
+    short transactions of their own, so no connection stays open (or pinned to
+    a pooler backend) while the sync waits on WHOOP.
+    """
+
+    def __init__(
+        self,
+        sync_fn: Callable[[], Awaitable[dict]],
+        interval: int = WHOOP_SYNC_INTERVAL_SECONDS,
+        jitter: float = WHOOP_SYNC_JITTER,
+        backoff_base: int = WHOOP_SYNC_BACKOFF_BASE,
+        backoff_max: int = WHOOP_SYNC_BACKOFF_MAX,
+        lease_seconds: int = WHOOP_SYNC_LEASE_SECONDS,
+    ):
+        self.sync_fn = sync_fn
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.skipped_locked = 0
+        self.running = False
+        self.last_started_at = None
+        self.last_finished_at = None
+        self.last_success_at = None
+        self.last_duration_seconds = None
+        self.last_error = None
+        self.last_result = None
+        self.next_run_at = None
+
+    # ---------- lifecycle ----------
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+            print(f"⏰ WHOOP sync scheduler started (every ~{self.interval}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def enabled(self):
+        return self._task is not None and not self._task.done()
+
+    # ---------- scheduling ----------
+    def next_delay(self):
+        """Interval ± jitter on success, capped exponential backoff after failures."""
+        if self.consecutive_failures:
+            base = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+        else:
+            base = self.interval
+        spread = base * self.jitter
+        return max(1.0, base + random.uniform(-spread, spread))
+
+    async def _loop(self):
+        while True:
+            delay = self.next_delay()
+            self.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+            await self.run_once()
+
+    # ---------- lease ----------
+    async def _acquire(self) -> bool:
+        """Take the lease if it is free, expired or already ours."""
+        async with get_engine().begin() as conn:
+            result = await conn.execute(text(
+                """
+                INSERT INTO leases (name, holder, expires_at)
+                VALUES (:name, :holder, now() + make_interval(secs => :ttl))
+                ON CONFLICT (name) DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+                WHERE leases.expires_at < now() OR leases.holder = EXCLUDED.holder
+                RETURNING holder
+                """
+            ), {"name": WHOOP_SYNC_LEASE, "holder": self.holder, "ttl": self.lease_seconds})
+            return result.scalar() is not None
+
+    async def _renew(self):
+        """Extend the lease every third of its length while the sync runs."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with get_engine().begin() as conn:
+                    await conn.execute(text(
+                        """
+                        UPDATE leases SET expires_at = now() + make_interval(secs => :ttl)
+                        WHERE name = :name AND holder = :holder
+                        """
+                    ), {"name": WHOOP_SYNC_LEASE, "holder": self.holder, "ttl": self.lease_seconds})
+            except Exception as e:
+                print(f"⚠️ WHOOP sync lease not renewed: {e}")
+
+    async def _release(self):
+        try:
+            async with get_engine().begin() as conn:
+                await conn.execute(
+                    text("DELETE FROM leases WHERE name = :name AND holder = :holder"),
+                    {"name": WHOOP_SYNC_LEASE, "holder": self.holder},
+                )
+        except Exception as e:
+            print(f"⚠️ WHOOP sync lease not released (expires on its own): {e}")
+
+    async def run_once(self):
+        """Run one sync if no other worker holds the lease. Never raises."""
+        try:
+            if not await self._acquire():
+                self.skipped_locked += 1
+                print("⏭️ WHOOP sync already running on another worker — skipped")
+                return
+
+            renewer = asyncio.create_task(self._renew())
+            self.running = True
+            self.last_started_at = time.time()
+            self.runs += 1
+            try:
+                self.last_result = await self.sync_fn()
+            finally:
+                renewer.cancel()
+                self.running = False
+                self.last_finished_at = time.time()
+                self.last_duration_seconds = round(self.last_finished_at - self.last_started_at, 3)
+                await self._release()
+
+            self.last_success_at = self.last_finished_at
+            self.last_error = None
+            self.consecutive_failures = 0
+            print(f"✅ Scheduled WHOOP sync finished in {self.last_duration_seconds}s")
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(getattr(e, "detail", e))
+            print(f"❌ Scheduled WHOOP sync failed ({self.consecutive_failures} in a row): {self.last_error}")
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "skipped_locked": self.skipped_locked,
+            "last_started_at": _iso(self.last_started_at),
+            "last_finished_at": _iso(self.last_finished_at),
+            "last_success_at": _iso(self.last_success_at),
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+            "next_run_at": _iso(self.next_run_at) if self.enabled else None,
+        }
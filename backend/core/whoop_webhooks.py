@@ -0,0 +1,173 @@
+import hmac
+import time
+import base64
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from core.config import (
+    WHOOP_WEBHOOK_SECRET,
+    WHOOP_WEBHOOK_TOLERANCE_SECONDS,
+    WHOOP_WEBHOOK_MAX_ATTEMPTS,
+    WHOOP_WEBHOOK_RETRY_BASE,
+    WHOOP_WEBHOOK_RETRY_MAX,
+)
+
+WEBHOOK_EVENT_TYPES = {
+    "recovery.updated",
+    "recovery.deleted",
+    "sleep.updated",
+    "sleep.deleted",
+    "workout.updated",
+    "workout.deleted",
+}
+
+
+# =====================================================
+# ✍️ Signatures
+# =====================================================
+def sign_webhook(body: bytes, timestamp: str, secret: str = WHOOP_WEBHOOK_SECRET) -> str:
+    """WHOOP signature: base64(HMAC-SHA256(secret, timestamp + raw body))."""
+    digest = hmac.new(secret.encode(), timestamp.encode() + body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_webhook(
+    body: bytes,
+    signature: Optional[str],
+    timestamp: Optional[str],
+    secret: str = WHOOP_WEBHOOK_SECRET,
+    tolerance: int = WHOOP_WEBHOOK_TOLERANCE_SECONDS,
+) -> bool:
+    if not secret or not signature or not timestamp:
+        return False
+    try:
+        sent_at = int(timestamp) / 1000  # milliseconds since epoch
+    except ValueError:
+        return False
+    if abs(time.time() - sent_at) > tolerance:
+        return False
+    return hmac.compare_digest(sign_webhook(body, timestamp, secret), signature)
+
+
+# =====================================================
+# 📬 Event Queue
+# =====================================================
+class WebhookQueue:
+    """
+    In-process queue of (event_type, record_id, user_id) handled one at a time
+    by an async handler. Duplicate events still waiting in the queue are coalesced,
+    so a burst of updates for one record costs one fetch. An event whose handler
+    fails is queued again after a capped exponential backoff, up to `max_attempts`.
+    Retries live in this process: a restart drops them (WHOOP won't redeliver).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, UUID], Awaitable[None]],
+        maxsize: int = 1000,
+        max_attempts: int = WHOOP_WEBHOOK_MAX_ATTEMPTS,
+        retry_base: float = WHOOP_WEBHOOK_RETRY_BASE,
+        retry_max: float = WHOOP_WEBHOOK_RETRY_MAX,
+    ):
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._pending = set()
+        self._attempts = {}  # key → failed attempts so far
+        self._retries = {}  # key → TimerHandle of its scheduled retry
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.last_error = None
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+
+    def put(self, event_type: str, record_id: str, user_id: UUID) -> bool:
+        """Queue an event; returns False if an identical one is already pending."""
+        self.received += 1
+        key = (event_type, record_id, user_id)
+        if key in self._pending:
+            self.coalesced += 1
+            return False
+        self._queue.put_nowait(key)
+        self._pending.add(key)
+        return True
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+
+    def _retry(self, key):
+        self._retries.pop(key, None)
+        if key in self._pending:
+            return  # a fresh delivery of the same event is already queued
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._attempts.pop(key, None)
+            print(f"❌ WHOOP webhook {key[0]} {key[1]} dropped: queue full")
+            return
+        self._pending.add(key)
+        self.retried += 1
+
+    def _failed(self, key, error):
+        self.failed += 1
+        attempts = self._attempts.get(key, 0) + 1
+        self.last_error = f"{key[0]} {key[1]} (attempt {attempts}): {error}"
+        if attempts >= self.max_attempts:
+            self.dropped += 1
+            self._attempts.pop(key, None)
+            print(f"❌ WHOOP webhook {self.last_error} — giving up")
+            return
+        self._attempts[key] = attempts
+        delay = self.retry_delay(attempts)
+        if key not in self._retries:
+            self._retries[key] = asyncio.get_running_loop().call_later(delay, self._retry, key)
+        print(f"❌ WHOOP webhook {self.last_error} — retrying in {delay:.0f}s")
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            self._pending.discard(key)
+            try:
+                await self.handler(*key)
+                self.processed += 1
+                self._attempts.pop(key, None)
+            except Exception as e:
+                self._failed(key, getattr(e, "detail", e))
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "processed": self.processed,
+            "failed": self.failed,
+            "retrying": len(self._retries),
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+        }
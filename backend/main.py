@@ -1,8 +1,14 @@
 # main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from core.database import init_db  # ✅ use the async helper instead
-from routers import entries, attribute_definitions, whoop, charts
+from core.database import dispose_engines
+from core.migrations import ensure_schema
+from core.partitions import partition_maintainer
+from core.users import check_auth_mode
+from core.config import WHOOP_SYNC_ENABLED
+from core.timing import TimingMiddleware
+from core.profiler import ProfilerMiddleware
+from routers import entries, attribute_definitions, whoop, charts, metrics, debug, events
 
 app = FastAPI(title="LifeOf API")
 
@@ -18,17 +24,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 🔬 Admin-only ?profile=1 sampling profiler (core/profiler.py); costs a header/query check otherwise
+app.add_middleware(ProfilerMiddleware)
+
+# ⏱️ Per-route latency + DB time (Server-Timing header, /metrics); added last so it is outermost and
+# times CORS and the profiler too
+app.add_middleware(TimingMiddleware)
+
 # ✅ Register routers
 app.include_router(entries.router)
 app.include_router(attribute_definitions.router)
 app.include_router(whoop.router)
 app.include_router(charts.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
+app.include_router(events.router)
 
 @app.on_event("startup")
 async def on_startup():
-    # Initialize database metadata if needed
-    await init_db()
-    print("✅ Database initialized")
+    # 🧱 Apply pending schema migrations — skipped without touching the database when
+    # DB_SCHEMA_CHECK=cached and this instance already confirmed them (see core/migrations.py)
+    schema = await ensure_schema()
+    print(f"✅ Database initialized (schema {schema})")
+
+    # 👥 Warn if keyless requests still act as the owner once other users exist
+    await check_auth_mode()
+
+    # 🗓️ Keep next year's partitions in place (background, so it never delays startup)
+    await partition_maintainer.start()
+
+    # ⏰ Optional background WHOOP sync (instead of waiting for the admin button)
+    if WHOOP_SYNC_ENABLED:
+        await whoop.sync_scheduler.start()
+
+    # 🪝 Background worker for WHOOP webhook deliveries
+    await whoop.webhook_queue.start()
+
+    # 🧵 Workers for background WHOOP backfills; picks up jobs queued or interrupted before this start
+    await whoop.backfill_jobs.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await partition_maintainer.stop()
+    await whoop.sync_scheduler.stop()
+    await whoop.webhook_queue.stop()
+    await whoop.backfill_jobs.stop()  # a running job goes back to queued at its last page
+    await dispose_engines()
 
 @app.get("/")
 async def root():
@@ -0,0 +1,104 @@
+-- Baseline: the schema the app has been running against.
+-- Written with IF NOT EXISTS throughout so a database created by the old
+-- metadata.create_all (or by hand in Supabase) adopts it without changes.
+
+CREATE TABLE IF NOT EXISTS daily_entries (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    date date NOT NULL,
+    day_period text NOT NULL DEFAULT 'am',
+    visibility text NOT NULL DEFAULT 'private',
+    notes text,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+ALTER TABLE daily_entries ADD COLUMN IF NOT EXISTS day_period text NOT NULL DEFAULT 'am';
+ALTER TABLE daily_entries ADD COLUMN IF NOT EXISTS notes text;
+
+CREATE TABLE IF NOT EXISTS entry_attributes (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    entry_id uuid NOT NULL REFERENCES daily_entries (id) ON DELETE CASCADE,
+    name text NOT NULL,
+    value text,
+    unit text,
+    note text,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS entry_notes (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    entry_id uuid NOT NULL REFERENCES daily_entries (id) ON DELETE CASCADE,
+    content text NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS attribute_definitions (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL,
+    label text NOT NULL,
+    unit text,
+    category text,
+    active boolean DEFAULT true,
+    default_visible boolean DEFAULT true,
+    weight numeric DEFAULT 1,
+    day_period text DEFAULT 'am',
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- WHOOP metrics are stored as text, exactly as the sync and importer write them
+CREATE TABLE IF NOT EXISTS whoop_recovery (
+    sleep_id text PRIMARY KEY,
+    cycle_id text,
+    recovery_score text,
+    resting_heart_rate text,
+    hrv_rmssd_milli text,
+    spo2_percentage text,
+    skin_temp_celsius text,
+    record_date date,
+    content_hash text
+);
+
+CREATE TABLE IF NOT EXISTS whoop_sleep (
+    id text PRIMARY KEY,
+    cycle_id text,
+    "start" timestamptz,
+    "end" timestamptz,
+    sleep_performance_percentage text,
+    sleep_efficiency_percentage text,
+    sleep_consistency_percentage text,
+    respiratory_rate text,
+    light_sleep_hours text,
+    deep_sleep_hours text,
+    rem_sleep_hours text,
+    total_in_bed_hours text,
+    total_awake_hours text,
+    disturbance_count text,
+    sleep_cycle_count text,
+    baseline_need_hours text,
+    need_from_sleep_debt_hours text,
+    need_from_strain_hours text,
+    record_date date,
+    content_hash text
+);
+
+CREATE TABLE IF NOT EXISTS whoop_workouts (
+    id text PRIMARY KEY,
+    sport_name text,
+    strain text,
+    average_heart_rate text,
+    max_heart_rate text,
+    kilojoule text,
+    distance_meter text,
+    altitude_gain_meter text,
+    record_date date,
+    content_hash text
+);
+
+-- Tables that predate the content-hash skip
+ALTER TABLE whoop_recovery ADD COLUMN IF NOT EXISTS content_hash text;
+ALTER TABLE whoop_sleep ADD COLUMN IF NOT EXISTS content_hash text;
+ALTER TABLE whoop_workouts ADD COLUMN IF NOT EXISTS content_hash text;
+
+CREATE TABLE IF NOT EXISTS whoop_tokens (
+    key text PRIMARY KEY,
+    tokens jsonb NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
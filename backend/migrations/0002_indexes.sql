@@ -0,0 +1,14 @@
+-- Indexes for the hot paths in core/queries.py.
+
+-- Attribute / note subqueries in every entries read, and the delete-then-insert on save
+CREATE INDEX IF NOT EXISTS entry_attributes_entry_id_idx ON entry_attributes (entry_id);
+CREATE INDEX IF NOT EXISTS entry_notes_entry_id_idx ON entry_notes (entry_id);
+
+-- One entry per date and period: backs the save lookup and the date-range list.
+-- Fails if duplicates already exist; merge them first.
+CREATE UNIQUE INDEX IF NOT EXISTS daily_entries_date_period_key ON daily_entries (date, day_period);
+
+-- Chart reads (ordered by record_date) and the sync's "already have this day" check
+CREATE INDEX IF NOT EXISTS whoop_recovery_record_date_idx ON whoop_recovery (record_date);
+CREATE INDEX IF NOT EXISTS whoop_sleep_record_date_idx ON whoop_sleep (record_date);
+CREATE INDEX IF NOT EXISTS whoop_workouts_record_date_idx ON whoop_workouts (record_date);
@@ -0,0 +1,91 @@
+-- Multi-user: every entry, attribute, definition, WHOOP record and token row
+-- belongs to a user. Existing rows go to the owner — the one user the app was
+-- built for — whose id is fixed so core/users.py can fall back to it.
+--
+-- user_id leads every primary key / index the routers read through, so a
+-- user's queries only ever touch that user's slice of each index.
+
+CREATE TABLE IF NOT EXISTS users (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL,
+    api_key_hash text UNIQUE,  -- sha256 of the user's API key; NULL = no key issued
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+INSERT INTO users (id, name)
+VALUES ('00000000-0000-0000-0000-000000000001', 'owner')
+ON CONFLICT (id) DO NOTHING;
+
+-- The backfill default is dropped again right away: from here on every write names its user
+-- (adding a column with a constant default doesn't rewrite the table)
+
+-- 🧩 Entries
+ALTER TABLE daily_entries
+    ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001'
+    REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE daily_entries ALTER COLUMN user_id DROP DEFAULT;
+DROP INDEX IF EXISTS daily_entries_date_period_key;
+CREATE UNIQUE INDEX daily_entries_user_date_period_key ON daily_entries (user_id, date, day_period);
+-- Target of the children's (user_id, entry_id) foreign keys, so a child can't point at another user's entry
+ALTER TABLE daily_entries ADD CONSTRAINT daily_entries_user_id_id_key UNIQUE (user_id, id);
+
+ALTER TABLE entry_attributes ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001';
+ALTER TABLE entry_attributes ALTER COLUMN user_id DROP DEFAULT;
+ALTER TABLE entry_attributes DROP CONSTRAINT IF EXISTS entry_attributes_entry_id_fkey;
+ALTER TABLE entry_attributes ADD CONSTRAINT entry_attributes_entry_fkey
+    FOREIGN KEY (user_id, entry_id) REFERENCES daily_entries (user_id, id) ON DELETE CASCADE;
+DROP INDEX IF EXISTS entry_attributes_entry_id_idx;
+CREATE INDEX entry_attributes_user_entry_idx ON entry_attributes (user_id, entry_id);
+
+ALTER TABLE entry_notes ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001';
+ALTER TABLE entry_notes ALTER COLUMN user_id DROP DEFAULT;
+ALTER TABLE entry_notes DROP CONSTRAINT IF EXISTS entry_notes_entry_id_fkey;
+ALTER TABLE entry_notes ADD CONSTRAINT entry_notes_entry_fkey
+    FOREIGN KEY (user_id, entry_id) REFERENCES daily_entries (user_id, id) ON DELETE CASCADE;
+DROP INDEX IF EXISTS entry_notes_entry_id_idx;
+CREATE INDEX entry_notes_user_entry_idx ON entry_notes (user_id, entry_id);
+
+-- 🏷️ Attribute definitions (index matches the list's ORDER BY)
+ALTER TABLE attribute_definitions
+    ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001'
+    REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE attribute_definitions ALTER COLUMN user_id DROP DEFAULT;
+CREATE INDEX attribute_definitions_user_idx ON attribute_definitions (user_id, category, day_period, label);
+
+-- 🟩 WHOOP records: keyed per user, so two users can't overwrite each other's rows
+ALTER TABLE whoop_recovery
+    ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001'
+    REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE whoop_recovery ALTER COLUMN user_id DROP DEFAULT;
+ALTER TABLE whoop_recovery DROP CONSTRAINT whoop_recovery_pkey;
+ALTER TABLE whoop_recovery ADD PRIMARY KEY (user_id, sleep_id);
+DROP INDEX IF EXISTS whoop_recovery_record_date_idx;
+CREATE INDEX whoop_recovery_user_date_idx ON whoop_recovery (user_id, record_date);
+
+ALTER TABLE whoop_sleep
+    ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001'
+    REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE whoop_sleep ALTER COLUMN user_id DROP DEFAULT;
+ALTER TABLE whoop_sleep DROP CONSTRAINT whoop_sleep_pkey;
+ALTER TABLE whoop_sleep ADD PRIMARY KEY (user_id, id);
+DROP INDEX IF EXISTS whoop_sleep_record_date_idx;
+CREATE INDEX whoop_sleep_user_date_idx ON whoop_sleep (user_id, record_date);
+
+ALTER TABLE whoop_workouts
+    ADD COLUMN user_id uuid NOT NULL DEFAULT '00000000-0000-0000-0000-000000000001'
+    REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE whoop_workouts ALTER COLUMN user_id DROP DEFAULT;
+ALTER TABLE whoop_workouts DROP CONSTRAINT whoop_workouts_pkey;
+ALTER TABLE whoop_workouts ADD PRIMARY KEY (user_id, id);
+DROP INDEX IF EXISTS whoop_workouts_record_date_idx;
+CREATE INDEX whoop_workouts_user_date_idx ON whoop_workouts (user_id, record_date);
+
+-- 🔑 WHOOP tokens: one row per user instead of the single 'default' key.
+-- whoop_user_id (WHOOP's own id, sent with every webhook) routes webhooks to the right user.
+ALTER TABLE whoop_tokens ADD COLUMN user_id uuid REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE whoop_tokens ADD COLUMN whoop_user_id bigint;
+UPDATE whoop_tokens SET user_id = '00000000-0000-0000-0000-000000000001' WHERE key = 'default';
+DELETE FROM whoop_tokens WHERE user_id IS NULL;
+ALTER TABLE whoop_tokens DROP CONSTRAINT whoop_tokens_pkey;
+ALTER TABLE whoop_tokens DROP COLUMN key;
+ALTER TABLE whoop_tokens ADD PRIMARY KEY (user_id);
+CREATE INDEX whoop_tokens_whoop_user_idx ON whoop_tokens (whoop_user_id);
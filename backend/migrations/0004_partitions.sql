@@ -0,0 +1,145 @@
+-- Yearly range partitions for the date-ordered history tables:
+--
+--     daily_entries                     PARTITION BY RANGE (date)
+--     whoop_recovery / _sleep / _workouts  PARTITION BY RANGE (record_date)
+--
+-- Each table gets <table>_<year> partitions plus <table>_default, which catches
+-- rows outside every created year (and WHOOP rows without a record_date).
+-- ensure_year_partitions() creates missing years — core/partitions.py calls it
+-- ahead of time and for any year that shows up in a default partition — and an
+-- old year is archived by detaching its partition (scripts/partitions.py).
+--
+-- Every unique key of a partitioned table has to contain the partition key:
+--   * WHOOP rows are unique on (user_id, id, record_date). NULLS NOT DISTINCT
+--     keeps undated rows unique too, which needs PostgreSQL 15+.
+--   * daily_entries' primary key becomes (id, date). Its children reference
+--     (user_id, date, id), so entry_attributes / entry_notes carry entry_date.
+--
+-- Per-user reads still go through the (user_id, date) b-trees; the BRIN
+-- indexes on the date columns are a few pages per partition and serve
+-- date-range scans across users (archiving, exports, backfills).
+
+CREATE OR REPLACE FUNCTION ensure_year_partitions(parent text, date_column text, years int[])
+RETURNS SETOF text
+LANGUAGE plpgsql AS $$
+DECLARE
+    y int;
+    child text;
+    lo date;
+    hi date;
+BEGIN
+    -- Serializes concurrent callers (two instances starting at once); released at commit
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_year_partitions'));
+    FOREACH y IN ARRAY years LOOP
+        child := parent || '_' || y;
+        CONTINUE WHEN to_regclass(child) IS NOT NULL;
+        lo := make_date(y, 1, 1);
+        hi := make_date(y + 1, 1, 1);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', child, parent);
+        -- Rows that landed in the default partition before this year existed move over,
+        -- otherwise ATTACH would find them there and refuse
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            parent || '_default', date_column, lo, date_column, hi, child
+        );
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', parent, child, lo, hi);
+        RETURN NEXT child;
+    END LOOP;
+END
+$$;
+
+
+-- 🧩 Entries
+-- The children's foreign keys have to go before daily_entries can be swapped out
+ALTER TABLE entry_attributes DROP CONSTRAINT entry_attributes_entry_fkey;
+ALTER TABLE entry_notes DROP CONSTRAINT entry_notes_entry_fkey;
+
+ALTER TABLE entry_attributes ADD COLUMN entry_date date;
+UPDATE entry_attributes a SET entry_date = e.date FROM daily_entries e WHERE e.id = a.entry_id;
+ALTER TABLE entry_attributes ALTER COLUMN entry_date SET NOT NULL;
+ALTER TABLE entry_notes ADD COLUMN entry_date date;
+UPDATE entry_notes n SET entry_date = e.date FROM daily_entries e WHERE e.id = n.entry_id;
+ALTER TABLE entry_notes ALTER COLUMN entry_date SET NOT NULL;
+
+CREATE TABLE daily_entries_partitioned (LIKE daily_entries INCLUDING DEFAULTS) PARTITION BY RANGE (date);
+ALTER TABLE daily_entries RENAME TO daily_entries_unpartitioned;
+ALTER TABLE daily_entries_partitioned RENAME TO daily_entries;
+CREATE TABLE daily_entries_default PARTITION OF daily_entries DEFAULT;
+SELECT ensure_year_partitions('daily_entries', 'date', ARRAY(
+    SELECT DISTINCT extract(year FROM date)::int FROM daily_entries_unpartitioned
+    UNION SELECT extract(year FROM now())::int + g FROM generate_series(0, 1) g
+));
+INSERT INTO daily_entries SELECT * FROM daily_entries_unpartitioned;
+DROP TABLE daily_entries_unpartitioned;
+
+-- Indexes are built after the copy, once per partition
+ALTER TABLE daily_entries ADD PRIMARY KEY (id, date);
+ALTER TABLE daily_entries ADD CONSTRAINT daily_entries_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE;
+CREATE UNIQUE INDEX daily_entries_user_date_period_key ON daily_entries (user_id, date, day_period);
+ALTER TABLE daily_entries ADD CONSTRAINT daily_entries_user_date_id_key UNIQUE (user_id, date, id);
+CREATE INDEX daily_entries_date_brin ON daily_entries USING brin (date);
+
+-- entry_date trails the index so the (user_id, entry_id) lookups keep using it
+ALTER TABLE entry_attributes ADD CONSTRAINT entry_attributes_entry_fkey
+    FOREIGN KEY (user_id, entry_date, entry_id) REFERENCES daily_entries (user_id, date, id) ON DELETE CASCADE;
+DROP INDEX entry_attributes_user_entry_idx;
+CREATE INDEX entry_attributes_user_entry_idx ON entry_attributes (user_id, entry_id, entry_date);
+
+ALTER TABLE entry_notes ADD CONSTRAINT entry_notes_entry_fkey
+    FOREIGN KEY (user_id, entry_date, entry_id) REFERENCES daily_entries (user_id, date, id) ON DELETE CASCADE;
+DROP INDEX entry_notes_user_entry_idx;
+CREATE INDEX entry_notes_user_entry_idx ON entry_notes (user_id, entry_id, entry_date);
+
+
+-- 🟩 WHOOP records
+CREATE TABLE whoop_recovery_partitioned (LIKE whoop_recovery INCLUDING DEFAULTS) PARTITION BY RANGE (record_date);
+ALTER TABLE whoop_recovery RENAME TO whoop_recovery_unpartitioned;
+ALTER TABLE whoop_recovery_partitioned RENAME TO whoop_recovery;
+CREATE TABLE whoop_recovery_default PARTITION OF whoop_recovery DEFAULT;
+SELECT ensure_year_partitions('whoop_recovery', 'record_date', ARRAY(
+    SELECT DISTINCT extract(year FROM record_date)::int FROM whoop_recovery_unpartitioned WHERE record_date IS NOT NULL
+    UNION SELECT extract(year FROM now())::int + g FROM generate_series(0, 1) g
+));
+INSERT INTO whoop_recovery SELECT * FROM whoop_recovery_unpartitioned;
+DROP TABLE whoop_recovery_unpartitioned;
+ALTER TABLE whoop_recovery ADD CONSTRAINT whoop_recovery_key UNIQUE NULLS NOT DISTINCT (user_id, sleep_id, record_date);
+ALTER TABLE whoop_recovery ADD CONSTRAINT whoop_recovery_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE;
+CREATE INDEX whoop_recovery_user_date_idx ON whoop_recovery (user_id, record_date);
+CREATE INDEX whoop_recovery_date_brin ON whoop_recovery USING brin (record_date);
+
+CREATE TABLE whoop_sleep_partitioned (LIKE whoop_sleep INCLUDING DEFAULTS) PARTITION BY RANGE (record_date);
+ALTER TABLE whoop_sleep RENAME TO whoop_sleep_unpartitioned;
+ALTER TABLE whoop_sleep_partitioned RENAME TO whoop_sleep;
+CREATE TABLE whoop_sleep_default PARTITION OF whoop_sleep DEFAULT;
+SELECT ensure_year_partitions('whoop_sleep', 'record_date', ARRAY(
+    SELECT DISTINCT extract(year FROM record_date)::int FROM whoop_sleep_unpartitioned WHERE record_date IS NOT NULL
+    UNION SELECT extract(year FROM now())::int + g FROM generate_series(0, 1) g
+));
+INSERT INTO whoop_sleep SELECT * FROM whoop_sleep_unpartitioned;
+DROP TABLE whoop_sleep_unpartitioned;
+ALTER TABLE whoop_sleep ADD CONSTRAINT whoop_sleep_key UNIQUE NULLS NOT DISTINCT (user_id, id, record_date);
+ALTER TABLE whoop_sleep ADD CONSTRAINT whoop_sleep_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE;
+CREATE INDEX whoop_sleep_user_date_idx ON whoop_sleep (user_id, record_date);
+CREATE INDEX whoop_sleep_date_brin ON whoop_sleep USING brin (record_date);
+
+CREATE TABLE whoop_workouts_partitioned (LIKE whoop_workouts INCLUDING DEFAULTS) PARTITION BY RANGE (record_date);
+ALTER TABLE whoop_workouts RENAME TO whoop_workouts_unpartitioned;
+ALTER TABLE whoop_workouts_partitioned RENAME TO whoop_workouts;
+CREATE TABLE whoop_workouts_default PARTITION OF whoop_workouts DEFAULT;
+SELECT ensure_year_partitions('whoop_workouts', 'record_date', ARRAY(
+    SELECT DISTINCT extract(year FROM record_date)::int FROM whoop_workouts_unpartitioned WHERE record_date IS NOT NULL
+    UNION SELECT extract(year FROM now())::int + g FROM generate_series(0, 1) g
+));
+INSERT INTO whoop_workouts SELECT * FROM whoop_workouts_unpartitioned;
+DROP TABLE whoop_workouts_unpartitioned;
+ALTER TABLE whoop_workouts ADD CONSTRAINT whoop_workouts_key UNIQUE NULLS NOT DISTINCT (user_id, id, record_date);
+ALTER TABLE whoop_workouts ADD CONSTRAINT whoop_workouts_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE;
+CREATE INDEX whoop_workouts_user_date_idx ON whoop_workouts (user_id, record_date);
+CREATE INDEX whoop_workouts_date_brin ON whoop_workouts USING brin (record_date);
+
+-- Fresh tables have no statistics until autovacuum gets to them, and it never analyzes the parents
+ANALYZE daily_entries, entry_attributes, entry_notes, whoop_recovery, whoop_sleep, whoop_workouts;
@@ -0,0 +1,35 @@
+-- Background WHOOP jobs (core/whoop_jobs.py). POST /whoop/jobs/backfill queues a
+-- row here and returns its id; a bounded pool of workers claims queued rows
+-- with FOR UPDATE SKIP LOCKED, so several instances can share the table.
+--
+-- The worker writes each page's records and the job's progress in one
+-- transaction: (resource, next_token) is always the exact page to continue
+-- from, whether the job is resumed after a crash, a restart or a failure.
+
+CREATE TABLE IF NOT EXISTS whoop_jobs (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id uuid NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    kind text NOT NULL DEFAULT 'backfill',
+    status text NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    resource text,                                -- resource being fetched (NULL = not started)
+    next_token text,                              -- WHOOP nextToken of the page to fetch next
+    pages_fetched integer NOT NULL DEFAULT 0,
+    records_fetched integer NOT NULL DEFAULT 0,
+    records_written integer NOT NULL DEFAULT 0,   -- inserted + updated
+    progress jsonb NOT NULL DEFAULT '{}',         -- resource → pages, records, inserted, updated, unchanged, done
+    cancel_requested boolean NOT NULL DEFAULT false,
+    error text,
+    attempts integer NOT NULL DEFAULT 0,          -- claims; a worker that lost its claim stops writing
+    created_at timestamptz NOT NULL DEFAULT now(),
+    started_at timestamptz,
+    heartbeat_at timestamptz,                     -- last page; a running job that stops beating is re-claimed
+    finished_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS whoop_jobs_user_created_idx ON whoop_jobs (user_id, created_at DESC);
+-- What the workers poll; stays tiny because finished jobs drop out of it
+CREATE INDEX IF NOT EXISTS whoop_jobs_pending_idx ON whoop_jobs (created_at) WHERE status IN ('queued', 'running');
+-- One queued/running job of each kind per user: a second POST gets the existing job back
+CREATE UNIQUE INDEX IF NOT EXISTS whoop_jobs_user_active_key ON whoop_jobs (user_id, kind)
+    WHERE status IN ('queued', 'running');
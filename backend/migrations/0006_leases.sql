@@ -0,0 +1,12 @@
+-- Named leases for work that must run on one instance at a time but spans
+-- slow non-database calls (the scheduled WHOOP sync, core/whoop_scheduler.py).
+--
+-- An advisory lock would have to keep its transaction — and a pooled server
+-- connection — open for the whole run. A lease is taken, renewed and released
+-- in short transactions of their own; if its holder dies, it simply expires.
+
+CREATE TABLE IF NOT EXISTS leases (
+    name text PRIMARY KEY,
+    holder text NOT NULL,               -- "<host>:<pid>:<random>" of the instance holding it
+    expires_at timestamptz NOT NULL
+);
@@ -0,0 +1,22 @@
+from sqlalchemy import Table, Column, Text, Boolean, Numeric, TIMESTAMP, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from core.database import metadata
+
+# Mirrors migrations/; change the schema with a new migration, then update this to match
+
+attribute_definitions = Table(
+    "attribute_definitions",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("name", Text, nullable=False),
+    Column("label", Text, nullable=False),
+    Column("unit", Text),
+    Column("category", Text),
+    Column("active", Boolean, server_default=text("true")),
+    Column("default_visible", Boolean, server_default=text("true")),
+    Column("weight", Numeric, server_default=text("1")),
+    Column("day_period", Text, server_default="am"),
+    Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
+    Index("attribute_definitions_user_idx", "user_id", "category", "day_period", "label"),
+)
@@ -1,15 +1,26 @@
-from sqlalchemy import Table, Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Table, Column, Date, Text, TIMESTAMP, ForeignKeyConstraint, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from core.database import metadata
 
+# Mirrors migrations/; change the schema with a new migration, then update this to match
+
 entry_attributes = Table(
     "entry_attributes",
     metadata,
-    Column("id", UUID(as_uuid=True), primary_key=True),
-    Column("entry_id", UUID(as_uuid=True), ForeignKey("daily_entries.id", ondelete="CASCADE"), nullable=False),
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("entry_id", UUID(as_uuid=True), nullable=False),
+    Column("entry_date", Date, nullable=False),
     Column("name", Text, nullable=False),
     Column("value", Text),
     Column("unit", Text),
     Column("note", Text),
     Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
-)
\ No newline at end of file
+    ForeignKeyConstraint(
+        ["user_id", "entry_date", "entry_id"],
+        ["daily_entries.user_id", "daily_entries.date", "daily_entries.id"],
+        name="entry_attributes_entry_fkey",
+        ondelete="CASCADE",
+    ),
+    Index("entry_attributes_user_entry_idx", "user_id", "entry_id", "entry_date"),
+)
@@ -1,12 +1,22 @@
-from sqlalchemy import Table, Column, Date, Text, TIMESTAMP, func
+from sqlalchemy import Table, Column, Date, Text, TIMESTAMP, ForeignKey, Index, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from core.database import metadata
 
+# Mirrors migrations/; change the schema with a new migration, then update this to match
+
+# Partitioned by year on date (core/partitions.py), so every unique key includes it
 daily_entries = Table(
     "daily_entries",
     metadata,
-    Column("id", UUID(as_uuid=True), primary_key=True),
-    Column("date", Date, nullable=False),
-    Column("visibility", Text, nullable=False),
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("date", Date, primary_key=True),
+    Column("day_period", Text, nullable=False, server_default="am"),
+    Column("visibility", Text, nullable=False, server_default="private"),
+    Column("notes", Text),
     Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
-)
\ No newline at end of file
+    Index("daily_entries_user_date_period_key", "user_id", "date", "day_period", unique=True),
+    UniqueConstraint("user_id", "date", "id", name="daily_entries_user_date_id_key"),
+    Index("daily_entries_date_brin", "date", postgresql_using="brin"),
+    postgresql_partition_by="RANGE (date)",
+)
@@ -0,0 +1,23 @@
+from sqlalchemy import Table, Column, Date, Text, TIMESTAMP, ForeignKeyConstraint, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from core.database import metadata
+
+# Mirrors migrations/; change the schema with a new migration, then update this to match
+
+entry_notes = Table(
+    "entry_notes",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("entry_id", UUID(as_uuid=True), nullable=False),
+    Column("entry_date", Date, nullable=False),
+    Column("content", Text, nullable=False),
+    Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
+    ForeignKeyConstraint(
+        ["user_id", "entry_date", "entry_id"],
+        ["daily_entries.user_id", "daily_entries.date", "daily_entries.id"],
+        name="entry_notes_entry_fkey",
+        ondelete="CASCADE",
+    ),
+    Index("entry_notes_user_entry_idx", "user_id", "entry_id", "entry_date"),
+)
@@ -0,0 +1,12 @@
+from sqlalchemy import Table, Column, Text, TIMESTAMP
+from core.database import metadata
+
+# Mirrors migrations/; one row per named lease (core/whoop_scheduler.py)
+
+leases = Table(
+    "leases",
+    metadata,
+    Column("name", Text, primary_key=True),
+    Column("holder", Text, nullable=False),
+    Column("expires_at", TIMESTAMP(timezone=True), nullable=False),
+)
@@ -0,0 +1,14 @@
+from sqlalchemy import Table, Column, Text, TIMESTAMP, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from core.database import metadata
+
+# Mirrors migrations/; change the schema with a new migration, then update this to match
+
+users = Table(
+    "users",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("name", Text, nullable=False),
+    Column("api_key_hash", Text, unique=True),
+    Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
+)
@@ -0,0 +1,77 @@
+from sqlalchemy import Table, Column, Date, Text, TIMESTAMP, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from core.database import metadata
+
+# Mirrors migrations/. WHOOP metrics are stored as text, exactly as the sync and importer have always written them.
+# content_hash fingerprints the transformed row so re-imports can skip records that haven't changed.
+# Partitioned by year on record_date (core/partitions.py): no primary key, rows are unique on
+# (user_id, WHOOP id, record_date) with NULLS NOT DISTINCT.
+
+whoop_recovery = Table(
+    "whoop_recovery",
+    metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("sleep_id", Text, nullable=False),
+    Column("cycle_id", Text),
+    Column("recovery_score", Text),
+    Column("resting_heart_rate", Text),
+    Column("hrv_rmssd_milli", Text),
+    Column("spo2_percentage", Text),
+    Column("skin_temp_celsius", Text),
+    Column("record_date", Date),
+    Column("content_hash", Text),
+    UniqueConstraint("user_id", "sleep_id", "record_date", name="whoop_recovery_key", postgresql_nulls_not_distinct=True),
+    Index("whoop_recovery_user_date_idx", "user_id", "record_date"),
+    Index("whoop_recovery_date_brin", "record_date", postgresql_using="brin"),
+    postgresql_partition_by="RANGE (record_date)",
+)
+
+whoop_sleep = Table(
+    "whoop_sleep",
+    metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("id", Text, nullable=False),
+    Column("cycle_id", Text),
+    Column("start", TIMESTAMP(timezone=True)),
+    Column("end", TIMESTAMP(timezone=True)),
+    Column("sleep_performance_percentage", Text),
+    Column("sleep_efficiency_percentage", Text),
+    Column("sleep_consistency_percentage", Text),
+    Column("respiratory_rate", Text),
+    Column("light_sleep_hours", Text),
+    Column("deep_sleep_hours", Text),
+    Column("rem_sleep_hours", Text),
+    Column("total_in_bed_hours", Text),
+    Column("total_awake_hours", Text),
+    Column("disturbance_count", Text),
+    Column("sleep_cycle_count", Text),
+    Column("baseline_need_hours", Text),
+    Column("need_from_sleep_debt_hours", Text),
+    Column("need_from_strain_hours", Text),
+    Column("record_date", Date),
+    Column("content_hash", Text),
+    UniqueConstraint("user_id", "id", "record_date", name="whoop_sleep_key", postgresql_nulls_not_distinct=True),
+    Index("whoop_sleep_user_date_idx", "user_id", "record_date"),
+    Index("whoop_sleep_date_brin", "record_date", postgresql_using="brin"),
+    postgresql_partition_by="RANGE (record_date)",
+)
+
+whoop_workouts = Table(
+    "whoop_workouts",
+    metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("id", Text, nullable=False),
+    Column("sport_name", Text),
+    Column("strain", Text),
+    Column("average_heart_rate", Text),
+    Column("max_heart_rate", Text),
+    Column("kilojoule", Text),
+    Column("distance_meter", Text),
+    Column("altitude_gain_meter", Text),
+    Column("record_date", Date),
+    Column("content_hash", Text),
+    UniqueConstraint("user_id", "id", "record_date", name="whoop_workouts_key", postgresql_nulls_not_distinct=True),
+    Index("whoop_workouts_user_date_idx", "user_id", "record_date"),
+    Index("whoop_workouts_date_brin", "record_date", postgresql_using="brin"),
+    postgresql_partition_by="RANGE (record_date)",
+)
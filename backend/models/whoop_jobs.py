@@ -0,0 +1,32 @@
+from sqlalchemy import Table, Column, Text, Boolean, Integer, TIMESTAMP, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from core.database import metadata
+
+# Mirrors migrations/; background WHOOP jobs and their resumable progress (core/whoop_jobs.py)
+
+ACTIVE = text("status IN ('queued', 'running')")
+
+whoop_jobs = Table(
+    "whoop_jobs",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("kind", Text, nullable=False, server_default="backfill"),
+    Column("status", Text, nullable=False, server_default="queued"),
+    Column("resource", Text),
+    Column("next_token", Text),
+    Column("pages_fetched", Integer, nullable=False, server_default="0"),
+    Column("records_fetched", Integer, nullable=False, server_default="0"),
+    Column("records_written", Integer, nullable=False, server_default="0"),
+    Column("progress", JSONB, nullable=False, server_default=text("'{}'")),
+    Column("cancel_requested", Boolean, nullable=False, server_default=text("false")),
+    Column("error", Text),
+    Column("attempts", Integer, nullable=False, server_default="0"),
+    Column("created_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
+    Column("started_at", TIMESTAMP(timezone=True)),
+    Column("heartbeat_at", TIMESTAMP(timezone=True)),
+    Column("finished_at", TIMESTAMP(timezone=True)),
+    Index("whoop_jobs_user_created_idx", "user_id", text("created_at DESC")),
+    Index("whoop_jobs_pending_idx", "created_at", postgresql_where=ACTIVE),
+    Index("whoop_jobs_user_active_key", "user_id", "kind", unique=True, postgresql_where=ACTIVE),
+)
@@ -0,0 +1,15 @@
+from sqlalchemy import Table, Column, BigInteger, TIMESTAMP, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from core.database import metadata
+
+# Mirrors migrations/; one row per user, whoop_user_id routes webhooks to it
+
+whoop_tokens = Table(
+    "whoop_tokens",
+    metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("whoop_user_id", BigInteger),
+    Column("tokens", JSONB, nullable=False),
+    Column("updated_at", TIMESTAMP(timezone=True), server_default=func.now(), nullable=False),
+    Index("whoop_tokens_whoop_user_idx", "whoop_user_id"),
+)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import text
-from core.database import engine
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core import queries as q  # ✅ registered, prepared-statement friendly SQL
+from core.db_routing import read_db, write_db
+from core.users import current_user
+from uuid import UUID
 
 router = APIRouter(prefix="/attribute-definitions", tags=["Attribute Definitions"])
 
@@ -8,29 +11,13 @@ router = APIRouter(prefix="/attribute-definitions", tags=["Attribute Definitions
 # 📋 List All
 # =====================================================
 @router.get("/")
-async def list_attributes():
+async def list_attributes(db: AsyncEngine = Depends(read_db), user_id: UUID = Depends(current_user)):
     """
     Returns all attribute definitions, including AM/PM (day_period).
     Sorted by category, then period, then label.
     """
-    async with engine.connect() as conn:
-        result = await conn.execute(
-            text("""
-                SELECT
-                    id,
-                    name,
-                    label,
-                    unit,
-                    category,
-                    active,
-                    default_visible,
-                    weight,
-                    day_period,
-                    created_at
-                FROM attribute_definitions
-                ORDER BY category, day_period, label
-            """)
-        )
+    async with db.connect() as conn:
+        result = await conn.execute(q.ATTRIBUTES_LIST, {"u": user_id})
         return [dict(r) for r in result.mappings().all()]
 
 
@@ -38,7 +25,7 @@ async def list_attributes():
 # ➕ Create Attribute
 # =====================================================
 @router.post("/")
-async def create_attribute(payload: dict):
+async def create_attribute(payload: dict, db: AsyncEngine = Depends(write_db), user_id: UUID = Depends(current_user)):
     """
     Creates a new attribute definition.
     Required fields: name, label.
@@ -54,16 +41,11 @@ async def create_attribute(payload: dict):
     if day_period not in ("am", "pm"):
         raise HTTPException(status_code=400, detail="day_period must be 'am' or 'pm'")
 
-    async with engine.begin() as conn:
+    async with db.begin() as conn:
         res = await conn.execute(
-            text("""
-                INSERT INTO attribute_definitions
-                    (name, label, unit, category, active, default_visible, weight, day_period)
-                VALUES
-                    (:name, :label, :unit, :category, :active, :default_visible, :weight, :day_period)
-                RETURNING id
-            """),
+            q.ATTRIBUTE_INSERT,
             {
+                "u": user_id,
                 "name": payload["name"].strip(),
                 "label": payload["label"].strip(),
                 "unit": payload.get("unit"),
@@ -83,7 +65,12 @@ async def create_attribute(payload: dict):
 # ✏️ Update Attribute
 # =====================================================
 @router.put("/{attr_id}")
-async def update_attribute(attr_id: str, payload: dict):
+async def update_attribute(
+    attr_id: str,
+    payload: dict,
+    db: AsyncEngine = Depends(write_db),
+    user_id: UUID = Depends(current_user),
+):
     """
     Updates an existing attribute definition.
     Only provided fields are updated.
@@ -92,23 +79,11 @@ async def update_attribute(attr_id: str, payload: dict):
     if day_period not in ("am", "pm"):
         raise HTTPException(status_code=400, detail="day_period must be 'am' or 'pm'")
 
-    async with engine.begin() as conn:
+    async with db.begin() as conn:
         res = await conn.execute(
-            text("""
-                UPDATE attribute_definitions
-                SET
-                    name = :name,
-                    label = :label,
-                    unit = :unit,
-                    category = :category,
-                    active = :active,
-                    default_visible = :default_visible,
-                    weight = :weight,
-                    day_period = :day_period
-                WHERE id = :id
-                RETURNING id
-            """),
+            q.ATTRIBUTE_UPDATE,
             {
+                "u": user_id,
                 "id": attr_id,
                 "name": payload.get("name"),
                 "label": payload.get("label"),
@@ -131,14 +106,14 @@ async def update_attribute(attr_id: str, payload: dict):
 # ❌ Delete Attribute
 # =====================================================
 @router.delete("/{attr_id}")
-async def delete_attribute(attr_id: str):
+async def delete_attribute(attr_id: str, db: AsyncEngine = Depends(write_db), user_id: UUID = Depends(current_user)):
     """
     Deletes an attribute definition by ID.
     """
-    async with engine.begin() as conn:
+    async with db.begin() as conn:
         res = await conn.execute(
-            text("DELETE FROM attribute_definitions WHERE id = :id"),
-            {"id": attr_id},
+            q.ATTRIBUTE_DELETE,
+            {"u": user_id, "id": attr_id},
         )
         if res.rowcount == 0:
             raise HTTPException(status_code=404, detail="Attribute not found")
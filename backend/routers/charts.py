@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from core.database import engine
-from sqlalchemy import text
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core import queries as q  # ✅ registered, prepared-statement friendly SQL
+from core.db_routing import read_db  # ✅ heavy scans go to the replica when there is one
+from core.users import current_user  # ✅ one user's WHOOP rows (leading user_id index)
+from core.timing import add_span  # ⏱️ splits Server-Timing into db / aggregate / app (serialization)
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
 import statistics
+import time
 
 router = APIRouter(prefix="/charts", tags=["Charts"])
 
@@ -27,52 +33,36 @@ def _avg(values):
 # 📊 WHOOP Charts Endpoint
 # =====================================================
 @router.get("/overview")
-async def get_whoop_charts():
+async def get_whoop_charts(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncEngine = Depends(read_db),
+    user_id: UUID = Depends(current_user),
+):
     """
     Return combined WHOOP analytics for Recovery, Sleep, and Workouts
-    with advanced derived stats and insights.
+    with advanced derived stats and insights, optionally for a date range only
+    (which reads just the yearly partitions it covers).
     """
+    params = {"u": user_id}
+    if date_from:
+        params["df"] = date_from
+    if date_to:
+        params["dt"] = date_to
+    statements = q.chart_queries(bool(date_from), bool(date_to))
+
     try:
-        async with engine.connect() as conn:
+        async with db.connect() as conn:
             # === RECOVERY ===
-            recovery = (
-                await conn.execute(
-                    text("""
-                        SELECT record_date, recovery_score, resting_heart_rate, hrv_rmssd_milli,
-                               spo2_percentage, skin_temp_celsius
-                        FROM whoop_recovery
-                        WHERE record_date IS NOT NULL
-                        ORDER BY record_date ASC
-                    """)
-                )
-            ).mappings().all()
+            recovery = (await conn.execute(statements["recovery"], params)).mappings().all()
 
             # === SLEEP ===
-            sleep = (
-                await conn.execute(
-                    text("""
-                        SELECT record_date, sleep_performance_percentage, sleep_efficiency_percentage,
-                               rem_sleep_hours, deep_sleep_hours, respiratory_rate,
-                               EXTRACT(EPOCH FROM ("end" - "start")) / 3600 AS total_sleep_hours
-                        FROM whoop_sleep
-                        WHERE record_date IS NOT NULL
-                        ORDER BY record_date ASC
-                    """)
-                )
-            ).mappings().all()
+            sleep = (await conn.execute(statements["sleep"], params)).mappings().all()
 
             # === WORKOUTS ===
-            workouts = (
-                await conn.execute(
-                    text("""
-                        SELECT record_date, sport_name, strain, average_heart_rate, max_heart_rate,
-                               kilojoule, distance_meter, altitude_gain_meter
-                        FROM whoop_workouts
-                        WHERE record_date IS NOT NULL
-                        ORDER BY record_date ASC
-                    """)
-                )
-            ).mappings().all()
+            workouts = (await conn.execute(statements["workouts"], params)).mappings().all()
+
+        aggregate_started = time.perf_counter()
 
         # =====================================================
         # 🩺 RECOVERY ANALYTICS
@@ -200,6 +190,8 @@ async def get_whoop_charts():
             else:
                 longevity_insights.append("Fatigue warning — strain outweighs recovery capacity.")
 
+        add_span("aggregate", time.perf_counter() - aggregate_started)
+
         # =====================================================
         # ✅ Return structured response
         # =====================================================
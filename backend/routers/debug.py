@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from core.admin import require_admin
+from core.slow_queries import slow_query_log
+from core.profiler import profile_store
+from core.event_hub import event_hub
+
+# 🔐 Everything here needs the X-Admin-Token header (and is 404 without ADMIN_TOKEN set)
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_admin)])
+
+
+# =====================================================
+# 🐢 Slow queries
+# =====================================================
+@router.get("/slow-queries")
+async def get_slow_queries(limit: int = Query(None, ge=1)):
+    """
+    Statements slower than DB_SLOW_QUERY_MS, newest first: SQL, parameter
+    shape, duration, request path and — for sampled ones — the EXPLAIN plan.
+    """
+    return slow_query_log.snapshot(limit)
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries():
+    slow_query_log.clear()
+    return {"message": "🧹 Slow-query log cleared"}
+
+
+# =====================================================
+# 🔬 Request profiles
+# =====================================================
+@router.get("/profiles")
+async def list_profiles():
+    """Recent ?profile=1 requests (newest first), without their stacks."""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    Folded stacks ("frame;frame;frame count") — feed to flamegraph.pl or
+    drop into speedscope.app.
+    """
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(404, "Profile not found")
+    return PlainTextResponse(profile["folded"])
+
+
+# =====================================================
+# 📡 Live events
+# =====================================================
+@router.get("/events")
+async def event_stats():
+    """Connected /events clients and events published by this instance."""
+    return event_hub.stats()
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncEngine
 from schemas.entry import EntryCreate, NoteCreate
-from core.database import engine
-from sqlalchemy import text
+from core import queries as q  # ✅ hot statements live in the query registry
+from core.db_routing import read_db, write_db  # ✅ reads may use the replica, writes pin the primary
+from core.users import current_user  # ✅ every statement is scoped to the caller's rows
+from core.event_hub import event_hub  # 📡 committed writes go out to the caller's /events streams
+from datetime import date
 from typing import Optional
+from uuid import UUID
 
 router = APIRouter(prefix="/entries", tags=["Entries"])
 
@@ -11,65 +16,41 @@ router = APIRouter(prefix="/entries", tags=["Entries"])
 # 🧩 Create or Upsert Entry (AM/PM supported)
 # ============================================================
 @router.post("/")
-async def create_or_upsert_entry(entry: EntryCreate, upsert: bool = True):
+async def create_or_upsert_entry(
+    entry: EntryCreate,
+    upsert: bool = True,
+    db: AsyncEngine = Depends(write_db),
+    user_id: UUID = Depends(current_user),
+):
     """
     Create or update a daily entry keyed by (date, day_period).
     Stores visibility, optional notes, and attributes.
     """
-    async with engine.begin() as conn:
-        # ✅ Check for existing entry matching BOTH date + day_period
-        existing = await conn.execute(
-            text("""
-                SELECT id FROM daily_entries
-                WHERE date = :d AND day_period = :p
-            """),
-            {"d": entry.date, "p": entry.day_period},
+    async with db.begin() as conn:
+        # ✅ Insert or update the entry for this date + day_period in one atomic statement
+        saved = await conn.execute(
+            q.ENTRY_UPSERT if upsert else q.ENTRY_INSERT_NEW,
+            {
+                "u": user_id,
+                "d": entry.date,
+                "p": entry.day_period,
+                "v": entry.visibility,
+                "n": getattr(entry, "notes", "") or "",
+            },
         )
-        row = existing.fetchone()
+        entry_id = saved.scalar()
 
         # ✅ Duplicate protection
-        if row and not upsert:
+        if entry_id is None:
             raise HTTPException(
                 status_code=409,
                 detail=f"Entry for {entry.date} ({entry.day_period}) already exists",
             )
 
-        # ✅ Update existing entry for that period
-        if row:
-            entry_id = row[0]
-            await conn.execute(
-                text("""
-                    UPDATE daily_entries
-                    SET visibility = :v, notes = :n
-                    WHERE id = :id
-                """),
-                {
-                    "v": entry.visibility,
-                    "n": getattr(entry, "notes", "") or "",
-                    "id": entry_id,
-                },
-            )
-        else:
-            # ✅ Create new AM or PM record
-            inserted = await conn.execute(
-                text("""
-                    INSERT INTO daily_entries (date, day_period, visibility, notes)
-                    VALUES (:d, :p, :v, :n)
-                    RETURNING id
-                """),
-                {
-                    "d": entry.date,
-                    "p": entry.day_period,
-                    "v": entry.visibility,
-                    "n": getattr(entry, "notes", "") or "",
-                },
-            )
-            entry_id = inserted.scalar_one()
-
         # ✅ Clear old attributes for that entry (so AM/PM don’t merge)
         await conn.execute(
-            text("DELETE FROM entry_attributes WHERE entry_id = :eid"),
-            {"eid": entry_id},
+            q.ENTRY_ATTRIBUTES_DELETE,
+            {"u": user_id, "eid": entry_id},
         )
 
         # ✅ Insert new attributes for this entry only
@@ -77,12 +58,11 @@ async def create_or_upsert_entry(entry: EntryCreate, upsert: bool = True):
             if not a.name:
                 continue
             await conn.execute(
-                text("""
-                    INSERT INTO entry_attributes (entry_id, name, value, unit, note)
-                    VALUES (:eid, :name, :value, :unit, :note)
-                """),
+                q.ENTRY_ATTRIBUTE_INSERT,
                 {
+                    "u": user_id,
                     "eid": entry_id,
+                    "ed": entry.date,
                     "name": a.name,
                     "value": a.value,
                     "unit": a.unit,
@@ -90,6 +70,18 @@ async def create_or_upsert_entry(entry: EntryCreate, upsert: bool = True):
                 },
             )
 
+    event_hub.publish(user_id, "entry.saved", {
+        "id": entry_id,
+        "date": entry.date,
+        "day_period": entry.day_period,
+        "visibility": entry.visibility,
+        "notes": getattr(entry, "notes", "") or "",
+        "attributes": sorted(
+            ({"name": a.name, "value": a.value, "unit": a.unit, "note": a.note}
+             for a in getattr(entry, "attributes", []) or [] if a.name),
+            key=lambda a: a["name"],
+        ),
+    })
     return {"id": str(entry_id), "message": f"Entry ({entry.day_period}) upserted successfully"}
 
 
@@ -99,74 +91,25 @@ async def create_or_upsert_entry(entry: EntryCreate, upsert: bool = True):
 @router.get("/")
 async def list_entries(
     visibility: Optional[str] = Query(None, pattern="^(public|private)$"),
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     limit: int = 30,
     offset: int = 0,
+    db: AsyncEngine = Depends(read_db),
+    user_id: UUID = Depends(current_user),
 ):
-    clauses = []
-    params = {}
-
+    params = {"u": user_id}
     if visibility:
-        clauses.append("e.visibility = :vis")
         params["vis"] = visibility
     if date_from:
-        clauses.append("e.date >= :df")
         params["df"] = date_from
     if date_to:
-        clauses.append("e.date <= :dt")
         params["dt"] = date_to
 
-    where_clause = "WHERE " + " AND ".join(clauses) if clauses else ""
-
-    query = text(f"""
-        SELECT
-            e.id,
-            e.date,
-            e.day_period,
-            e.visibility,
-            e.notes,
-            e.created_at,
-            COALESCE(
-                (
-                    SELECT json_agg(
-                        json_build_object(
-                            'name', a.name,
-                            'value', a.value,
-                            'unit', a.unit,
-                            'note', a.note
-                        )
-                        ORDER BY a.name
-                    )
-                    FROM entry_attributes a
-                    WHERE a.entry_id = e.id
-                ),
-                '[]'
-            ) AS attributes,
-            COALESCE(
-                (
-                    SELECT json_agg(
-                        json_build_object(
-                            'id', n.id,
-                            'content', n.content,
-                            'created_at', n.created_at
-                        )
-                        ORDER BY n.created_at ASC
-                    )
-                    FROM entry_notes n
-                    WHERE n.entry_id = e.id
-                ),
-                '[]'
-            ) AS notes
-        FROM daily_entries e
-        {where_clause}
-        ORDER BY e.date DESC,
-                 CASE WHEN e.day_period = 'am' THEN 0 ELSE 1 END,
-                 e.created_at ASC
-        LIMIT :limit OFFSET :offset
-    """)
+    # ✅ One registered statement per filter combination, so it stays prepared
+    query = q.list_entries(bool(visibility), bool(date_from), bool(date_to))
 
-    async with engine.connect() as conn:
+    async with db.connect() as conn:
         result = await conn.execute(query, {**params, "limit": limit, "offset": offset})
         rows = result.mappings().all()
 
@@ -177,52 +120,9 @@ async def list_entries(
 # 🔍 Get Single Entry (full details)
 # ============================================================
 @router.get("/{entry_id}")
-async def get_entry(entry_id: str):
-    query = text("""
-        SELECT
-            e.id,
-            e.date,
-            e.day_period,
-            e.visibility,
-            e.notes,
-            e.created_at,
-            COALESCE(
-                (
-                    SELECT json_agg(
-                        json_build_object(
-                            'name', a.name,
-                            'value', a.value,
-                            'unit', a.unit,
-                            'note', a.note
-                        )
-                        ORDER BY a.name
-                    )
-                    FROM entry_attributes a
-                    WHERE a.entry_id = e.id
-                ),
-                '[]'
-            ) AS attributes,
-            COALESCE(
-                (
-                    SELECT json_agg(
-                        json_build_object(
-                            'id', n.id,
-                            'content', n.content,
-                            'created_at', n.created_at
-                        )
-                        ORDER BY n.created_at ASC
-                    )
-                    FROM entry_notes n
-                    WHERE n.entry_id = e.id
-                ),
-                '[]'
-            ) AS notes
-        FROM daily_entries e
-        WHERE e.id = :id
-    """)
-
-    async with engine.connect() as conn:
-        result = await conn.execute(query, {"id": entry_id})
+async def get_entry(entry_id: str, db: AsyncEngine = Depends(read_db), user_id: UUID = Depends(current_user)):
+    async with db.connect() as conn:
+        result = await conn.execute(q.ENTRY_GET, {"u": user_id, "id": entry_id})
         row = result.mappings().first()
 
     if not row:
@@ -235,26 +135,27 @@ async def get_entry(entry_id: str):
 # 👁️ Update Visibility
 # ============================================================
 @router.patch("/{entry_id}/visibility")
-async def update_entry_visibility(entry_id: str, payload: dict):
+async def update_entry_visibility(
+    entry_id: str,
+    payload: dict,
+    db: AsyncEngine = Depends(write_db),
+    user_id: UUID = Depends(current_user),
+):
     visibility = payload.get("visibility")
     if visibility not in ["public", "private"]:
         raise HTTPException(status_code=400, detail="Invalid visibility value")
 
-    async with engine.begin() as conn:
+    async with db.begin() as conn:
         result = await conn.execute(
-            text("""
-                UPDATE daily_entries
-                SET visibility = :v
-                WHERE id = :id
-                RETURNING id, visibility
-            """),
-            {"v": visibility, "id": entry_id},
+            q.ENTRY_SET_VISIBILITY,
+            {"u": user_id, "v": visibility, "id": entry_id},
         )
         row = result.mappings().first()
 
     if not row:
         raise HTTPException(status_code=404, detail="Entry not found")
 
+    event_hub.publish(user_id, "entry.visibility", {"id": row["id"], "visibility": row["visibility"]})
     return {
         "id": row["id"],
         "visibility": row["visibility"],
@@ -266,60 +167,63 @@ async def update_entry_visibility(entry_id: str, payload: dict):
 # 🗒️ Add Note
 # ============================================================
 @router.post("/{entry_id}/notes")
-async def add_note(entry_id: str, note: NoteCreate):
+async def add_note(
+    entry_id: str,
+    note: NoteCreate,
+    db: AsyncEngine = Depends(write_db),
+    user_id: UUID = Depends(current_user),
+):
     if not note.content or not note.content.strip():
         raise HTTPException(status_code=400, detail="Note content cannot be empty")
 
-    async with engine.begin() as conn:
-        exists = await conn.execute(
-            text("SELECT 1 FROM daily_entries WHERE id = :id"),
-            {"id": entry_id},
-        )
-        if not exists.fetchone():
+    async with db.begin() as conn:
+        entry_date = (await conn.execute(
+            q.ENTRY_DATE,
+            {"u": user_id, "id": entry_id},
+        )).scalar()
+        if entry_date is None:
             raise HTTPException(status_code=404, detail="Entry not found")
 
         result = await conn.execute(
-            text("""
-                INSERT INTO entry_notes (entry_id, content)
-                VALUES (:eid, :content)
-                RETURNING id, content, created_at
-            """),
-            {"eid": entry_id, "content": note.content.strip()},
+            q.ENTRY_NOTE_INSERT,
+            {"u": user_id, "eid": entry_id, "ed": entry_date, "content": note.content.strip()},
         )
         inserted = result.mappings().first()
 
+    event_hub.publish(user_id, "entry.note_added", {"entry_id": entry_id, "note": dict(inserted)})
     return {"message": "Note added successfully", "note": inserted}
 
 # ============================================================
 # 🗑️ Delete Entry
 # ============================================================
 @router.delete("/{entry_id}")
-async def delete_entry(entry_id: str):
+async def delete_entry(entry_id: str, db: AsyncEngine = Depends(write_db), user_id: UUID = Depends(current_user)):
     """
     Delete a single entry and all its related attributes/notes.
     """
-    async with engine.begin() as conn:
+    async with db.begin() as conn:
         # Check existence first
         exists = await conn.execute(
-            text("SELECT 1 FROM daily_entries WHERE id = :id"),
-            {"id": entry_id},
+            q.ENTRY_DATE,
+            {"u": user_id, "id": entry_id},
         )
         if not exists.fetchone():
             raise HTTPException(status_code=404, detail="Entry not found")
 
         # Delete related data first (foreign key cleanup)
         await conn.execute(
-            text("DELETE FROM entry_attributes WHERE entry_id = :id"),
-            {"id": entry_id},
+            q.ENTRY_ATTRIBUTES_DELETE,
+            {"u": user_id, "eid": entry_id},
         )
         await conn.execute(
-            text("DELETE FROM entry_notes WHERE entry_id = :id"),
-            {"id": entry_id},
+            q.ENTRY_NOTES_DELETE,
+            {"u": user_id, "id": entry_id},
         )
         # Delete entry itself
         await conn.execute(
-            text("DELETE FROM daily_entries WHERE id = :id"),
-            {"id": entry_id},
+            q.ENTRY_DELETE,
+            {"u": user_id, "id": entry_id},
         )
 
+    event_hub.publish(user_id, "entry.deleted", {"id": entry_id})
     return {"message": f"Entry {entry_id} deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,110 @@
+import hmac
+import json
+import time
+import hashlib
+import secrets
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from core.config import EVENTS_HEARTBEAT_SECONDS, EVENTS_TOKEN_SECONDS, EVENTS_TOKEN_SECRET
+from core.event_hub import event_hub, Event, Subscription
+from core.users import current_user
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+RETRY_MS = 3000  # how long EventSource waits before reconnecting
+_TOKEN_KEY = (EVENTS_TOKEN_SECRET or secrets.token_hex(32)).encode()
+
+
+# =====================================================
+# 🔧 Helpers
+# =====================================================
+def _token_signature(payload: str) -> str:
+    return hmac.new(_TOKEN_KEY, f"events.{payload}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def stream_token(user_id: UUID, ttl: int = EVENTS_TOKEN_SECONDS) -> str:
+    """'<user id>.<expiry>.<signature>': opens the user's /events stream until the expiry, nothing else."""
+    payload = f"{user_id}.{int(time.time()) + ttl}"
+    return f"{payload}.{_token_signature(payload)}"
+
+
+def user_from_stream_token(token: str) -> Optional[UUID]:
+    payload, _, signature = token.rpartition(".")
+    if not payload or not hmac.compare_digest(_token_signature(payload), signature):
+        return None
+    user_id, _, expires = payload.partition(".")
+    try:
+        if int(expires) < time.time():
+            return None
+        return UUID(user_id)
+    except ValueError:
+        return None
+
+
+def format_event(event: Event) -> str:
+    data = json.dumps(jsonable_encoder(event.data), separators=(",", ":"))
+    return f"id: {event_hub.event_id(event)}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+async def stream(request: Request, subscription: Subscription):
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+            if event is not None:
+                yield format_event(event)
+                continue
+            if await request.is_disconnected():
+                break
+            yield ": keep-alive\n\n"
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+# =====================================================
+# 📡 Live updates (server-sent events)
+# =====================================================
+@router.post("/token")
+async def events_token(user_id: UUID = Depends(current_user)):
+    """
+    A short-lived token for opening /events?token=… from a browser, whose
+    EventSource can't send the Authorization header. It only opens the stream
+    (so a copy in an access log is worth little) and expires after
+    EVENTS_TOKEN_SECONDS; an open stream outlives it, but a reconnect needs a new one.
+    """
+    return {"token": stream_token(user_id), "expires_in": EVENTS_TOKEN_SECONDS}
+
+
+@router.get("/")
+async def live_events(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    The caller's entry writes, new WHOOP records and sync progress as they
+    happen (see core/event_hub.py for the event types). Authenticated by the
+    Authorization header, or by ?token= from POST /events/token for browsers'
+    EventSource; a reconnect's Last-Event-ID replays what was missed.
+    """
+    if token is not None:
+        user_id = user_from_stream_token(token)
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="⚠️ Invalid or expired stream token")
+    else:
+        user_id = await current_user(authorization)
+    try:
+        subscription = event_hub.subscribe(user_id, last_event_id)
+    except OverflowError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return StreamingResponse(
+        stream(request, subscription),
+        media_type="text/event-stream",
+        # no-transform / X-Accel-Buffering: proxies must pass each event through as it's written
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
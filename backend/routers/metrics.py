@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from core.admin import require_metrics_token
+from core.database import all_pool_metrics, get_pool_mode, statement_strategy
+from core.db_routing import routing_stats
+from core.metrics import prometheus_histogram, prometheus_sample
+from core.timing import route_metrics, query_duration
+
+# Latency, pool and routing internals: only for the scraper (METRICS_TOKEN) or an admin
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(require_metrics_token)])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =====================================================
+# 📈 Prometheus
+# =====================================================
+@router.get("", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Per-route request latency, DB time and query counts (core/timing.py), all
+    statement durations, and pool checkout waits — in Prometheus text format.
+    """
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+
+    routes = route_metrics.items()
+    family(
+        "lifeof_http_request_duration_seconds", "histogram", "HTTP request latency by route.",
+        [l for (method, route), s in routes for l in prometheus_histogram(
+            "lifeof_http_request_duration_seconds", s.duration, {"method": method, "route": route})],
+    )
+    family(
+        "lifeof_http_request_db_seconds", "histogram", "Time spent in SQL per request, by route.",
+        [l for (method, route), s in routes for l in prometheus_histogram(
+            "lifeof_http_request_db_seconds", s.db, {"method": method, "route": route})],
+    )
+    family(
+        "lifeof_http_request_queries", "histogram", "SQL statements executed per request, by route.",
+        [l for (method, route), s in routes for l in prometheus_histogram(
+            "lifeof_http_request_queries", s.queries, {"method": method, "route": route})],
+    )
+    family(
+        "lifeof_http_responses_total", "counter", "HTTP responses by route and status code.",
+        [prometheus_sample("lifeof_http_responses_total", n, {"method": method, "route": route, "status": status})
+         for (method, route), s in routes for status, n in sorted(s.responses.items())],
+    )
+    family(
+        "lifeof_db_query_duration_seconds", "histogram", "Duration of every SQL statement, in or out of a request.",
+        prometheus_histogram("lifeof_db_query_duration_seconds", query_duration),
+    )
+    family(
+        "lifeof_db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection.",
+        [l for m in all_pool_metrics for l in prometheus_histogram(
+            "lifeof_db_pool_checkout_wait_seconds", m.checkout_wait, {"pool": m.name})],
+    )
+    family(
+        "lifeof_db_pool_checked_out", "gauge", "Connections currently checked out of the pool.",
+        [prometheus_sample("lifeof_db_pool_checked_out", m.snapshot()["pool"].get("checked_out", 0), {"pool": m.name})
+         for m in all_pool_metrics],
+    )
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# =====================================================
+# 🗄️ Connection pool
+# =====================================================
+@router.get("/db")
+async def db_pool_metrics():
+    """
+    Live pool state (checked out, overflow) plus counters and checkout-wait /
+    hold-time histograms since startup — for sizing DB_POOL_SIZE and
+    DB_MAX_OVERFLOW against the Supabase pooler's connection limit.
+    """
+    return {
+        "pool_mode": get_pool_mode(),
+        "statements": statement_strategy(),
+        "read_routing": dict(routing_stats),
+        "pools": [m.snapshot() for m in all_pool_metrics],
+    }
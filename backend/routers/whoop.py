@@ -1,102 +1,86 @@
-import os
 import json
 import time
-import secrets
+import asyncio
 import requests
+from uuid import UUID
+from functools import partial
+from anyio import from_thread
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
-from dotenv import load_dotenv
-from supabase import create_client
-from core.convert import to_est_datetime, extract_est_date  # ✅ shared EST helpers
+from core.database import get_engine
+from core.db_routing import write_db
+from core.config import (
+    WHOOP_CLIENT_ID,
+    WHOOP_REDIRECT_URI,
+    WHOOP_AUTH_URL,
+    WHOOP_TOKEN_URL,
+    WHOOP_API_BASE,
+    WHOOP_CLIENT_SECRET,
+    WHOOP_MAX_PAGE_SIZE,
+)
+from core.users import current_user
+from core.whoop_auth import token_managers, oauth_state, user_from_state, fetch_whoop_user_id
+from core.whoop_scheduler import WhoopSyncScheduler
+from core.whoop_api import WhoopClient, WhoopAPIError, WhoopIncompleteError, TokenBucket
+from core.whoop_download import download_full_history, load_checkpoint, history_dir
+from core.whoop_webhooks import WebhookQueue, verify_webhook, WEBHOOK_EVENT_TYPES
+from core.whoop_jobs import WhoopJobRunner, JobConflict, create_backfill, get_job, list_jobs, request_cancel
+from core import whoop_repository as repo
+from core.whoop_normalize import normalize_rows  # ✅ shared with scripts/import_whoop_full.py
+from core.event_hub import event_hub  # 📡 sync progress and new records for the user's /events streams
 
-# =====================================================
-# 🌍 Load environment variables
-# =====================================================
-load_dotenv()  # ✅ Ensures .env is read both locally and in Docker
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-DATABASE_URL = os.getenv("CONNECTION_STRING")
-
-WHOOP_CLIENT_ID = os.getenv("WHOOP_CLIENT_ID")
-WHOOP_CLIENT_SECRET = os.getenv("WHOOP_CLIENT_SECRET")
-WHOOP_REDIRECT_URI = os.getenv("WHOOP_REDIRECT_URI")
-
-WHOOP_AUTH_URL = "https://api.prod.whoop.com/oauth/oauth2/auth"
-WHOOP_TOKEN_URL = "https://api.prod.whoop.com/oauth/oauth2/token"
-WHOOP_API_BASE = "https://api.prod.whoop.com/developer/v2"
-
-ACCESS_FILE = "whoop_tokens.json"
-
-# =====================================================
-# 🧩 Initialize Supabase Client
-# =====================================================
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("❌ Missing SUPABASE_URL or SUPABASE_KEY in environment!")
-
-SUPABASE = create_client(SUPABASE_URL, SUPABASE_KEY)
 router = APIRouter(prefix="/whoop", tags=["WHOOP"])
 
 # =====================================================
 # 🔧 Helpers
 # =====================================================
-def save_tokens(tokens):
-    tokens["expires_at"] = time.time() + tokens.get("expires_in", 3600)
-    with open(ACCESS_FILE, "w") as f:
-        json.dump(tokens, f, indent=2)
-
-
-def load_tokens():
-    if os.path.exists(ACCESS_FILE):
-        with open(ACCESS_FILE, "r") as f:
-            return json.load(f)
-    return None
-
+def ensure_valid_token(user_id: UUID):
+    """
+    Returns the user's cached tokens from their token manager, refreshing if close to expiry.
+    Sync routes run in a worker thread, so hop onto the event loop where the
+    manager's lock lives.
+    """
+    return from_thread.run(token_managers.get(user_id).get_tokens)
 
-def token_expired(tokens):
-    return time.time() >= tokens.get("expires_at", 0)
 
+def refresh_token(user_id: UUID, tokens):
+    """Force a refresh after a 401; concurrent callers share one refresh."""
+    return from_thread.run(token_managers.get(user_id).refresh, tokens.get("access_token"))
 
-def refresh_token(tokens):
-    """Request new token using refresh_token and save it."""
-    if "refresh_token" not in tokens:
-        raise HTTPException(400, "⚠️ Missing refresh_token. Please reauthorize WHOOP with offline scope.")
 
-    data = {
-        "grant_type": "refresh_token",
-        "refresh_token": tokens["refresh_token"],
-        "client_id": WHOOP_CLIENT_ID,
-        "client_secret": WHOOP_CLIENT_SECRET,
-        "scope": "offline",
-    }
+# ✅ WHOOP's rate limit is per app, so every user's client paces against one shared bucket
+whoop_bucket = TokenBucket()
+_whoop_clients = {}
 
-    res = requests.post(WHOOP_TOKEN_URL, data=data)
-    if res.status_code != 200:
-        raise HTTPException(res.status_code, f"Failed to refresh token: {res.text}")
-    new_tokens = res.json()
-    save_tokens(new_tokens)
-    return new_tokens
 
+def whoop_client(user_id: UUID) -> WhoopClient:
+    """The user's paced, retrying client, created on first use."""
+    client = _whoop_clients.get(user_id)
+    if client is None:
+        client = _whoop_clients.setdefault(
+            user_id,
+            WhoopClient(partial(ensure_valid_token, user_id), partial(refresh_token, user_id), bucket=whoop_bucket),
+        )
+    return client
 
-def ensure_valid_token():
-    tokens = load_tokens()
-    if not tokens:
-        raise HTTPException(400, "⚠️ No WHOOP tokens found — please authorize first via /whoop/auth")
 
-    if token_expired(tokens):
-        print("🔄 WHOOP token expired, refreshing...")
-        tokens = refresh_token(tokens)
-    return tokens
+# Full-history collections, fetched in this order by /data/full and backfill jobs
+HISTORY_ENDPOINTS = {
+    "recovery": f"{WHOOP_API_BASE}/recovery",
+    "sleep": f"{WHOOP_API_BASE}/activity/sleep",
+    "workouts": f"{WHOOP_API_BASE}/activity/workout",
+}
 
 
 # =====================================================
 # 🔗 Step 1: Redirect user to WHOOP authorization
 # =====================================================
 @router.get("/auth")
-def get_auth_url():
+def get_auth_url(user_id: UUID = Depends(current_user)):
     scopes = "offline read:recovery read:cycles read:sleep read:workout read:profile read:body_measurement"
-    state = secrets.token_urlsafe(16)
+    state = oauth_state(user_id)  # ✅ tells the callback whose tokens these are
     url = (
         f"{WHOOP_AUTH_URL}?client_id={WHOOP_CLIENT_ID}"
         f"&response_type=code&scope={scopes}"
@@ -114,11 +98,14 @@ def whoop_callback(code: str = None, state: str = None):
     """
     Handles WHOOP OAuth callback:
     - Exchanges the authorization code for access + refresh tokens
-    - Saves tokens securely
+    - Saves tokens securely for the user named in the signed state
     - Redirects user to frontend dashboard (/admin) after success
     """
     if not code:
         raise HTTPException(status_code=400, detail="Missing authorization code")
+    user_id = user_from_state(state)
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Invalid OAuth state")
 
     data = {
         "grant_type": "authorization_code",
@@ -133,7 +120,10 @@ def whoop_callback(code: str = None, state: str = None):
         raise HTTPException(status_code=res.status_code, detail=res.text)
 
     tokens = res.json()
-    save_tokens(tokens)
+
+    # ✅ Remember which WHOOP account this is — webhooks only carry WHOOP's user id
+    tokens["whoop_user_id"] = fetch_whoop_user_id(tokens.get("access_token"))
+    from_thread.run(token_managers.get(user_id).set_tokens, tokens)
 
     # ✅ Redirect user to frontend admin page with a success indicator
     frontend_redirect = "https://lifeof-prtf.vercel.app/admin?connected=whoop"
@@ -144,9 +134,9 @@ def whoop_callback(code: str = None, state: str = None):
 # 📊 Step 3: Fetch WHOOP Data (auto-refresh built-in)
 # =====================================================
 @router.get("/data")
-def get_whoop_data():
-    tokens = ensure_valid_token()
-    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+def get_whoop_data(user_id: UUID = Depends(current_user)):
+    ensure_valid_token(user_id)
+    client = whoop_client(user_id)
 
     endpoints = {
         "profile": f"{WHOOP_API_BASE}/user/profile/basic",
@@ -159,15 +149,13 @@ def get_whoop_data():
 
     data = {}
     for key, url in endpoints.items():
-        r = requests.get(url, headers=headers)
+        try:
+            r = client.get(url)
+        except WhoopAPIError as e:
+            data[key] = {"error": f"WHOOP request failed ({e.status_code})", "text": e.detail}
+            continue
         print(f"📡 WHOOP {key}: {r.status_code}")
 
-        if r.status_code == 401:  # expired or invalid token
-            print(f"⚠️ Token invalid for {key}, refreshing...")
-            tokens = refresh_token(tokens)
-            headers["Authorization"] = f"Bearer {tokens['access_token']}"
-            r = requests.get(url, headers=headers)
-
         try:
             data[key] = r.json()
         except ValueError:
@@ -183,12 +171,12 @@ def get_whoop_data():
 # 🩺 Step 4: Connection Status
 # =====================================================
 @router.get("/status")
-def whoop_status():
-    tokens = load_tokens()
+async def whoop_status(user_id: UUID = Depends(current_user)):
+    tokens = await token_managers.get(user_id).peek()
     if not tokens:
-        return {"connected": False, "message": "❌ Not connected to WHOOP"}
+        return {"connected": False, "message": "❌ Not connected to WHOOP", "sync": sync_scheduler.stats(), "webhooks": webhook_queue.stats(), "jobs": backfill_jobs.stats()}
 
-    expired = token_expired(tokens)
+    expired = time.time() >= tokens.get("expires_at", 0)
     expires_in = int(tokens.get("expires_at", 0) - time.time())
     has_refresh = "refresh_token" in tokens
 
@@ -197,81 +185,158 @@ def whoop_status():
         "message": "✅ Connected to WHOOP" if not expired else "⚠️ Token expired — reconnect required",
         "expires_in": expires_in,
         "has_refresh_token": has_refresh,
+        "sync": sync_scheduler.stats(),
+        "webhooks": webhook_queue.stats(),
+        "jobs": backfill_jobs.stats(),
     }
 
 
 # =====================================================
 # 🕰️ Step 5: Full historical sync (260 days)
 # =====================================================
-def fetch_all_whoop_data(endpoint: str, headers: dict, limit: int = 25):
-    """Fetch all pages from a WHOOP endpoint using nextToken pagination."""
-    url = f"{endpoint}?limit={limit}"
-    all_records = []
-
-    while url:
-        r = requests.get(url, headers=headers)
-        if r.status_code != 200:
-            print(f"❌ Error fetching {url}: {r.status_code}")
-            break
-
-        data = r.json()
-        records = data.get("records", [])
-        all_records.extend(records)
-
-        next_token = data.get("next_token")
-        if next_token:
-            url = f"{endpoint}?limit={limit}&nextToken={next_token}"
-        else:
-            url = None
-
+def fetch_all_whoop_data(user_id: UUID, endpoint: str, limit: int = WHOOP_MAX_PAGE_SIZE):
+    """
+    Fetch all pages from a WHOOP endpoint using nextToken pagination.
+    Raises WhoopIncompleteError instead of returning a truncated history.
+    """
+    all_records = whoop_client(user_id).fetch_all(endpoint, limit)
     print(f"✅ Retrieved {len(all_records)} from {endpoint}")
     return all_records
 
 
 @router.get("/data/full")
-def get_full_whoop_history():
-    tokens = ensure_valid_token()
-    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-
-    endpoints = {
-        "recovery": f"{WHOOP_API_BASE}/recovery",
-        "sleep": f"{WHOOP_API_BASE}/activity/sleep",
-        "workouts": f"{WHOOP_API_BASE}/activity/workout",
+def get_full_whoop_history(resume: bool = True, user_id: UUID = Depends(current_user)):
+    """
+    Streams the user's full WHOOP history to gzip NDJSON under WHOOP_HISTORY_DIR,
+    one page at a time. An interrupted download resumes from its checkpoint.
+    Holds the request for the whole download — POST /whoop/jobs/backfill runs it
+    in the background (into the database) instead.
+    """
+    ensure_valid_token(user_id)
+    directory = history_dir(user_id)
+
+    def on_page(resource, state):
+        event_hub.publish(user_id, "sync.progress", {
+            "source": "history",
+            "resource": resource,
+            "pages": state["pages"],
+            "records": state["records"],
+            "done": state["done"],
+        })
+
+    event_hub.publish(user_id, "sync.started", {"source": "history"})
+    try:
+        result = download_full_history(
+            whoop_client(user_id), HISTORY_ENDPOINTS, resume=resume, directory=directory, on_page=on_page
+        )
+    except WhoopIncompleteError as e:
+        event_hub.publish(user_id, "sync.failed", {"source": "history", "error": e.detail})
+        # ❗️Progress is checkpointed — calling this again resumes from the failed page
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "message": f"❌ WHOOP history incomplete: {e.detail} — retry to resume",
+                "status_code": e.status_code,
+                "progress": {
+                    k: {"records": v["records"], "pages": v["pages"], "done": v["done"]}
+                    for k, v in load_checkpoint(directory).items()
+                },
+            },
+        )
+
+    summary = {k: v["records"] for k, v in result["resources"].items()}
+    event_hub.publish(user_id, "sync.finished", {"source": "history", "records": summary})
+    return {
+        "message": "✅ Full WHOOP history fetched",
+        "resumed": result["resumed"],
+        "summary": summary,
     }
 
-    full_data = {}
-    for key, url in endpoints.items():
-        full_data[key] = fetch_all_whoop_data(url, headers)
 
-    with open("whoop_full_data.json", "w") as f:
-        json.dump(full_data, f, indent=2)
+# =====================================================
+# 🧵 Background backfill jobs (core/whoop_jobs.py)
+# =====================================================
+backfill_jobs = WhoopJobRunner(whoop_client, HISTORY_ENDPOINTS)
 
-    return {"message": "✅ Full WHOOP history fetched", "summary": {k: len(v) for k, v in full_data.items()}}
+
+@router.post("/jobs/backfill", status_code=202)
+async def start_backfill_job(resume: bool = True, user_id: UUID = Depends(current_user)):
+    """
+    Queues a download of the user's full WHOOP history into the database and
+    returns the job id right away; poll GET /whoop/jobs/{id} or watch /events.
+    With resume, a backfill that failed or was cancelled continues from its last page.
+    """
+    if not await token_managers.get(user_id).peek():
+        raise HTTPException(status_code=401, detail="Not connected to WHOOP")
+    try:
+        job = await create_backfill(user_id, resume)
+    except JobConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "A WHOOP backfill is already queued or running", "job_id": str(e.job["id"])},
+        )
+    await backfill_jobs.start()
+    backfill_jobs.wake()
+    return {"job_id": job["id"], "status": job["status"], "resumed": job["resource"] is not None}
+
+
+@router.get("/jobs")
+async def list_whoop_jobs(limit: int = 20, user_id: UUID = Depends(current_user)):
+    return await list_jobs(user_id, min(max(limit, 1), 100))
+
+
+@router.get("/jobs/{job_id}")
+async def get_whoop_job(job_id: UUID, user_id: UUID = Depends(current_user)):
+    """Status and progress: pages / records fetched, records written and the next page's token."""
+    job = await get_job(user_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_whoop_job(job_id: UUID, user_id: UUID = Depends(current_user)):
+    """A queued job is cancelled at once; a running one stops after the page it is on."""
+    job = await request_cancel(user_id, job_id)
+    if job is None:
+        existing = await get_job(user_id, job_id)
+        if existing is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=409, detail=f"Job already {existing['status']}")
+    return job
 
 
 # =====================================================
 # ⚙️ Helpers
 # =====================================================
-def to_hours(ms):
-    return round((ms or 0) / 1000 / 60 / 60, 2)
+def sync_summary(counts):
+    return f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+
+
+def publish_records(user_id: UUID, resource: str, source: str, written: list):
+    """Send the rows a sync actually stored to the user's /events streams (nothing if none changed)."""
+    if written:
+        records = [{c: v for c, v in row.items() if c != "content_hash"} for row in written]
+        event_hub.publish(user_id, "whoop.records", {"resource": resource, "source": source, "records": records})
 
 
 # =====================================================
 # 🟩 WHOOP: Sync Latest (multi-workout support)
 # =====================================================
-@router.get("/latest")
-@router.post("/latest")
-def sync_latest_whoop_data():
+@router.get("/latest", dependencies=[Depends(write_db)])
+@router.post("/latest", dependencies=[Depends(write_db)])  # ✅ the caller's next chart read sees the sync
+async def sync_latest_whoop_data(user_id: UUID = Depends(current_user)):
     """
-    Fetches the most recent WHOOP recovery, sleep, and up to 5 workout records.
+    Fetches the user's most recent WHOOP recovery, sleep, and up to 5 workout records.
     Converts UTC timestamps → EST and stores record_date as YYYY-MM-DD.
-    Skips insert if record already exists in Supabase.
+    Skips insert if record already exists.
     """
     try:
-        tokens = ensure_valid_token()
-        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        await token_managers.get(user_id).get_tokens()
     except Exception as e:
+        event_hub.publish(user_id, "sync.failed", {"source": "latest", "error": f"Token error: {e}"})
         raise HTTPException(status_code=401, detail=f"Token error: {e}")
+    event_hub.publish(user_id, "sync.started", {"source": "latest"})
 
     endpoints = {
         "recovery": f"{WHOOP_API_BASE}/recovery?limit=1",
@@ -279,135 +344,182 @@ def sync_latest_whoop_data():
         "workouts": f"{WHOOP_API_BASE}/activity/workout?limit=5",  # ✅ Fetch more than one workout
     }
 
+    # ✅ Fetch all three concurrently, outside any DB transaction
+    responses = await asyncio.gather(
+        *(run_in_threadpool(whoop_client(user_id).get_json, url) for url in endpoints.values()),
+        return_exceptions=True,
+    )
+
     results = {}
+    written = {key: [] for key in endpoints}
 
-    for key, url in endpoints.items():
-        r = requests.get(url, headers=headers)
-        if r.status_code != 200:
-            results[key] = {"error": r.text}
+    for key, response in zip(endpoints, responses):
+        if isinstance(response, WhoopAPIError):
+            results[key] = {"error": response.detail}
             continue
+        if isinstance(response, Exception):
+            event_hub.publish(user_id, "sync.failed", {"source": "latest", "error": str(response)})
+            raise response
 
-        records = r.json().get("records", [])
+        records = response.get("records", [])
         if not records:
             results[key] = {"message": "No new records"}
             continue
 
-        # =====================================================
-        # 🟢 Recovery (1 record max)
-        # =====================================================
-        if key == "recovery":
-            record = records[0]
-            score = record.get("score") or {}
-            record_date = extract_est_date(record.get("created_at"))
-
-            existing = (
-                SUPABASE.table("whoop_recovery")
-                .select("record_date")
-                .eq("record_date", record_date)
-                .execute()
-            )
-            if existing.data:
-                results[key] = {"message": f"⚠️ Recovery for {record_date} already exists — skipped"}
-                continue
-
-            insert = {
-                "sleep_id": str(record.get("sleep_id")),
-                "cycle_id": str(record.get("cycle_id")),
-                "recovery_score": str(score.get("recovery_score")),
-                "resting_heart_rate": str(score.get("resting_heart_rate")),
-                "hrv_rmssd_milli": str(score.get("hrv_rmssd_milli")),
-                "spo2_percentage": str(score.get("spo2_percentage")),
-                "skin_temp_celsius": str(score.get("skin_temp_celsius")),
-                "record_date": record_date,
-            }
+        async with get_engine().begin() as conn:
+            # =====================================================
+            # 🟢 Recovery / 😴 Sleep (1 record max)
+            # =====================================================
+            if key in ("recovery", "sleep"):
+                rows = normalize_rows(key, records[:1])
+                if not rows:
+                    results[key] = {"message": "No new records"}
+                    continue
+                row = rows[0]
+                record_date = row["record_date"]
+                _, pk = repo.WHOOP_TABLES[key]
+
+                # A re-scored record (same id) is updated in place; a different record for a day we already have is skipped
+                existing = await repo.existing_hashes(conn, user_id, key, [row[pk]])
+                if not existing and await repo.exists_on_date(conn, user_id, key, record_date):
+                    results[key] = {"message": f"⚠️ {key.capitalize()} for {record_date} already exists — skipped"}
+                    continue
 
-            SUPABASE.table("whoop_recovery").insert(insert).execute()
-            results[key] = {"message": f"✅ Inserted recovery for {record_date}"}
-
-        # =====================================================
-        # 😴 Sleep (1 record max)
-        # =====================================================
-        elif key == "sleep":
-            record = records[0]
-            score = record.get("score") or {}
-            stage = score.get("stage_summary") or {}
-            record_date = extract_est_date(record.get("end"))
-
-            existing = (
-                SUPABASE.table("whoop_sleep")
-                .select("record_date")
-                .eq("record_date", record_date)
-                .execute()
-            )
-            if existing.data:
-                results[key] = {"message": f"⚠️ Sleep for {record_date} already exists — skipped"}
-                continue
-
-            insert = {
-                "id": str(record.get("id")),
-                "cycle_id": str(record.get("cycle_id")),
-                "start": to_est_datetime(record.get("start")).isoformat() if record.get("start") else None,
-                "end": to_est_datetime(record.get("end")).isoformat() if record.get("end") else None,
-                "sleep_performance_percentage": str(score.get("sleep_performance_percentage")),
-                "sleep_efficiency_percentage": str(score.get("sleep_efficiency_percentage")),
-                "sleep_consistency_percentage": str(score.get("sleep_consistency_percentage")),
-                "respiratory_rate": str(score.get("respiratory_rate")),
-                "light_sleep_hours": str(to_hours(stage.get("total_light_sleep_time_milli"))),
-                "deep_sleep_hours": str(to_hours(stage.get("total_slow_wave_sleep_time_milli"))),
-                "rem_sleep_hours": str(to_hours(stage.get("total_rem_sleep_time_milli"))),
-                "total_in_bed_hours": str(to_hours(stage.get("total_in_bed_time_milli"))),
-                "total_awake_hours": str(to_hours(stage.get("total_awake_time_milli"))),
-                "disturbance_count": str(stage.get("disturbance_count")),
-                "sleep_cycle_count": str(stage.get("sleep_cycle_count")),
-                "record_date": record_date,
-            }
+                counts = await repo.upsert_changed(conn, user_id, key, [row], existing, written[key])
+                results[key] = {"message": f"✅ {key.capitalize()} for {record_date}: {sync_summary(counts)}", **counts}
 
-            SUPABASE.table("whoop_sleep").upsert(insert).execute()
-            results[key] = {"message": f"✅ Inserted sleep for {record_date}"}
-
-        # =====================================================
-        # 🏋️ Workouts (handle multiple)
-        # =====================================================
-        elif key == "workouts":
-            inserted_count = 0
-            skipped_count = 0
-            for record in records:
-                score = record.get("score") or {}
-                record_id = str(record.get("id"))
-                record_date = extract_est_date(record.get("end"))
-
-                # Skip if workout already exists by ID (safer than date-only)
-                existing = (
-                    SUPABASE.table("whoop_workouts")
-                    .select("id")
-                    .eq("id", record_id)
-                    .execute()
-                )
-                if existing.data:
-                    skipped_count += 1
-                    continue
+            # =====================================================
+            # 🏋️ Workouts (handle multiple)
+            # =====================================================
+            elif key == "workouts":
+                rows = normalize_rows("workouts", records)
 
-                insert = {
-                    "id": record_id,
-                    "sport_name": str(record.get("sport_name")),
-                    "strain": str(score.get("strain")),
-                    "average_heart_rate": str(score.get("average_heart_rate")),
-                    "max_heart_rate": str(score.get("max_heart_rate")),
-                    "kilojoule": str(score.get("kilojoule")),
-                    "distance_meter": str(score.get("distance_meter")),
-                    "altitude_gain_meter": str(score.get("altitude_gain_meter")),
-                    "record_date": record_date,
-                }
-
-                SUPABASE.table("whoop_workouts").insert(insert).execute()
-                inserted_count += 1
-
-            results[key] = {
-                "message": f"✅ Inserted {inserted_count} workouts, skipped {skipped_count} existing ones"
-            }
+                # One hash lookup for all ids; only new or changed workouts are written
+                counts = await repo.upsert_changed(conn, user_id, "workouts", rows, written=written[key])
+                results[key] = {"message": f"✅ Workouts: {sync_summary(counts)}", **counts}
+
+    # Published once every transaction above has committed
+    for key, rows in written.items():
+        publish_records(user_id, key, "latest", rows)
+    counts = {k: {c: v[c] for c in ("inserted", "updated", "unchanged", "error") if c in v} for k, v in results.items()}
+    event_hub.publish(user_id, "sync.finished", {"source": "latest", "details": counts})
 
     return {
         "message": "✅ WHOOP latest data sync completed",
         "details": results,
         "timestamp": datetime.utcnow().isoformat() + "Z",
-    }
\ No newline at end of file
+    }
+
+
+# =====================================================
+# ⏰ Background sync (started from main.py when WHOOP_SYNC_ENABLED)
+# =====================================================
+async def scheduled_sync():
+    """
+    /whoop/latest for every user with WHOOP tokens. One user's failure doesn't
+    stop the others, but any per-resource API error counts as a failed run so
+    the scheduler backs off.
+    """
+    results, failed = {}, []
+    for user_id in await token_managers.connected_users():
+        try:
+            details = (await sync_latest_whoop_data(user_id))["details"]
+        except Exception as e:
+            details = {"error": str(getattr(e, "detail", e))}
+            failed.append(str(user_id))
+        else:
+            failed += [f"{user_id}/{k}" for k, v in details.items() if "error" in v]
+        results[str(user_id)] = details
+    if failed:
+        raise RuntimeError(f"WHOOP sync failed for: {', '.join(failed)}")
+    return {"users": results}
+
+
+sync_scheduler = WhoopSyncScheduler(scheduled_sync)
+
+
+# =====================================================
+# 🪝 WHOOP Webhooks (push instead of polling)
+# =====================================================
+WEBHOOK_RESOURCES = {"recovery": "recovery", "sleep": "sleep", "workout": "workouts"}
+
+
+async def process_webhook_event(event_type: str, record_id: str, user_id: UUID):
+    """
+    Fetch and upsert (as `user_id`'s) the one record named by a webhook, or delete it.
+    Recovery webhooks carry the sleep id, so they need the sleep's cycle_id first.
+    """
+    resource, action = event_type.split(".")
+    table_resource = WEBHOOK_RESOURCES[resource]
+
+    if action == "deleted":
+        async with get_engine().begin() as conn:
+            deleted = await repo.delete_by_key(conn, user_id, table_resource, record_id)
+        if deleted:
+            event_hub.publish(user_id, "whoop.deleted", {"resource": table_resource, "id": record_id})
+        print(f"🗑️ WHOOP webhook removed {resource} {record_id}")
+        return
+
+    def fetch(path):
+        return run_in_threadpool(whoop_client(user_id).get_json, f"{WHOOP_API_BASE}{path}")
+
+    if resource == "workout":
+        record = await fetch(f"/activity/workout/{record_id}")
+    elif resource == "sleep":
+        record = await fetch(f"/activity/sleep/{record_id}")
+    else:
+        sleep = await fetch(f"/activity/sleep/{record_id}")
+        record = await fetch(f"/cycle/{sleep['cycle_id']}/recovery")
+
+    rows = normalize_rows(table_resource, [record])
+    if not rows:
+        raise ValueError(f"WHOOP {resource} {record_id} has no id")
+    row = rows[0]
+    written = []
+    async with get_engine().begin() as conn:
+        counts = await repo.upsert_changed(conn, user_id, table_resource, rows, written=written)
+    publish_records(user_id, table_resource, "webhook", written)
+    print(f"✅ WHOOP webhook {resource} for {row['record_date']}: {sync_summary(counts)}")
+
+
+webhook_queue = WebhookQueue(process_webhook_event)
+
+
+@router.post("/webhook")
+async def whoop_webhook(request: Request):
+    """
+    Receives WHOOP update notifications, verifies the HMAC signature and queues
+    the record id for the user linked to the event's WHOOP account. The fetch +
+    upsert happens in the background so WHOOP gets its 2xx immediately.
+    """
+    body = await request.body()
+    if not verify_webhook(
+        body,
+        request.headers.get("X-WHOOP-Signature"),
+        request.headers.get("X-WHOOP-Signature-Timestamp"),
+    ):
+        raise HTTPException(status_code=401, detail="Invalid WHOOP webhook signature")
+
+    try:
+        event = json.loads(body)
+        event_type = event["type"]
+        record_id = str(event["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed WHOOP webhook payload")
+
+    if event_type not in WEBHOOK_EVENT_TYPES:
+        return {"message": f"Ignored event type {event_type}"}
+
+    user_id = await token_managers.user_for_whoop_id(event.get("user_id"))
+    if user_id is None:
+        # 2xx anyway: redelivering won't make an unlinked WHOOP account known
+        return {"message": f"Ignored event for unlinked WHOOP user {event.get('user_id')}"}
+
+    await webhook_queue.start()
+    try:
+        queued = webhook_queue.put(event_type, record_id, user_id)
+    except asyncio.QueueFull:
+        # 5xx makes WHOOP redeliver later
+        raise HTTPException(status_code=503, detail="Webhook queue full")
+
+    return {"queued": queued, "type": event_type, "id": record_id}
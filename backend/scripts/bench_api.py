@@ -0,0 +1,294 @@
+"""
+End-to-end API load benchmark. Drives the main read and write endpoints at a
+fixed concurrency over real HTTP and reports latency percentiles and
+throughput per scenario:
+
+    entries.list       GET  /entries/?limit=30
+    entries.get        GET  /entries/{id}             (ids sampled from the list)
+    entries.create     POST /entries/                 (--attributes attributes, dates in 1900 —
+                                                       the benchmark user's are removed again
+                                                       after the run)
+    charts.overview    GET  /charts/overview
+    attributes.list    GET  /attribute-definitions/
+
+By default it starts its own uvicorn on a free port against CONNECTION_STRING
+(fill that with scripts/generate_synthetic_data.py first); --url points it at
+a server that is already running instead. Requests run as the owner unless
+--api-key names another user. Results saved with --json carry the
+git commit and table sizes, and --compare prints the change against an
+earlier file (needs requirements-dev.txt):
+
+    python -m scripts.bench_api --concurrency 10 --requests 500 --json bench_api.json
+    python -m scripts.bench_api --concurrency 10 --requests 500 --compare bench_api.json
+"""
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+import httpx
+import asyncpg
+from core.users import OWNER_USER_ID, hash_api_key
+from scripts.generate_synthetic_data import asyncpg_dsn
+
+SCENARIOS = ["entries.list", "entries.get", "entries.create", "charts.overview", "attributes.list"]
+# Benchmark writes land here: outside any real range and off the first page of /entries. The year has no
+# partition, so they go to daily_entries_default; a partition created for them meanwhile is dropped again.
+WRITE_YEAR = 1900
+COUNTED_TABLES = ["users", "daily_entries", "entry_attributes", "entry_notes", "attribute_definitions",
+                  "whoop_recovery", "whoop_sleep", "whoop_workouts"]
+
+
+# =====================================================
+# 🌐 Server
+# =====================================================
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(timeout=30.0):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited before serving")
+        try:
+            if httpx.get(url + "/", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+# =====================================================
+# 🎯 Scenarios
+# =====================================================
+def build_requests(scenario, rng, entry_ids, attributes):
+    if scenario == "entries.list":
+        return lambda: ("GET", "/entries/?limit=30", None)
+    if scenario == "entries.get":
+        return lambda: ("GET", f"/entries/{rng.choice(entry_ids)}", None)
+    if scenario == "entries.create":
+        def create():
+            day = date(WRITE_YEAR, 1, 1) + timedelta(days=rng.randrange(365))
+            payload = {
+                "date": day.isoformat(),
+                "day_period": rng.choice(["am", "pm"]),
+                "visibility": "private",
+                "notes": "bench",
+                "attributes": [
+                    {"name": f"attr_{i:03d}", "value": str(round(rng.uniform(0, 10), 1))} for i in range(attributes)
+                ],
+            }
+            return "POST", "/entries/", payload
+        return create
+    if scenario == "charts.overview":
+        return lambda: ("GET", "/charts/overview", None)
+    if scenario == "attributes.list":
+        return lambda: ("GET", "/attribute-definitions/", None)
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+async def run_scenario(client, next_request, total, concurrency):
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, path, body = next_request()
+            started = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body)
+                ok = r.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else None,
+        "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1]) if ordered else None,
+    }
+
+
+# =====================================================
+# 🗄️ Dataset bookkeeping
+# =====================================================
+async def table_sizes():
+    conn = await asyncpg.connect(asyncpg_dsn(), statement_cache_size=0)
+    try:
+        return {t: await conn.fetchval(f"SELECT count(*) FROM {t}") for t in COUNTED_TABLES}
+    finally:
+        await conn.close()
+
+
+async def bench_user_id(api_key):
+    """The user the requests run as: the --api-key's owner, else the owner."""
+    if not api_key:
+        return OWNER_USER_ID
+    conn = await asyncpg.connect(asyncpg_dsn(), statement_cache_size=0)
+    try:
+        user_id = await conn.fetchval("SELECT id FROM users WHERE api_key_hash = $1", hash_api_key(api_key))
+    finally:
+        await conn.close()
+    if user_id is None:
+        raise SystemExit("❌ --api-key doesn't belong to any user")
+    return user_id
+
+
+async def remove_bench_writes(user_id):
+    partition = f"daily_entries_{WRITE_YEAR}"
+    conn = await asyncpg.connect(asyncpg_dsn(), statement_cache_size=0)
+    try:
+        await conn.execute(
+            "DELETE FROM daily_entries WHERE date BETWEEN $1 AND $2 AND user_id = $3",
+            date(WRITE_YEAR, 1, 1), date(WRITE_YEAR, 12, 31), user_id,
+        )
+        # Partition maintenance moves rows found in the default partition into a year of their own; if it
+        # ran during the benchmark, drop that year again once nothing is left in it
+        if await conn.fetchval("SELECT to_regclass($1)", partition) is not None:
+            if not await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {partition})"):
+                async with conn.transaction():
+                    # detached first: entry_attributes / entry_notes foreign keys reference each partition
+                    await conn.execute(f"ALTER TABLE daily_entries DETACH PARTITION {partition}")
+                    await conn.execute(f"DROP TABLE {partition}")
+                print(f"🧹 Dropped {partition}")
+    finally:
+        await conn.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =====================================================
+# 🚀 Run
+# =====================================================
+async def run(args, url):
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+    async with httpx.AsyncClient(base_url=url, limits=limits, headers=headers, timeout=60) as client:
+        entry_ids = [e["id"] for e in (await client.get("/entries/?limit=200")).json()]
+        for scenario in args.scenarios:
+            if scenario == "entries.get" and not entry_ids:
+                print("⏭️ entries.get skipped — no entries to fetch")
+                continue
+            next_request = build_requests(scenario, rng, entry_ids, args.attributes)
+            await run_scenario(client, next_request, args.warmup, min(args.concurrency, max(1, args.warmup)))
+            results[scenario] = await run_scenario(client, next_request, args.requests, args.concurrency)
+            r = results[scenario]
+            print(f"{scenario:<18} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8} {r['errors']:>6}")
+    return results
+
+
+def print_comparison(baseline, results):
+    print(f"\n🔁 vs {baseline.get('commit') or 'baseline'} ({baseline.get('at', '?')})")
+    print(f"{'scenario':<18} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for scenario, r in results.items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if not old:
+            continue
+
+        def delta(key):
+            if not old.get(key) or r.get(key) is None:
+                return "n/a"
+            return f"{(r[key] - old[key]) / old[key] * 100:+.1f}%"
+
+        print(f"{scenario:<18} {delta('throughput_rps'):>9} {delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API load benchmark")
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--attributes", type=int, default=50, help="attributes per created entry")
+    parser.add_argument("--api-key", help="run as this user (default: the owner)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    parser.add_argument("--compare", help="earlier --json file to compare against")
+    args = parser.parse_args()
+
+    server = None
+    user_id = None
+    url = args.url
+    if not url:
+        server, url = start_server()
+    try:
+        user_id = asyncio.run(bench_user_id(args.api_key))
+        sizes = asyncio.run(table_sizes())
+        print(f"\n🏋️ {url} — concurrency {args.concurrency}, {args.requests} requests per scenario")
+        print(f"{'scenario':<18} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+        results = asyncio.run(run(args, url))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if "entries.create" in args.scenarios and user_id is not None:
+            asyncio.run(remove_bench_writes(user_id))
+
+    report = {
+        "commit": git_commit(),
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "attributes": args.attributes,
+        "user": "api-key" if args.api_key else "owner",
+        "dataset": sizes,
+        "scenarios": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
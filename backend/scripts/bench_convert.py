@@ -0,0 +1,104 @@
+"""
+Benchmarks core.convert on synthetic WHOOP-style timestamps spread over a few
+years (so every DST transition is crossed), comparing:
+
+    legacy       the old per-value parse + fixed -5h shift → date (wrong in summer, shown for scale)
+    exact        parse_utc(...).astimezone(zone) → date, per value
+    dates        to_local_dates(), with the per-UTC-day offset cache
+    datetimes    to_local_datetimes()
+
+Batch results are checked against the exact conversion, so the run fails
+loudly if the offset cache ever disagrees with zoneinfo. Example:
+
+    python -m scripts.bench_convert --count 200000 --tz Europe/London --json bench_convert.json
+"""
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timezone, timedelta
+from core.config import LOCAL_TIMEZONE
+from core.convert import get_zone, parse_utc, to_local_dates, to_local_datetimes
+
+
+def make_timestamps(count, years, seed=7):
+    """WHOOP-shaped strings ("2025-11-09T13:26:02.403Z"), including the instants around each DST switch."""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    span = years * 365 * 86400
+    values = [
+        (start + timedelta(seconds=rng.random() * span)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        for _ in range(count)
+    ]
+    # Every hour edge of every day, so transition days always exercise the exact path
+    day = start
+    while day < start + timedelta(seconds=span):
+        values.extend((day + timedelta(hours=h, seconds=s)).isoformat().replace("+00:00", "Z") for h in range(24) for s in (-1, 0))
+        day += timedelta(days=1)
+    return values
+
+
+def legacy(values):
+    out = []
+    for v in values:
+        dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+        out.append((dt + timedelta(hours=-5)).date().isoformat())
+    return out
+
+
+def best_of(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch timestamp conversion")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--tz", default=LOCAL_TIMEZONE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    args = parser.parse_args()
+
+    zone = get_zone(args.tz)
+    values = make_timestamps(args.count, args.years)
+
+    timings = {}
+    timings["legacy"], old = best_of(lambda: legacy(values), args.repeat)
+    timings["exact"], exact = best_of(lambda: [parse_utc(v).astimezone(zone).date().isoformat() for v in values], args.repeat)
+    timings["dates"], dates = best_of(lambda: to_local_dates(values, args.tz), args.repeat)
+    timings["datetimes"], datetimes = best_of(lambda: to_local_datetimes(values, args.tz), args.repeat)
+
+    reference = [parse_utc(v).astimezone(zone) for v in values]
+    mismatches = sum(1 for a, b in zip(dates, exact) if a != b)
+    mismatches += sum(1 for a, b in zip(datetimes, reference) if a.isoformat() != b.isoformat())
+    wrong_days = sum(1 for a, b in zip(old, exact) if a != b)
+
+    print(f"\n📊 Timestamp conversion ({len(values)} values, tz={args.tz}, best of {args.repeat})")
+    print(f"{'method':<10} {'wall s':>8} {'values/s':>12}")
+    for name, seconds in timings.items():
+        print(f"{name:<10} {seconds:>8.4f} {round(len(values) / seconds):>12}")
+    print(f"\n🔎 batch vs zoneinfo mismatches: {mismatches}")
+    print(f"🕐 record_dates the fixed -5h shift gets wrong: {wrong_days}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "values": len(values),
+                "tz": args.tz,
+                "seconds": {k: round(v, 4) for k, v in timings.items()},
+                "mismatches": mismatches,
+                "legacy_wrong_days": wrong_days,
+            }, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+    if mismatches:
+        raise SystemExit("❌ batch conversion disagrees with zoneinfo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Measures what the query registry's prepared-statement strategy saves. Every
+read statement in core/queries.py is executed --runs times on one connection
+under each strategy core.database can pick:
+
+    named     session mode: asyncpg's named statements, cached per connection
+    unnamed   transaction mode: an unnamed statement prepared inside each transaction
+
+and EXPLAIN (ANALYZE, SUMMARY) reports the server-side planning time a cached
+plan avoids. On PG14+ pg_prepared_statements shows how often the named
+statements actually ran on a generic (reused) plan. Example:
+
+    python -m scripts.bench_prepared_statements --runs 200 --json bench_prepared.json
+"""
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from datetime import date, timedelta
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from core.database import database_url, statement_connect_args
+from core import queries as q
+from core.users import OWNER_USER_ID
+
+# Instantiate every list_entries / chart_queries variant so the registry holds all of them
+for _vis in (False, True):
+    for _df in (False, True):
+        for _dt in (False, True):
+            q.list_entries(_vis, _df, _dt)
+            q.chart_queries(_df, _dt)
+
+
+def sample_params(statement, entry_id):
+    """Plausible bind values for whichever parameters a statement uses."""
+    values = {
+        "u": OWNER_USER_ID,
+        "id": entry_id,
+        "vis": "public",
+        "df": date.today() - timedelta(days=90),
+        "dt": date.today(),
+        "limit": 30,
+        "offset": 0,
+        "d": date.today(),
+        "p": "am",
+        "h": "0" * 64,
+    }
+    return {k: v for k, v in values.items() if k in statement._bindparams}
+
+
+async def time_strategy(strategy, statements, entry_id, runs):
+    engine = create_async_engine(database_url(), connect_args=statement_connect_args(
+        "session" if strategy == "named" else "transaction"
+    ))
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            for name, statement in statements:
+                params = sample_params(statement, entry_id)
+                await conn.execute(statement, params)  # warm up: first run prepares in both modes
+                await conn.commit()
+                started = time.perf_counter()
+                for _ in range(runs):
+                    await conn.execute(statement, params)
+                    await conn.commit()  # a transaction per request, as behind the pooler
+                results[name] = (time.perf_counter() - started) / runs
+
+            if strategy == "named":
+                try:
+                    rows = (await conn.execute(text(
+                        "SELECT statement, generic_plans, custom_plans FROM pg_prepared_statements"
+                    ))).all()
+                    results["_plans"] = {
+                        "generic": sum(r.generic_plans for r in rows),
+                        "custom": sum(r.custom_plans for r in rows),
+                    }
+                except Exception:
+                    results["_plans"] = None  # before PG14
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def planning_times(statements, entry_id):
+    engine = create_async_engine(database_url(), connect_args=statement_connect_args("transaction"))
+    out = {}
+    try:
+        async with engine.connect() as conn:
+            for name, statement in statements:
+                explain = text("EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) " + statement.text)
+                plan = (await conn.execute(explain, sample_params(statement, entry_id))).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                out[name] = plan[0]["Planning Time"] / 1000
+                await conn.rollback()
+    finally:
+        await engine.dispose()
+    return out
+
+
+async def run(runs):
+    statements = [(name, s) for name, s in q.registry.items() if s.text.lstrip().upper().startswith("SELECT")]
+
+    engine = create_async_engine(database_url())
+    async with engine.connect() as conn:
+        entry_id = (await conn.execute(
+            text("SELECT id FROM daily_entries WHERE user_id = :u LIMIT 1"), {"u": OWNER_USER_ID}
+        )).scalar() or uuid.uuid4()
+    await engine.dispose()
+
+    named = await time_strategy("named", statements, entry_id, runs)
+    unnamed = await time_strategy("unnamed", statements, entry_id, runs)
+    planning = await planning_times(statements, entry_id)
+
+    rows = []
+    for name, _ in statements:
+        rows.append({
+            "query": name,
+            "named_ms": round(named[name] * 1000, 3),
+            "unnamed_ms": round(unnamed[name] * 1000, 3),
+            "saved_ms": round((unnamed[name] - named[name]) * 1000, 3),
+            "planning_ms": round(planning[name] * 1000, 3),
+        })
+    return rows, named.get("_plans")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark named vs unnamed prepared statements for the query registry")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    args = parser.parse_args()
+
+    rows, plans = asyncio.run(run(args.runs))
+
+    print(f"\n📊 Prepared statements ({args.runs} runs each, mean per execution)")
+    print(f"{'query':<34} {'named ms':>9} {'unnamed ms':>11} {'saved ms':>9} {'plan ms':>8}")
+    for r in rows:
+        print(f"{r['query']:<34} {r['named_ms']:>9} {r['unnamed_ms']:>11} {r['saved_ms']:>9} {r['planning_ms']:>8}")
+    total_saved = sum(r["saved_ms"] for r in rows)
+    print(f"\n⏱️ Saved per pass over all statements: {total_saved:.3f} ms")
+    if plans:
+        print(f"🧠 Named statements ran on {plans['generic']} generic / {plans['custom']} custom plans")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": args.runs, "queries": rows, "plans": plans}, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Cold-start cost of the API, measured in fresh interpreters so nothing is
+already imported or connected:
+
+    import    `import main` (every router, model and client module)
+    startup   the startup hooks (schema check, scheduler, webhook worker)
+    ready     spawning uvicorn until GET / answers — what a new container or
+              a --reload actually waits for
+
+plus the slowest modules by self time from -X importtime. Example:
+
+    python -m scripts.bench_startup --runs 5 --json bench_startup.json
+    DB_SCHEMA_CHECK=always python -m scripts.bench_startup    # include the migration check
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+CHILD = """
+import time, json, asyncio
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def boot():
+    await main.on_startup()
+    ready = time.perf_counter()
+    await main.on_shutdown()
+    return ready
+
+ready = asyncio.run(boot())
+print(json.dumps({"import": imported - started, "startup": ready - imported}))
+"""
+
+
+def time_in_process():
+    out = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top):
+    """Slowest modules by self time, from one `python -X importtime -c 'import main'`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            rows.append((int(self_us), int(cumulative_us), module.strip()))
+        except ValueError:
+            continue  # header line
+    total = next((c for _, c, m in rows if m == "main"), None)
+    rows.sort(reverse=True)
+    return total, rows[:top]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_ready(timeout=30.0):
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(values):
+    return {"median": round(statistics.median(values), 4), "min": round(min(values), 4), "max": round(max(values), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import, startup and time-to-ready")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--no-serve", action="store_true", help="skip the uvicorn time-to-ready runs")
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    args = parser.parse_args()
+
+    samples = [time_in_process() for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "schema_check": os.getenv("DB_SCHEMA_CHECK", "cached"),
+        "import_seconds": summarize([s["import"] for s in samples]),
+        "startup_seconds": summarize([s["startup"] for s in samples]),
+    }
+    if not args.no_serve:
+        results["ready_seconds"] = summarize([time_ready() for _ in range(args.runs)])
+    total_us, slowest = import_profile(args.top)
+    results["importtime_main_seconds"] = total_us / 1e6 if total_us else None
+    results["slowest_modules"] = [{"module": m, "self_ms": s / 1000, "cumulative_ms": c / 1000} for s, c, m in slowest]
+
+    print(f"\n🚀 Cold start ({args.runs} fresh interpreters, DB_SCHEMA_CHECK={results['schema_check']})")
+    for key in ("import_seconds", "startup_seconds", "ready_seconds"):
+        if key in results:
+            r = results[key]
+            print(f"{key[:-8]:<8} median {r['median'] * 1000:8.1f} ms   (min {r['min'] * 1000:.1f}, max {r['max'] * 1000:.1f})")
+    print("\n🐢 Slowest imports by self time")
+    for row in results["slowest_modules"]:
+        print(f"{row['module']:<45} {row['self_ms']:8.1f} ms self {row['cumulative_ms']:9.1f} ms cumulative")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Throughput benchmark for core.whoop_normalize over the bundled export
+(whoop_full_data.json, optionally scaled up with scripts/fake_whoop_server.py's
+build_dataset). For each resource it times normalize_rows() at a few batch
+sizes — batch 1 is what a webhook or /whoop/latest pays per record — and
+reports records/s. Example:
+
+    python -m scripts.bench_whoop_normalize --scale 20 --json bench_normalize.json
+"""
+import json
+import time
+import argparse
+from core.whoop_normalize import RESOURCES, normalize_rows
+from scripts.fake_whoop_server import build_dataset
+
+
+def time_batches(resource, records, batch_size, repeat):
+    """Best-of-`repeat` wall time to normalize all records in chunks of batch_size."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for i in range(0, len(records), batch_size):
+            normalize_rows(resource, records[i : i + batch_size])
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar WHOOP normalizer")
+    parser.add_argument("--file", default="whoop_full_data.json")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--batch-sizes", default="1,100,2000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.file, args.scale)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    results = []
+    for resource in RESOURCES:
+        records = dataset.get(resource, [])
+        if not records:
+            continue
+        for batch_size in batch_sizes:
+            seconds = time_batches(resource, records, batch_size, args.repeat)
+            results.append({
+                "resource": resource,
+                "batch_size": batch_size,
+                "records": len(records),
+                "seconds": round(seconds, 4),
+                "records_per_s": round(len(records) / seconds) if seconds else None,
+            })
+
+    print(f"\n📊 WHOOP normalizer benchmark (scale={args.scale}, best of {args.repeat})")
+    print(f"{'resource':<10} {'batch':>6} {'records':>8} {'wall s':>8} {'rec/s':>10}")
+    for r in results:
+        print(f"{r['resource']:<10} {r['batch_size']:>6} {r['records']:>8} {r['seconds']:>8.4f} {r['records_per_s']:>10}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scale": args.scale, "results": results}, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
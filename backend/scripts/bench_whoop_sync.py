@@ -0,0 +1,149 @@
+"""
+Benchmarks the WHOOP sync paths against scripts/fake_whoop_server.py so sync
+regressions show up before deploy. Runs, against an in-process fake API:
+
+    full         WhoopClient.fetch_all over recovery / sleep / workouts
+    download     streaming gzip NDJSON backfill (core.whoop_download)
+    incremental  the /whoop/latest fetches (limit=1 / 1 / 5), repeated --incremental-runs times
+
+and reports wall time, records/s, client requests + retries and what the
+fake server saw. Example:
+
+    python -m scripts.bench_whoop_sync --scale 10 --latency 0.02 --json bench_whoop.json
+"""
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import requests
+import uvicorn
+from core.whoop_api import WhoopClient, TokenBucket
+from core.whoop_download import download_full_history
+from scripts.fake_whoop_server import build_dataset, build_app
+
+RESOURCES = {
+    "recovery": "/recovery",
+    "sleep": "/activity/sleep",
+    "workouts": "/activity/workout",
+}
+LATEST = {
+    "recovery": "/recovery?limit=1",
+    "sleep": "/activity/sleep?limit=1",
+    "workouts": "/activity/workout?limit=5",
+}
+
+
+# =====================================================
+# 🧪 Fake server in a background thread
+# =====================================================
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_server(app):
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def make_client(root, rate_per_minute, burst):
+    token_url = f"{root}/oauth/oauth2/token"
+    tokens = requests.post(token_url).json()
+
+    def refresh(_stale):
+        tokens.update(requests.post(token_url).json())
+        return tokens
+
+    return WhoopClient(lambda: tokens, refresh, bucket=TokenBucket(rate_per_minute, burst), backoff_base=0.05)
+
+
+# =====================================================
+# ⏱️ Scenarios
+# =====================================================
+def run_scenario(name, root, client, fn):
+    requests.post(f"{root}/_reset")
+    sent_before, retries_before = client.requests_sent, client.retries
+    started = time.perf_counter()
+    records = fn()
+    wall = time.perf_counter() - started
+    server = requests.get(f"{root}/_stats").json()
+    return {
+        "scenario": name,
+        "wall_seconds": round(wall, 4),
+        "records": records,
+        "records_per_second": round(records / wall, 1) if wall else None,
+        "client_requests": client.requests_sent - sent_before,
+        "client_retries": client.retries - retries_before,
+        "server_requests": server["requests"],
+        "server_rate_limited": server["rate_limited"],
+        "server_unauthorized": server["unauthorized"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WHOOP sync paths against a fake WHOOP API")
+    parser.add_argument("--file", default="whoop_full_data.json")
+    parser.add_argument("--scale", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--server-rate-limit", type=int, default=0, help="fake server requests/minute (0 = off)")
+    parser.add_argument("--client-rate", type=int, default=60_000, help="client token bucket requests/minute")
+    parser.add_argument("--client-burst", type=int, default=100)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--incremental-runs", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file for comparing across commits")
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.file, args.scale)
+    app = build_app(dataset, args.latency, args.error_rate, args.server_rate_limit, args.token_ttl)
+    server, root = start_fake_server(app)
+    base = f"{root}/developer/v2"
+    client = make_client(root, args.client_rate, args.client_burst)
+
+    def full():
+        return sum(len(client.fetch_all(f"{base}{path}")) for path in RESOURCES.values())
+
+    def download():
+        with tempfile.TemporaryDirectory() as directory:
+            endpoints = {k: f"{base}{path}" for k, path in RESOURCES.items()}
+            result = download_full_history(client, endpoints, resume=False, directory=directory)
+        return sum(v["records"] for v in result["resources"].values())
+
+    def incremental():
+        total = 0
+        for _ in range(args.incremental_runs):
+            for path in LATEST.values():
+                total += len(client.get_json(f"{base}{path}").get("records", []))
+        return total
+
+    results = [
+        run_scenario("full", root, client, full),
+        run_scenario("download", root, client, download),
+        run_scenario("incremental", root, client, incremental),
+    ]
+    server.should_exit = True
+
+    print(f"\n📊 WHOOP sync benchmark (scale={args.scale}, latency={args.latency}s, error_rate={args.error_rate})")
+    print(f"{'scenario':<12} {'wall s':>8} {'records':>8} {'rec/s':>9} {'reqs':>6} {'retries':>8} {'429s':>6}")
+    for r in results:
+        print(
+            f"{r['scenario']:<12} {r['wall_seconds']:>8} {r['records']:>8} {r['records_per_second']:>9} "
+            f"{r['client_requests']:>6} {r['client_retries']:>8} {r['server_rate_limited']:>6}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=2)
+        print(f"\n💾 Saved results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Add a user, or issue a fresh API key for an existing one. The key is printed
+once; only its sha256 is stored (users.api_key_hash), so issuing a new key
+revokes the old one (within USER_KEY_CACHE_SECONDS on running instances).
+
+    python -m scripts.create_user --name alice      # new user + key
+    python -m scripts.create_user --rotate owner    # key for the owner (pre-multi-user data)
+    python -m scripts.create_user --rotate <user id>
+    python -m scripts.create_user --list
+
+Clients send the key as "Authorization: Bearer <key>". Once a second user
+exists, requests without a key are refused (USER_AUTH_REQUIRED=auto), so
+issue the owner a key too before adding anyone.
+"""
+import uuid
+import asyncio
+import argparse
+from sqlalchemy import text
+from core.database import get_engine
+from core.users import OWNER_USER_ID, hash_api_key, new_api_key
+
+
+async def run(args):
+    engine = get_engine()
+    try:
+        async with engine.begin() as conn:
+            if args.list:
+                rows = (await conn.execute(text(
+                    "SELECT id, name, api_key_hash IS NOT NULL AS has_key, created_at FROM users ORDER BY created_at"
+                ))).all()
+                for r in rows:
+                    print(f"{'🔑' if r.has_key else '  '} {r.id}  {r.name:<20} {r.created_at:%Y-%m-%d}")
+                return
+
+            key = new_api_key()
+            if args.rotate:
+                user_id = OWNER_USER_ID if args.rotate == "owner" else uuid.UUID(args.rotate)
+                found = (await conn.execute(
+                    text("UPDATE users SET api_key_hash = :h WHERE id = :id RETURNING id"),
+                    {"h": hash_api_key(key), "id": user_id},
+                )).scalar()
+                if found is None:
+                    raise SystemExit(f"❌ No user {user_id}")
+            else:
+                user_id = (await conn.execute(
+                    text("INSERT INTO users (name, api_key_hash) VALUES (:name, :h) RETURNING id"),
+                    {"name": args.name, "h": hash_api_key(key)},
+                )).scalar_one()
+    finally:
+        await engine.dispose()
+
+    print(f"✅ User {user_id}")
+    print(f"🔑 API key (shown once): {key}")
+    if not args.rotate:
+        print("ℹ️ Requests without an API key are now refused — give the owner one with --rotate owner")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add a user or issue a new API key")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--name", help="create a user with this name")
+    group.add_argument("--rotate", metavar="USER_ID", help="issue a new key for a user id (or 'owner')")
+    group.add_argument("--list", action="store_true", help="list users")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
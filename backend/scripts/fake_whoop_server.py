@@ -0,0 +1,235 @@
+"""
+Local stand-in for the WHOOP API.
+Serves paginated recovery / sleep / workout data built from whoop_full_data.json
+(optionally scaled up by copying it further back in time), with configurable
+latency, 429 injection and token expiry. Point the backend at it with
+
+    WHOOP_API_BASE=http://localhost:9000/developer/v2
+    WHOOP_TOKEN_URL=http://localhost:9000/oauth/oauth2/token
+
+and run it with:
+
+    python -m scripts.fake_whoop_server --port 9000 --scale 10 --latency 0.05
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import secrets
+import argparse
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+MAX_PAGE_SIZE = 25
+TIME_FIELDS = ("created_at", "updated_at", "start", "end")
+
+
+# =====================================================
+# 📦 Dataset
+# =====================================================
+def _parse(ts):
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def _format(dt):
+    return dt.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _shift(record, delta, copy_index):
+    """Copy a record `delta` earlier, with ids that stay unique and stable across runs."""
+    shifted = json.loads(json.dumps(record))
+    for field in TIME_FIELDS:
+        if shifted.get(field):
+            shifted[field] = _format(_parse(shifted[field]) - delta)
+    for field in ("id", "sleep_id"):
+        if isinstance(shifted.get(field), str):
+            shifted[field] = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{shifted[field]}/{copy_index}"))
+    if shifted.get("cycle_id"):
+        shifted["cycle_id"] = shifted["cycle_id"] - copy_index * 10_000_000
+    return shifted
+
+
+def build_dataset(path="whoop_full_data.json", scale=1):
+    """Return {resource: [records newest first]} with `scale` back-to-back copies of the source span."""
+    with open(path, "r") as f:
+        source = json.load(f)
+
+    stamps = [_parse(r["created_at"]) for rows in source.values() for r in rows if r.get("created_at")]
+    span = (max(stamps) - min(stamps)) + timedelta(days=1)
+
+    dataset = {}
+    for resource, rows in source.items():
+        out = list(rows)
+        for k in range(1, scale):
+            out.extend(_shift(r, span * k, k) for r in rows)
+        out.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+        dataset[resource] = out
+    return dataset
+
+
+# =====================================================
+# 🧪 Fake API
+# =====================================================
+def build_app(
+    dataset,
+    latency=0.0,
+    error_rate=0.0,
+    rate_limit_per_minute=0,
+    token_ttl=3600,
+):
+    """
+    latency: seconds added to every API call
+    error_rate: fraction of API calls answered with a random 429
+    rate_limit_per_minute: fixed-window limit enforced like WHOOP's (0 = off)
+    token_ttl: lifetime of issued access tokens, so syncs can hit expiry
+    """
+    app = FastAPI(title="Fake WHOOP API")
+    app.state.stats = {"requests": 0, "rate_limited": 0, "unauthorized": 0, "tokens_issued": 0}
+    app.state.tokens = {"fake-access-token": time.time() + token_ttl}
+    app.state.window = {"start": time.time(), "count": 0}
+
+    sleep_by_id = {r["id"]: r for r in dataset.get("sleep", [])}
+    workout_by_id = {r["id"]: r for r in dataset.get("workouts", [])}
+    recovery_by_cycle = {r["cycle_id"]: r for r in dataset.get("recovery", [])}
+
+    def rate_headers(remaining, reset):
+        return {
+            "X-RateLimit-Limit": f"{rate_limit_per_minute}, {rate_limit_per_minute};window=60",
+            "X-RateLimit-Remaining": str(max(0, remaining)),
+            "X-RateLimit-Reset": str(max(0, reset)),
+        }
+
+    @app.middleware("http")
+    async def gatekeeper(request: Request, call_next):
+        if not request.url.path.startswith("/developer/"):
+            return await call_next(request)
+
+        stats = app.state.stats
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if app.state.tokens.get(token, 0) < time.time():
+            stats["unauthorized"] += 1
+            return JSONResponse({"error": "invalid or expired token"}, status_code=401)
+
+        window = app.state.window
+        now = time.time()
+        if now - window["start"] >= 60:
+            window["start"], window["count"] = now, 0
+        window["count"] += 1
+        reset = int(60 - (now - window["start"])) + 1
+        over_limit = rate_limit_per_minute and window["count"] > rate_limit_per_minute
+
+        if over_limit or random.random() < error_rate:
+            stats["rate_limited"] += 1
+            retry_after = reset if over_limit else 1
+            return JSONResponse(
+                {"error": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        response = await call_next(request)
+        if rate_limit_per_minute:
+            response.headers.update(rate_headers(rate_limit_per_minute - window["count"], reset))
+        return response
+
+    def page(resource, limit, next_token):
+        if limit > MAX_PAGE_SIZE:
+            return JSONResponse({"error": f"limit must be <= {MAX_PAGE_SIZE}"}, status_code=400)
+        rows = dataset.get(resource, [])
+        offset = int(next_token or 0)
+        chunk = rows[offset : offset + limit]
+        more = offset + limit < len(rows)
+        return {"records": chunk, "next_token": str(offset + limit) if more else None}
+
+    @app.get("/developer/v2/recovery")
+    async def recovery(limit: int = 10, nextToken: str = None):
+        return page("recovery", limit, nextToken)
+
+    @app.get("/developer/v2/activity/sleep")
+    async def sleep(limit: int = 10, nextToken: str = None):
+        return page("sleep", limit, nextToken)
+
+    @app.get("/developer/v2/activity/workout")
+    async def workout(limit: int = 10, nextToken: str = None):
+        return page("workouts", limit, nextToken)
+
+    @app.get("/developer/v2/activity/sleep/{sleep_id}")
+    async def sleep_by_id_route(sleep_id: str):
+        if sleep_id not in sleep_by_id:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return sleep_by_id[sleep_id]
+
+    @app.get("/developer/v2/activity/workout/{workout_id}")
+    async def workout_by_id_route(workout_id: str):
+        if workout_id not in workout_by_id:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return workout_by_id[workout_id]
+
+    @app.get("/developer/v2/cycle/{cycle_id}/recovery")
+    async def recovery_by_cycle_route(cycle_id: int):
+        if cycle_id not in recovery_by_cycle:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return recovery_by_cycle[cycle_id]
+
+    @app.get("/developer/v2/user/profile/basic")
+    async def profile():
+        # Whoever the dataset belongs to; the backend records it to route webhooks
+        user_id = next((r.get("user_id") for rows in dataset.values() for r in rows if r.get("user_id")), None)
+        return {"user_id": user_id, "email": "fake@example.com", "first_name": "Fake", "last_name": "User"}
+
+    @app.post("/oauth/oauth2/token")
+    async def token():
+        access = secrets.token_urlsafe(24)
+        app.state.tokens[access] = time.time() + token_ttl
+        app.state.stats["tokens_issued"] += 1
+        return {
+            "access_token": access,
+            "refresh_token": secrets.token_urlsafe(24),
+            "expires_in": token_ttl,
+            "scope": "offline read:recovery read:cycles read:sleep read:workout",
+            "token_type": "bearer",
+        }
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {**app.state.stats, "records": {k: len(v) for k, v in dataset.items()}}
+
+    @app.post("/_reset")
+    async def reset_stats():
+        app.state.stats.update({k: 0 for k in app.state.stats})
+        app.state.window.update({"start": time.time(), "count": 0})
+        return app.state.stats
+
+    return app
+
+
+# =====================================================
+# ▶️ Main
+# =====================================================
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake WHOOP API locally")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--file", default="whoop_full_data.json")
+    parser.add_argument("--scale", type=int, default=1, help="copies of the dataset, stacked back in time")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per API call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per minute (0 = unlimited)")
+    parser.add_argument("--token-ttl", type=int, default=3600, help="access token lifetime in seconds")
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.file, args.scale)
+    print(f"🧪 Fake WHOOP serving {({k: len(v) for k, v in dataset.items()})} on :{args.port}")
+    app = build_app(dataset, args.latency, args.error_rate, args.rate_limit, args.token_ttl)
+    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
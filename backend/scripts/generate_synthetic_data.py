@@ -0,0 +1,275 @@
+"""
+Fill a local Postgres with a synthetic dataset at a chosen scale, for
+scripts/bench_api.py and for trying queries against more than one user's
+249 days:
+
+    daily_entries          one AM and/or PM entry per day for --years
+    entry_attributes       --attributes per entry (values drawn per definition)
+    entry_notes            on average --notes per entry
+    attribute_definitions  --attributes definitions the entries draw from
+    whoop_*                whoop_full_data.json repeated back in time to cover
+                           --years (scripts/fake_whoop_server.build_dataset),
+                           run through the same normalize path as a real sync
+
+All of it is generated once per user for --users users: the owner plus
+synthetic-1 … synthetic-N users, each with a fresh random API key that is
+printed once at the end for bench_api.py --api-key. On a remote database
+(--allow-remote) the synthetic users get no keys, so nobody can sign in as
+them there.
+
+Rows are written with COPY. The data is reproducible for a given --seed
+(the API keys are not). It only targets a local database unless
+--allow-remote is passed, and
+refuses to add to tables that already have rows unless --reset truncates
+them (and removes earlier synthetic users) first.
+
+    python -m scripts.generate_synthetic_data --years 10 --attributes 50 --notes 0.3 --reset
+    python -m scripts.generate_synthetic_data --years 1 --attributes 10 --no-whoop --reset
+    python -m scripts.generate_synthetic_data --years 2 --users 20 --reset
+"""
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import asyncpg
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from sqlalchemy.engine import make_url
+from core.config import DATABASE_URL
+from core.database import get_engine
+from core.migrations import migrate
+from core.partitions import ensure_partitions
+from core.whoop_normalize import RESOURCES, normalize_rows
+from core.whoop_repository import WHOOP_TABLES, coerce_row, content_hash
+from core.users import OWNER_USER_ID, hash_api_key, new_api_key
+from scripts.fake_whoop_server import build_dataset
+
+APP_TABLES = ["entry_notes", "entry_attributes", "daily_entries", "attribute_definitions"]
+WHOOP_SOURCE_DAYS = 249  # span of whoop_full_data.json
+BATCH_ENTRIES = 1000
+
+CATEGORIES = ["body", "mind", "nutrition", "training", "sleep", "habits"]
+UNITS = [None, "kg", "min", "h", "mg", "kcal", "steps", "/10"]
+NOTE_WORDS = "felt good tired slept late early workout walk coffee focus calm busy travel".split()
+
+
+def asyncpg_dsn():
+    if not DATABASE_URL:
+        raise RuntimeError("Missing CONNECTION_STRING environment variable")
+    return DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def is_local(dsn: str) -> bool:
+    url = make_url(dsn)
+    host = url.host or url.query.get("host", "")
+    return host in ("", "localhost", "127.0.0.1", "::1") or str(host).startswith("/")
+
+
+def rng_uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+# =====================================================
+# 🧪 Generators
+# =====================================================
+def synthetic_users(rng, count, with_keys=True):
+    """(user id, name, api key or None) for the owner plus count - 1 synthetic users."""
+    users = [(OWNER_USER_ID, "owner", None)]
+    for n in range(1, count):
+        users.append((rng_uuid(rng), f"synthetic-{n}", new_api_key() if with_keys else None))
+    return users
+
+
+def attribute_definitions(rng, count, user_id):
+    rows = []
+    for i in range(count):
+        rows.append({
+            "id": rng_uuid(rng),
+            "user_id": user_id,
+            "name": f"attr_{i:03d}",
+            "label": f"Attribute {i:03d}",
+            "unit": rng.choice(UNITS),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "active": rng.random() > 0.1,
+            "default_visible": rng.random() > 0.3,
+            "weight": rng.randint(1, 5),
+            "day_period": "am" if i % 2 == 0 else "pm",
+        })
+    return rows
+
+
+def entry_batches(rng, user_id, start, days, periods, definitions, attributes_per_entry, notes_per_entry):
+    """Yield (entries, attributes, notes) row lists, BATCH_ENTRIES entries at a time."""
+    entries, attributes, notes = [], [], []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for period in periods:
+            entry_id = rng_uuid(rng)
+            created = datetime.combine(day, dtime(8 if period == "am" else 20), tzinfo=timezone.utc)
+            entries.append({
+                "id": entry_id,
+                "user_id": user_id,
+                "date": day,
+                "day_period": period,
+                "visibility": "public" if rng.random() < 0.6 else "private",
+                "notes": " ".join(rng.choices(NOTE_WORDS, k=rng.randint(3, 12))) if rng.random() < 0.4 else None,
+                "created_at": created,
+            })
+            for d in rng.sample(definitions, attributes_per_entry):
+                attributes.append({
+                    "id": rng_uuid(rng),
+                    "user_id": user_id,
+                    "entry_id": entry_id,
+                    "entry_date": day,
+                    "name": d["name"],
+                    "value": str(round(rng.uniform(0, 10), 1)),
+                    "unit": d["unit"],
+                    "note": "synthetic" if rng.random() < 0.05 else None,
+                    "created_at": created,
+                })
+            # Poisson-ish: a few notes per entry with the requested mean
+            for n in range(_poisson(rng, notes_per_entry)):
+                notes.append({
+                    "id": rng_uuid(rng),
+                    "user_id": user_id,
+                    "entry_id": entry_id,
+                    "entry_date": day,
+                    "content": " ".join(rng.choices(NOTE_WORDS, k=rng.randint(5, 30))),
+                    "created_at": created + timedelta(minutes=n + 1),
+                })
+        if len(entries) >= BATCH_ENTRIES:
+            yield entries, attributes, notes
+            entries, attributes, notes = [], [], []
+    if entries:
+        yield entries, attributes, notes
+
+
+def _poisson(rng, mean):
+    if mean <= 0:
+        return 0
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def whoop_rows(years):
+    """Normalized, hashed rows per WHOOP table covering roughly `years`."""
+    scale = max(1, math.ceil(years * 365 / WHOOP_SOURCE_DAYS))
+    dataset = build_dataset(scale=scale)
+    out = {}
+    for resource in RESOURCES:
+        rows = []
+        for row in normalize_rows(resource, dataset[resource]):
+            row["content_hash"] = content_hash(row)
+            rows.append(coerce_row(row))
+        out[resource] = rows
+    return out
+
+
+# =====================================================
+# 💾 Writing
+# =====================================================
+async def copy_rows(conn, table, rows):
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    await conn.copy_records_to_table(table, records=[tuple(r[c] for c in columns) for r in rows], columns=columns)
+    return len(rows)
+
+
+async def run(args):
+    dsn = asyncpg_dsn()
+    local = is_local(dsn)
+    if not local and not args.allow_remote:
+        raise SystemExit("❌ CONNECTION_STRING is not a local database — pass --allow-remote if you really mean it")
+    if not local and args.users > 1:
+        print("⚠️ Remote database — synthetic users are created without API keys")
+
+    engine = get_engine()
+    await migrate(engine)
+    await engine.dispose()
+
+    tables = APP_TABLES + ([WHOOP_TABLES[r][0] for r in RESOURCES] if args.whoop else [])
+    started = time.perf_counter()
+    conn = await asyncpg.connect(dsn, statement_cache_size=0)
+    try:
+        if args.reset:
+            await conn.execute(f"TRUNCATE {', '.join(tables)}")
+            await conn.execute("DELETE FROM users WHERE name LIKE 'synthetic-%'")
+        else:
+            for table in tables:
+                if await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})"):
+                    raise SystemExit(f"❌ {table} already has rows — pass --reset to replace them")
+
+        rng = random.Random(args.seed)
+        counts = {table: 0 for table in tables}
+        periods = ["am", "pm"] if args.periods == "both" else [args.periods]
+        days = int(args.years * 365)
+        start = (args.end or date.today()) - timedelta(days=days)
+        per_entry = min(args.attributes_per_entry or args.attributes, args.attributes)
+        users = synthetic_users(rng, max(1, args.users), with_keys=local)
+        whoop = whoop_rows(args.years) if args.whoop else {}
+
+        # Every generated year gets its partition up front instead of piling into the default one
+        years = set(range(start.year, (args.end or date.today()).year + 1))
+        years |= {r["record_date"].year for rows in whoop.values() for r in rows if r["record_date"]}
+        await ensure_partitions(engine, years)
+        await engine.dispose()
+
+        async with conn.transaction():
+            await conn.executemany(
+                """
+                INSERT INTO users (id, name, api_key_hash) VALUES ($1, $2, $3)
+                ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, api_key_hash = EXCLUDED.api_key_hash
+                """,
+                [(user_id, name, hash_api_key(key) if key else None) for user_id, name, key in users[1:]],
+            )
+            for user_id, _, _ in users:
+                definitions = attribute_definitions(rng, args.attributes, user_id)
+                counts["attribute_definitions"] += await copy_rows(conn, "attribute_definitions", definitions)
+                batches = entry_batches(rng, user_id, start, days, periods, definitions, per_entry, args.notes)
+                for entries, attributes, notes in batches:
+                    counts["daily_entries"] += await copy_rows(conn, "daily_entries", entries)
+                    counts["entry_attributes"] += await copy_rows(conn, "entry_attributes", attributes)
+                    counts["entry_notes"] += await copy_rows(conn, "entry_notes", notes)
+                    print(f"📝 {counts['daily_entries']:,} entries / {counts['entry_attributes']:,} attributes", end="\r")
+
+                for resource, rows in whoop.items():
+                    table = WHOOP_TABLES[resource][0]
+                    counts[table] += await copy_rows(conn, table, [{**r, "user_id": user_id} for r in rows])
+            print()
+
+        for table in tables:
+            await conn.execute(f"ANALYZE {table}")
+    finally:
+        await conn.close()
+
+    print(f"\n✅ Synthetic dataset written in {time.perf_counter() - started:.1f}s (seed {args.seed})")
+    for table, n in counts.items():
+        print(f"   {table:<24} {n:>10,}")
+    # Only the hashes are stored: these keys are shown this once
+    for user_id, name, key in users[1:]:
+        print(f"   👤 {name:<14} {user_id}  key {key or '(none)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a local database with a synthetic dataset")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--periods", choices=["am", "pm", "both"], default="both")
+    parser.add_argument("--users", type=int, default=1, help="users to generate data for (the owner + synthetic ones)")
+    parser.add_argument("--attributes", type=int, default=50, help="attribute definitions")
+    parser.add_argument("--attributes-per-entry", type=int, help="attributes on each entry (default: all)")
+    parser.add_argument("--notes", type=float, default=0.3, help="mean notes per entry")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day of the range (default: today)")
+    parser.add_argument("--no-whoop", dest="whoop", action="store_false", help="leave the whoop_* tables alone")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE the tables first")
+    parser.add_argument("--allow-remote", action="store_true", help="allow a non-local CONNECTION_STRING")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Apply (or list) the schema migrations in backend/migrations. The app applies
+pending migrations on startup too; run this to migrate ahead of a deploy or to
+see where a database stands.
+
+    python -m scripts.migrate            # apply everything pending
+    python -m scripts.migrate --status   # list applied / pending / changed
+"""
+import asyncio
+import argparse
+from core.database import get_engine
+from core.migrations import migrate, status
+
+
+async def run(show_status):
+    engine = get_engine()
+    try:
+        if show_status:
+            for m, state in await status(engine):
+                icon = {"applied": "✅", "pending": "⏳", "changed": "⚠️"}[state]
+                print(f"{icon} {m.version}_{m.name:<30} {state}")
+        else:
+            applied = await migrate(engine)
+            print(f"✅ Schema up to date ({len(applied)} migration(s) applied)")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations instead of applying them")
+    args = parser.parse_args()
+    asyncio.run(run(args.status))
+
+
+if __name__ == "__main__":
+    main()
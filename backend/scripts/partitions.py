@@ -0,0 +1,51 @@
+"""
+Inspect, create or archive the yearly partitions of daily_entries and the
+whoop_* tables (core/partitions.py). The app creates upcoming years by itself;
+this is for looking at them and for archiving old ones.
+
+    python -m scripts.partitions                         # list partitions with rows / size
+    python -m scripts.partitions --ensure --year 2015    # create missing years (plus any extra --year)
+    python -m scripts.partitions --detach-before 2020    # archive every year before 2020
+
+A detached partition stays in the database as a plain table (e.g.
+whoop_sleep_2019) and no longer shows up in queries; dump it
+(pg_dump -t whoop_sleep_2019) and drop it when you're ready.
+"""
+import re
+import asyncio
+import argparse
+from core.database import get_engine
+from core.partitions import PARTITIONED_TABLES, detach_year, ensure_partitions, list_partitions
+
+
+async def run(args):
+    engine = get_engine()
+    try:
+        if args.ensure:
+            created = await ensure_partitions(engine, args.year)
+            print(f"🧱 Created {', '.join(created)}" if created else "✅ All partitions in place")
+        elif args.detach_before:
+            detached = []
+            for p in await list_partitions(engine):
+                year = re.fullmatch(rf"{p['table']}_(\d{{4}})", p["partition"])
+                if year and int(year.group(1)) < args.detach_before:
+                    detached.append(await detach_year(p["table"], int(year.group(1)), engine))
+            print(f"📦 Detached {', '.join(detached)}" if detached else f"✅ No partitions before {args.detach_before}")
+        else:
+            for p in await list_partitions(engine):
+                print(f"{p['partition']:<28} {p['bounds']:<52} {p['rows_estimate']:>10,} rows {p['bytes'] / 1024:>10,.0f} kB")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Manage the yearly partitions of {', '.join(PARTITIONED_TABLES)}")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--ensure", action="store_true", help="create missing partitions")
+    group.add_argument("--detach-before", type=int, metavar="YEAR", help="detach (archive) partitions older than YEAR")
+    parser.add_argument("--year", type=int, action="append", default=[], help="with --ensure: also create this year")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
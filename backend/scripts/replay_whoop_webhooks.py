@@ -0,0 +1,86 @@
+"""
+Local stand-in for WHOOP's webhook sender.
+Replays the records in whoop_full_data.json as signed webhook events against
+POST /whoop/webhook, e.g.:
+
+    python -m scripts.replay_whoop_webhooks --url http://localhost:8000/whoop/webhook --limit 20
+"""
+import sys
+import json
+import time
+import uuid
+import argparse
+import requests
+from core.config import WHOOP_WEBHOOK_SECRET
+from core.whoop_webhooks import sign_webhook
+
+
+# =====================================================
+# 🧩 Build events
+# =====================================================
+def build_events(full_data, event_types):
+    """Yield WHOOP v2 webhook payloads (recovery events carry the sleep id)."""
+    for record in full_data.get("recovery", []):
+        if "recovery" in event_types:
+            yield {"user_id": record.get("user_id"), "id": record.get("sleep_id"), "type": "recovery.updated"}
+    for record in full_data.get("sleep", []):
+        if "sleep" in event_types:
+            yield {"user_id": record.get("user_id"), "id": record.get("id"), "type": "sleep.updated"}
+    for record in full_data.get("workouts", []):
+        if "workout" in event_types:
+            yield {"user_id": record.get("user_id"), "id": record.get("id"), "type": "workout.updated"}
+
+
+def send_event(session, url, event, secret):
+    event = {**event, "trace_id": str(uuid.uuid4())}
+    body = json.dumps(event).encode()
+    timestamp = str(int(time.time() * 1000))
+    return session.post(
+        url,
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-WHOOP-Signature": sign_webhook(body, timestamp, secret),
+            "X-WHOOP-Signature-Timestamp": timestamp,
+        },
+        timeout=10,
+    )
+
+
+# =====================================================
+# ▶️ Main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="Replay whoop_full_data.json as signed WHOOP webhooks")
+    parser.add_argument("--url", default="http://localhost:8000/whoop/webhook")
+    parser.add_argument("--file", default="whoop_full_data.json")
+    parser.add_argument("--secret", default=WHOOP_WEBHOOK_SECRET)
+    parser.add_argument("--types", default="recovery,sleep,workout", help="comma-separated resources to replay")
+    parser.add_argument("--limit", type=int, default=0, help="stop after N events (0 = all)")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between events")
+    args = parser.parse_args()
+
+    if not args.secret:
+        sys.exit("❌ No webhook secret — set WHOOP_WEBHOOK_SECRET / WHOOP_CLIENT_SECRET or pass --secret")
+
+    with open(args.file, "r") as f:
+        full_data = json.load(f)
+
+    session = requests.Session()
+    sent = failed = 0
+    for event in build_events(full_data, set(args.types.split(","))):
+        if args.limit and sent >= args.limit:
+            break
+        r = send_event(session, args.url, event, args.secret)
+        sent += 1
+        if r.status_code >= 300:
+            failed += 1
+            print(f"❌ {event['type']} {event['id']}: {r.status_code} {r.text[:200]}")
+        if args.delay:
+            time.sleep(args.delay)
+
+    print(f"\n✅ Sent {sent} webhook events ({failed} rejected)")
+
+
+if __name__ == "__main__":
+    main()
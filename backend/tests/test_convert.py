@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from core import convert
+from core.convert import extract_est_date, to_est_datetime, to_local_dates, to_local_datetimes
+from core.whoop_normalize import normalize_rows
+
+NY = "America/New_York"
+# 2025 in New York: clocks jump 02:00 EST → 03:00 EDT on March 9 (07:00Z)
+# and fall back 02:00 EDT → 01:00 EST on November 2 (06:00Z)
+
+
+def local(value, tz=NY):
+    return to_local_datetimes([value], tz)[0]
+
+
+def date_of(value, tz=NY):
+    return to_local_dates([value], tz)[0]
+
+
+# =====================================================
+# 🌸 Spring forward
+# =====================================================
+def test_spring_forward_gap_is_skipped():
+    before = local("2025-03-09T06:59:59Z")
+    after = local("2025-03-09T07:00:00Z")
+    assert before.replace(tzinfo=None) == datetime(2025, 3, 9, 1, 59, 59)
+    assert before.utcoffset() == timedelta(hours=-5)
+    # One second later it is 03:00 EDT: 02:xx never happens locally
+    assert after.replace(tzinfo=None) == datetime(2025, 3, 9, 3, 0)
+    assert after.utcoffset() == timedelta(hours=-4)
+
+
+def test_spring_forward_day_local_midnights():
+    # Midnight starting March 9 is still EST (05:00Z), the one starting March 10 is EDT (04:00Z)
+    assert date_of("2025-03-09T04:59:00Z") == "2025-03-08"
+    assert date_of("2025-03-09T05:01:00Z") == "2025-03-09"
+    assert date_of("2025-03-10T03:59:00Z") == "2025-03-09"
+    assert date_of("2025-03-10T04:01:00Z") == "2025-03-10"
+
+
+# =====================================================
+# 🍂 Fall back
+# =====================================================
+def test_fall_back_fold_keeps_both_offsets():
+    first = local("2025-11-02T05:30:00Z")
+    second = local("2025-11-02T06:30:00Z")
+    # 01:30 happens twice locally; the offsets tell them apart and round-trip to UTC
+    assert first.replace(tzinfo=None) == second.replace(tzinfo=None) == datetime(2025, 11, 2, 1, 30)
+    assert first.utcoffset() == timedelta(hours=-4)
+    assert second.utcoffset() == timedelta(hours=-5)
+    assert first.astimezone(timezone.utc) == datetime(2025, 11, 2, 5, 30, tzinfo=timezone.utc)
+    assert second.astimezone(timezone.utc) == datetime(2025, 11, 2, 6, 30, tzinfo=timezone.utc)
+
+
+def test_fall_back_day_local_midnights():
+    # Midnight starting November 2 is still EDT (04:00Z), the one starting November 3 is EST (05:00Z)
+    assert date_of("2025-11-02T03:59:00Z") == "2025-11-01"
+    assert date_of("2025-11-02T04:01:00Z") == "2025-11-02"
+    assert date_of("2025-11-03T04:59:00Z") == "2025-11-02"
+    assert date_of("2025-11-03T05:01:00Z") == "2025-11-03"
+
+
+# =====================================================
+# 😴 Sleep ending around local midnight on transition days
+# =====================================================
+@pytest.mark.parametrize("end, record_date", [
+    ("2025-03-09T04:58:00.000Z", "2025-03-08"),  # 23:58 EST
+    ("2025-03-09T05:02:00.000Z", "2025-03-09"),  # 00:02 EST
+    ("2025-03-10T03:58:00.000Z", "2025-03-09"),  # 23:58 EDT
+    ("2025-03-10T04:02:00.000Z", "2025-03-10"),  # 00:02 EDT
+    ("2025-11-02T03:58:00.000Z", "2025-11-01"),  # 23:58 EDT
+    ("2025-11-02T04:02:00.000Z", "2025-11-02"),  # 00:02 EDT
+    ("2025-11-03T04:58:00.000Z", "2025-11-02"),  # 23:58 EST
+    ("2025-11-03T05:02:00.000Z", "2025-11-03"),  # 00:02 EST
+])
+def test_sleep_record_date_near_midnight(monkeypatch, end, record_date):
+    monkeypatch.setattr(convert, "LOCAL_TIMEZONE", NY)
+    start = (datetime.fromisoformat(end[:-1]) - timedelta(hours=7)).isoformat(timespec="milliseconds") + "Z"
+    row = normalize_rows("sleep", [{"id": "s1", "cycle_id": 1, "start": start, "end": end, "score": {}}])[0]
+    assert row["record_date"] == record_date
+    assert row["end"].startswith(record_date)
+
+
+def test_batch_matches_one_at_a_time_across_transition_days():
+    # The per-UTC-day offset cache must not leak a transition day's offset into its neighbours
+    values = [f"2025-11-0{d}T{h:02d}:30:00Z" for d in (1, 2, 3) for h in range(24)]
+    assert to_local_dates(values, NY) == [date_of(v) for v in values]
+    assert to_local_dates(values, NY) == [
+        datetime.fromisoformat(v[:-1]).replace(tzinfo=timezone.utc).astimezone(convert.get_zone(NY)).date().isoformat()
+        for v in values
+    ]
+
+
+# =====================================================
+# 🌍 Other zones
+# =====================================================
+def test_local_timezone_setting_is_used_by_default(monkeypatch):
+    monkeypatch.setattr(convert, "LOCAL_TIMEZONE", "Europe/London")
+    # BST ends October 26 2025 at 01:00Z: 00:30Z is 01:30 BST, 01:30Z is 01:30 GMT
+    assert to_local_datetimes(["2025-10-26T00:30:00Z"])[0].utcoffset() == timedelta(hours=1)
+    assert to_local_datetimes(["2025-10-26T01:30:00Z"])[0].utcoffset() == timedelta(0)
+    assert to_local_dates(["2025-06-30T23:30:00Z"]) == ["2025-07-01"]
+    assert extract_est_date("2025-06-30T23:30:00Z") == "2025-07-01"
+
+
+def test_southern_hemisphere_zone():
+    # Sydney leaves daylight time on April 6 2025 (03:00 AEDT → 02:00 AEST, 16:00Z on April 5)
+    sydney = "Australia/Sydney"
+    assert local("2025-04-05T15:30:00Z", sydney).utcoffset() == timedelta(hours=11)
+    assert local("2025-04-05T16:30:00Z", sydney).utcoffset() == timedelta(hours=10)
+    assert date_of("2025-04-05T13:59:00Z", sydney) == "2025-04-06"  # 00:59 AEDT
+    assert date_of("2025-04-06T13:59:00Z", sydney) == "2025-04-06"  # 23:59 AEST
+
+
+# =====================================================
+# ❗️ Malformed input
+# =====================================================
+@pytest.mark.parametrize("value", ["not a date", "2025-13-01T00:00:00Z", "2025-03-09 07:00 EST", 1741503600])
+def test_malformed_raises_by_default(value):
+    with pytest.raises(ValueError):
+        to_local_dates([value], NY)
+    with pytest.raises(ValueError):
+        to_local_datetimes([value], NY)
+
+
+@pytest.mark.parametrize("value", ["not a date", "2025-13-01T00:00:00Z", "2025-03-09 07:00 EST", 1741503600])
+def test_malformed_coerces_to_none(value):
+    values = ["2025-03-09T07:00:00Z", value]
+    assert to_local_dates(values, NY, errors="coerce") == ["2025-03-09", None]
+    assert to_local_datetimes(values, NY, errors="coerce")[1] is None
+    assert extract_est_date(value) is None
+    assert to_est_datetime(value) is None
+
+
+def test_empty_values_are_none_either_way():
+    assert to_local_dates([None, ""], NY) == [None, None]
+    assert to_local_datetimes([None, ""], NY, errors="coerce") == [None, None]
+
+
+def test_offsets_and_naive_timestamps_are_utc_based():
+    # An explicit offset is honoured; a naive timestamp is taken as UTC
+    assert date_of("2025-03-08T23:30:00-05:00") == "2025-03-08"
+    assert date_of("2025-03-09T23:30:00-05:00") == "2025-03-10"  # 04:30Z, which is 00:30 EDT
+    assert date_of("2025-03-10T03:30:00") == "2025-03-09"
@@ -0,0 +1,33 @@
+import io
+import json
+import pytest
+from core.json_stream import iter_object_arrays
+
+DOCUMENT = json.dumps({
+    "recovery": [{"score": {"recovery_score": 54, "hrv_rmssd_milli": 38.125}, "sleep_id": "a1"}],
+    "sleep": [1, 2.5e3, 123, -0.5, 1e-7, 12345678901234567890, True, False, None, "2.5", [1.5, {"x": 1E+3}]],
+    "profile": {"user_id": 10129, "first_name": "J"},
+    "workouts": [],
+    "cycles": [{"strain": 9.87, "kilojoule": 8288.2}, {"strain": 0}],
+}, indent=1)
+
+
+def expected(document):
+    return [(key, item) for key, value in json.loads(document).items() if isinstance(value, list) for item in value]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, len(DOCUMENT) + 2))
+def test_matches_json_loads_at_every_chunk_size(chunk_size):
+    assert list(iter_object_arrays(io.StringIO(DOCUMENT), chunk_size)) == expected(DOCUMENT)
+
+
+@pytest.mark.parametrize("document", ['{"a":[1,2.5e3,123]}', '{"a":[1e3]}', '{"a":[2.]}', '{}', '{"a":[]}'])
+def test_numbers_split_across_chunks(document):
+    try:
+        want = expected(document)
+    except ValueError:
+        with pytest.raises(ValueError):
+            list(iter_object_arrays(io.StringIO(document), 1))
+        return
+    for chunk_size in range(1, len(document) + 1):
+        assert list(iter_object_arrays(io.StringIO(document), chunk_size)) == want